@@ -4,9 +4,11 @@ import os
 from dotenv import load_dotenv  # type: ignore
 load_dotenv()
 
+from .db_profile import engine_options, install_sqlite_pragmas, sqlite_pragmas  # noqa: E402
+
 db = SQLAlchemy()
 
-def create_app():
+def create_app(skip_migrations=None):
     # Use package's own static directory (app/static) to avoid picking up outdated root-level duplicates
     app = Flask(
         __name__, 
@@ -26,7 +28,7 @@ def create_app():
         db_url = 'sqlite:///' + os.path.join(instance_path, 'children.db').replace('\\', '/')
     else:
         # If user supplied a SQLite URL, ensure its directory exists and make relative paths absolute
-        if db_url.startswith('sqlite:///'):
+        if db_url.startswith('sqlite:///') and db_url != 'sqlite:///:memory:':
             raw_path = db_url.replace('sqlite:///', '', 1)
             # Expand user (~) and environment vars
             raw_path = os.path.expandvars(os.path.expanduser(raw_path))
@@ -40,35 +42,55 @@ def create_app():
             db_url = 'sqlite:///' + raw_path.replace('\\', '/')
     app.config['SQLALCHEMY_DATABASE_URI'] = db_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool settings per backend and SQLite PRAGMAs (WAL, busy_timeout, ...) applied on connect
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(db_url)
+    # Opt-in per-request SQL/template/latency instrumentation (Server-Timing + /metrics)
+    app.config['INSTRUMENTATION_ENABLED'] = os.environ.get('INSTRUMENTATION_ENABLED', '').lower() in ('1', 'true', 'yes')
+    app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', '500'))
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
 
     db.init_app(app)
+    # Server-side sessions (SESSION_BACKEND); the cookie only carries an opaque id
+    from .session_store import init_session_store
+    init_session_store(app)
+    # Password hashing runs on a bounded process pool (PASSWORD_HASH_*)
+    from .passwords import init_password_hasher
+    init_password_hasher(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, sqlite_pragmas())
 
     # Import models so SQLAlchemy registers them
-    from .models import Child, Parent  # noqa: F401
+    from .models import Child, Parent, SchemaVersion  # noqa: F401
+
+    # Schema check costs one SELECT when current; SKIP_MIGRATIONS=1 (or --skip-migrations)
+    # skips even that on serverless cold starts once `flask migrate` has run at deploy time
+    if skip_migrations is None:
+        skip_migrations = os.environ.get('SKIP_MIGRATIONS', '').lower() in ('1', 'true', 'yes')
+    if not skip_migrations:
+        from .migrations import run_migrations
+        with app.app_context():
+            run_migrations(db.engine, db.metadata)
 
+    from .instrumentation import init_instrumentation
     with app.app_context():
-        db.create_all()
-        # Lightweight migration for existing SQLite DBs: add 'country' column to children if missing
-        try:
-            from sqlalchemy import text
-            engine = db.engine
-            with engine.connect() as conn:
-                res = conn.execute(text("PRAGMA table_info(children)"))
-                cols = {row[1] for row in res}  # row[1] is column name
-                if 'country' not in cols:
-                    # Add nullable column with default 'India'
-                    conn.execute(text("ALTER TABLE children ADD COLUMN country VARCHAR(50)"))
-                    # Initialize nulls to 'India'
-                    conn.execute(text("UPDATE children SET country = 'India' WHERE country IS NULL"))
-                    conn.commit()
-        except Exception:
-            # Best-effort; ignore if database isn't SQLite or migration not applicable
-            pass
+        init_instrumentation(app, db.engine)
 
     from .views import views
     from .auth import auth
+    from .api import api
 
     app.register_blueprint(views, url_prefix='/')
     app.register_blueprint(auth, url_prefix='/auth/')
+    app.register_blueprint(api, url_prefix='/api/v1')
+
+    # Content-hashed static URLs with far-future caching (gzip variants from `flask build-assets`)
+    from .assets import init_assets
+    init_assets(app)
+
+    from .cli import build_assets_command, export_records_command, migrate_command, send_reminders_command
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(export_records_command)
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(send_reminders_command)
 
     return app
\ No newline at end of file
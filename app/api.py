@@ -0,0 +1,224 @@
+from datetime import date, datetime, timedelta
+import hashlib
+import json
+
+from flask import Blueprint, Response, jsonify, request, session
+
+from . import db
+from .models import Child, Vaccination
+from .pagination import decode_cursor
+from .completions import age_group_vaccines, complete_vaccinations, import_completion_history
+from .schedule_data import build_schedule_for_child, get_compiled_schedule, virtual_vaccinations
+from .summaries import DASHBOARD_MAX_PAGE_SIZE, DASHBOARD_PAGE_SIZE, child_summary_json, child_summary_page
+from .child_caches import invalidate_child_caches
+
+# Versioned JSON API; clients authenticate with the same session cookie as the HTML views
+api = Blueprint('api', __name__)
+
+# Upper bound on vaccinations updated by one PATCH (a whole schedule fits comfortably)
+_MAX_BATCH = 200
+
+
+def _error(message: str, status: int, **extra):
+    return jsonify({'error': message, **extra}), status
+
+
+@api.before_request
+def _require_parent():
+    if not session.get('parent_id'):
+        return _error('Authentication required.', 401)
+
+
+def _own_child(child_id: int):
+    return Child.query.filter_by(id=child_id, parent_id=session['parent_id']).first()
+
+
+def _json_date(value):
+    return value.isoformat() if value else None
+
+
+def _schedule_json(child):
+    """The child's schedule (one item per age group) and stats, read-only."""
+    vacs = Vaccination.query.filter_by(child_id=child.id).all()
+    entries = build_schedule_for_child(child.dob, child=child, country=child.country or 'India', vaccinations=vacs)
+    vacs += virtual_vaccinations(child, vacs)
+    today = date.today()
+    due_soon_window = today + timedelta(days=30)
+    groups = []
+    for e in entries:
+        if e['group_completed']:
+            status = 'completed'
+        else:
+            status = 'due' if e['due_date'] <= today else 'upcoming'
+        groups.append({
+            'age': e['age'],
+            'due_date': e['due_date'].isoformat(),
+            'status': status,
+            'completed_at': _json_date(e['group_completed_date']),
+            'vaccines': [{'name': v.name, 'due_date': v.due_date.isoformat(), 'completed_at': _json_date(v.completed_at)} for v in e['vaccine_records']],
+        })
+    return {
+        'child': {'id': child.id, 'name': child.name, 'dob': child.dob.isoformat(), 'country': child.country or 'India'},
+        'stats': {
+            'completed': sum(1 for v in vacs if v.completed_at),
+            'overdue': sum(1 for v in vacs if (not v.completed_at) and v.due_date <= today),
+            'due_soon': sum(1 for v in vacs if (not v.completed_at) and today < v.due_date <= due_soon_window),
+            'total': len(vacs),
+        },
+        'schedule': groups,
+    }
+
+
+def _schedule_etag(body) -> str:
+    """Strong validator over the schedule representation itself.
+
+    Digesting the (small) body rather than a row fingerprint means any change,
+    including a re-dated completion, yields a new ETag for If-Match checks.
+    """
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _schedule_response(body, etag: str, conditional: bool = False):
+    if conditional and etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = jsonify(body)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+
+def _parse_date(value, label: str):
+    """Return (date, error message); an empty value means today."""
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d').date() if value else date.today()
+    except (TypeError, ValueError):
+        return None, f'Invalid completed_at for {label}: use YYYY-MM-DD.'
+    if parsed > date.today():
+        return None, f'completed_at for {label} cannot be in the future.'
+    return parsed, None
+
+
+def _parse_completions(items):
+    """Validate ``[{"name": ..., "completed_at": "YYYY-MM-DD"}]``; return ({name: date}, error message)."""
+    if not isinstance(items, list) or not items:
+        return None, '"vaccinations" must be a non-empty list.'
+    if len(items) > _MAX_BATCH:
+        return None, f'At most {_MAX_BATCH} vaccinations per request.'
+    completions = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('name'), str) or not item['name']:
+            return None, 'Every item needs a vaccine "name".'
+        completed_at, message = _parse_date(item.get('completed_at'), item['name'])
+        if message:
+            return None, message
+        completions[item['name']] = completed_at
+    return completions, None
+
+
+def _locked_child(child_id: int):
+    """Load the parent's child and hold a write lock on it until the transaction ends.
+
+    Concurrent PATCHes of one child then run one after the other, so the If-Match
+    comparison and the UPDATE see the same schedule.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # No row locks: take the database write lock up front (other writers wait for busy_timeout)
+        db.session.execute(db.text('BEGIN IMMEDIATE'))
+        return _own_child(child_id)
+    return Child.query.filter_by(id=child_id, parent_id=session['parent_id']).with_for_update().first()
+
+
+def _rollback_error(message: str, status: int, **extra):
+    # Ends the transaction, releasing the lock taken by _locked_child
+    db.session.rollback()
+    return _error(message, status, **extra)
+
+
+def _apply_completions(child_id: int, payload):
+    """Apply a completion PATCH in one transaction, honouring If-Match against the schedule ETag.
+
+    ``{"age": ..., "completed_at": ...}`` completes the pending vaccines of one age
+    group and keeps dates already recorded; ``{"vaccinations": [...]}`` sets each
+    listed vaccine's completion date, overwriting an earlier one (used to correct a
+    date or import a historical record).
+    """
+    if 'age' in payload and 'vaccinations' in payload:
+        return _error('Send either "age" or "vaccinations", not both.', 400)
+    if 'age' in payload:
+        completed_at, message = _parse_date(payload.get('completed_at'), payload['age'])
+    else:
+        completions, message = _parse_completions(payload.get('vaccinations'))
+    if message:
+        return _error(message, 400)
+    child = _locked_child(child_id)
+    if child is None:
+        return _rollback_error('Child not found.', 404)
+    if request.if_match and not request.if_match.contains(_schedule_etag(_schedule_json(child))):
+        return _rollback_error('Schedule has changed; fetch it again before updating.', 412)
+    country = child.country or 'India'
+    if 'age' in payload:
+        names = age_group_vaccines(country, payload['age']) if isinstance(payload['age'], str) else None
+        if not names:
+            return _rollback_error('Unknown age group for this child.', 422, unknown=[payload['age']])
+        updated = complete_vaccinations(child, names, completed_at)
+    else:
+        scheduled = {name for entry in get_compiled_schedule(country).entries for name in entry.vaccines}
+        unknown = sorted(set(completions) - scheduled)
+        if unknown:
+            return _rollback_error('Unknown vaccines for this child.', 422, unknown=unknown)
+        updated = import_completion_history(child, completions)
+    db.session.commit()
+    if updated:
+        invalidate_child_caches(child.id)
+    body = _schedule_json(child)
+    resp = _schedule_response(body, _schedule_etag(body))
+    resp.headers['X-Updated-Count'] = str(updated)
+    return resp
+
+
+@api.route('/children')
+def list_children():
+    """Keyset pages of the parent's children with status summaries (``?after=<cursor>&limit=N``)."""
+    try:
+        cursor = decode_cursor(request.args.get('after'))
+    except ValueError:
+        return _error('Invalid cursor.', 400)
+    limit = min(max(request.args.get('limit', DASHBOARD_PAGE_SIZE, type=int), 1), DASHBOARD_MAX_PAGE_SIZE)
+    _children, child_stats, next_cursor = child_summary_page(session['parent_id'], cursor, limit, date.today())
+    resp = jsonify({'children': [child_summary_json(s) for s in child_stats], 'next_cursor': next_cursor})
+    resp.add_etag()
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp.make_conditional(request)
+
+
+@api.route('/children/<int:child_id>/schedule')
+def child_schedule(child_id):
+    child = _own_child(child_id)
+    if child is None:
+        return _error('Child not found.', 404)
+    body = _schedule_json(child)
+    return _schedule_response(body, _schedule_etag(body), conditional=True)
+
+
+@api.route('/children/<int:child_id>/vaccinations', methods=['PATCH'])
+def patch_vaccinations(child_id):
+    """Batch completion by age group or by an explicit list of vaccines and dates."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return _error('Expected a JSON object.', 400)
+    return _apply_completions(child_id, payload)
+
+
+@api.route('/children/<int:child_id>/vaccinations/<path:name>', methods=['PATCH'])
+def patch_vaccination(child_id, name):
+    """Set one vaccine's completion date: ``{"completed_at": "2024-01-02"}`` (defaults to today).
+
+    Like the list form, an existing date is overwritten, so this also corrects a date.
+    """
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = {}
+    if not isinstance(payload, dict):
+        return _error('Expected a JSON object.', 400)
+    return _apply_completions(child_id, {'vaccinations': [{'name': name, 'completed_at': payload.get('completed_at')}]})
@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from typing import Dict, NamedTuple, Optional
+
+from flask import abort, request, send_file, url_for
+
+logger = logging.getLogger(__name__)
+
+# Served under /assets/<fingerprinted name>; a changed file gets a new URL, so it never needs revalidating
+_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+_COMPRESSIBLE_SUFFIXES = ('.css', '.js', '.json', '.svg', '.txt', '.html', '.webmanifest')
+# Files the app itself rereads at runtime (hot-reloaded data), never fingerprinted
+_MUTABLE_FILES = {'schedules.json'}
+
+
+class Asset(NamedTuple):
+    path: str
+    mimetype: str
+    # Pre-built gzip variant, when one is present and newer than the source
+    gzip_path: Optional[str]
+
+
+class AssetManifest(NamedTuple):
+    # Logical name ('css/style.css') -> fingerprinted name ('css/style.3f2a9c1b7d0e.css')
+    urls: Dict[str, str]
+    assets: Dict[str, Asset]
+
+
+def _fingerprinted(filename: str, digest: str) -> str:
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{digest}{ext}'
+
+
+def _iter_static_files(static_folder: str):
+    for root, _dirs, files in os.walk(static_folder):
+        for name in files:
+            if name.endswith('.gz') or name in _MUTABLE_FILES:
+                continue
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+
+def build_asset_manifest(static_folder: str) -> AssetManifest:
+    """Hash every static file once; lookups during rendering are then a dict access."""
+    urls: Dict[str, str] = {}
+    assets: Dict[str, Asset] = {}
+    for filename, path in _iter_static_files(static_folder):
+        with open(path, 'rb') as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()[:12]
+        gzip_path = path + '.gz'
+        if not (os.path.exists(gzip_path) and os.path.getmtime(gzip_path) >= os.path.getmtime(path)):
+            gzip_path = None
+        hashed = _fingerprinted(filename, digest)
+        urls[filename] = hashed
+        assets[hashed] = Asset(path, mimetypes.guess_type(filename)[0] or 'application/octet-stream', gzip_path)
+    return AssetManifest(urls, assets)
+
+
+def build_gzip_variants(static_folder: str) -> int:
+    """Write ``<file>.gz`` next to every compressible static file; returns how many were (re)built."""
+    built = 0
+    for filename, path in _iter_static_files(static_folder):
+        if not filename.endswith(_COMPRESSIBLE_SUFFIXES):
+            continue
+        gzip_path = path + '.gz'
+        if os.path.exists(gzip_path) and os.path.getmtime(gzip_path) >= os.path.getmtime(path):
+            continue
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        # mtime=0 keeps the output byte-for-byte reproducible
+        with open(gzip_path, 'wb') as fh:
+            fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+        built += 1
+    return built
+
+
+def init_assets(app) -> None:
+    """Fingerprint static files at startup and route ``url_for('static', ...)`` to the hashed URLs.
+
+    Files missing from the manifest (or everything, with ASSET_FINGERPRINTING=0)
+    keep their plain /static URL.
+    """
+    if os.environ.get('ASSET_FINGERPRINTING', '1').lower() in ('0', 'false', 'no'):
+        return
+    manifest = build_asset_manifest(app.static_folder)
+    app.extensions['asset_manifest'] = manifest
+
+    def serve_asset(filename):
+        asset = manifest.assets.get(filename)
+        if asset is None:
+            abort(404)
+        use_gzip = asset.gzip_path is not None and 'gzip' in request.accept_encodings
+        resp = send_file(asset.gzip_path if use_gzip else asset.path, mimetype=asset.mimetype,
+                         conditional=True, max_age=_IMMUTABLE_MAX_AGE)
+        if use_gzip:
+            resp.headers['Content-Encoding'] = 'gzip'
+        if asset.gzip_path is not None:
+            resp.vary.add('Accept-Encoding')
+        resp.cache_control.public = True
+        resp.cache_control.immutable = True
+        return resp
+
+    app.add_url_rule('/assets/<path:filename>', endpoint='assets', view_func=serve_asset)
+
+    def asset_url_for(endpoint, **values):
+        if endpoint == 'static':
+            hashed = manifest.urls.get(values.get('filename'))
+            if hashed is not None:
+                values['filename'] = hashed
+                endpoint = 'assets'
+        return url_for(endpoint, **values)
+
+    app.jinja_env.globals['url_for'] = asset_url_for
+    logger.debug('Fingerprinted %d static assets', len(manifest.urls))
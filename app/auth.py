@@ -1,44 +1,67 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from werkzeug.local import LocalProxy
 from . import db
 from .models import Parent, Child
-from .schedule_data import build_schedule_for_child, get_reference_url
-from .security import sanitize_text, validate_name, validate_email, has_disallowed_keywords
+from .schedule_data import materialize_vaccinations
+from .security import sanitize_text, sanitize_text_checked, validate_name, validate_email
+from .completions import import_completion_history
+from .guest import pop_guest_child
+from .passwords import HashingBusy, password_hasher
+from .request_context import request_memo
+from .session_store import regenerate_session
+from .child_caches import invalidate_child_caches
 
 auth = Blueprint('auth', __name__, template_folder='template')
 
 
-def _current_parent():
+def current_parent():
 	pid = session.get('parent_id')
 	if not pid:
 		return None
+	# Loaded once per request; keyed by id so logging in or out mid-request is seen
 	# SQLAlchemy 2.x: use Session.get instead of deprecated Query.get
-	return db.session.get(Parent, pid)
+	return request_memo(('parent', pid), lambda: db.session.get(Parent, pid))
+
+
+# Templates get a proxy, so pages that never show the parent never load it
+_lazy_current_parent = LocalProxy(current_parent)
+
+
+def _sign_in(parent_id: int):
+	# A new session id on every privilege change defeats session fixation
+	regenerate_session(session)
+	session['parent_id'] = parent_id
+
+
+def _sign_out():
+	session.pop('parent_id', None)
+	regenerate_session(session)
 
 
 def _consume_guest_child(parent_id: int):
-	"""If a guest child exists in session, move it into the database for this parent."""
-	data = session.pop('guest_child', None)
-	if not data:
+	"""If a guest child exists in session, move it (and its completions) into the database for this parent."""
+	guest = pop_guest_child()
+	if not guest:
 		return
-	name = (data.get('name') or '').strip()
-	dob_str = (data.get('dob') or '').strip()
-	if not name or not dob_str:
-		return
-	try:
-		from datetime import datetime as _dt
-		dob = _dt.strptime(dob_str, '%Y-%m-%d').date()
-	except Exception:
+	data, completions = guest
+	if not data.name:
 		return
-	# Pull country if present in session data
-	country = (data.get('country') or 'India') if isinstance(data, dict) else 'India'
-	child = Child(name=name, dob=dob, parent_id=parent_id, country=country)
+	child = Child(name=data.name, dob=data.dob, parent_id=parent_id, country=data.country)
 	db.session.add(child)
 	db.session.commit()
-	# Create vaccinations for the child
-	build_schedule_for_child(child.dob, child=child, country=child.country or 'India')
+	# Create vaccinations and the status summary for the child in one transaction
+	materialize_vaccinations([child])
+	if completions and import_completion_history(child, completions):
+		db.session.commit()
+
+
+def _rehash_password(parent, password: str):
+	"""Upgrade a hash made with old parameters; skipped (until the next login) when hashing is saturated."""
+	try:
+		parent.password_hash = password_hasher().hash(password)
+	except HashingBusy:
+		return
 	db.session.commit()
 
 
@@ -53,17 +76,30 @@ def login_required(f):
 	return wrapper
 
 
+@auth.errorhandler(HashingBusy)
+def hashing_busy(exc):
+	"""Shed sign-in load instead of queueing it: 503 with Retry-After, form values kept."""
+	errors = ['We are handling a lot of sign-ins right now. Please try again in a moment.']
+	if request.endpoint == 'auth.register':
+		form = {key: request.form.get(key, '') for key in ('name', 'email', 'age')}
+		body = render_template('parent_register.html', errors=errors, form=form)
+	else:
+		flash(errors[0], 'error')
+		body = render_template('parent_login.html')
+	return body, 503, {'Retry-After': str(exc.retry_after)}
+
+
 @auth.route('/register', methods=['GET', 'POST'])
 def register():
 	if request.method == 'POST':
-		name = sanitize_text(request.form.get('name', '').strip(), max_len=80)
-		email = sanitize_text(request.form.get('email', '').strip().lower(), max_len=120)
+		name, name_flagged = sanitize_text_checked(request.form.get('name', '').strip(), max_len=80)
+		email, email_flagged = sanitize_text_checked(request.form.get('email', '').strip().lower(), max_len=120)
 		age = sanitize_text(request.form.get('age', '').strip(), max_len=3)
 		password = request.form.get('password', '')
 		errors = []
 		errors += validate_name(name, field_label='Name')
 		errors += validate_email(email)
-		if has_disallowed_keywords(name) or has_disallowed_keywords(email):
+		if name_flagged or email_flagged:
 			errors.append('Input contains disallowed words.')
 		if not age:
 			errors.append('Age required.')
@@ -79,10 +115,10 @@ def register():
 		if len(password) < 6:
 			errors.append('Password must be at least 6 characters.')
 		if not errors:
-			parent = Parent(name=name, email=email, age=age_val, password_hash=generate_password_hash(password))
+			parent = Parent(name=name, email=email, age=age_val, password_hash=password_hasher().hash(password))
 			db.session.add(parent)
 			db.session.commit()
-			session['parent_id'] = parent.id
+			_sign_in(parent.id)
 			_consume_guest_child(parent.id)
 			return redirect(url_for('views.dashboard'))
 		return render_template('parent_register.html', errors=errors, form={'name': name, 'email': email, 'age': age})
@@ -100,8 +136,11 @@ def login():
 		email = sanitize_text(request.form.get('email', '').strip().lower(), max_len=120)
 		password = request.form.get('password', '')
 		parent = Parent.query.filter_by(email=email).first()
-		if parent and check_password_hash(parent.password_hash, password):
-			session['parent_id'] = parent.id
+		hasher = password_hasher()
+		if parent and hasher.verify(parent.password_hash, password):
+			if hasher.needs_rehash(parent.password_hash):
+				_rehash_password(parent, password)
+			_sign_in(parent.id)
 			_consume_guest_child(parent.id)
 			return redirect(url_for('views.dashboard'))
 		flash('Invalid credentials', 'error')
@@ -110,25 +149,25 @@ def login():
 
 @auth.route('/logout')
 def logout():
-	session.pop('parent_id', None)
+	_sign_out()
 	return redirect(url_for('auth.login'))
 
 
 @auth.route('/parent/<int:parent_id>', methods=['GET', 'POST'])
 @login_required
 def parent_profile(parent_id):
-	parent = _current_parent()
+	parent = current_parent()
 	if not parent or parent.id != parent_id:
 		return redirect(url_for('auth.login'))
 	errors = []
 	if request.method == 'POST':
-		name = sanitize_text(request.form.get('name', '').strip(), max_len=80)
+		name, name_flagged = sanitize_text_checked(request.form.get('name', '').strip(), max_len=80)
 		age = sanitize_text(request.form.get('age', '').strip(), max_len=3)
 		if not name:
 			errors.append('Name required.')
 		if not age:
 			errors.append('Age required.')
-		if has_disallowed_keywords(name):
+		if name_flagged:
 			errors.append('Input contains disallowed words.')
 		try:
 			age_val = int(age) if age else None
@@ -148,22 +187,24 @@ def parent_profile(parent_id):
 
 @auth.app_context_processor
 def inject_parent():
-	# Also provide default schedule info for base header when in auth pages
-	default_country = 'India'
-	return {'current_parent': _current_parent(), 'reference_url': get_reference_url(default_country), 'reference_label': 'Official schedule', 'current_country': default_country}
+	# Schedule defaults for the header come from views.inject_reference_defaults
+	return {'current_parent': _lazy_current_parent}
 
 
 @auth.route('/parent/<int:parent_id>/delete', methods=['POST'])
 @login_required
 def delete_account(parent_id):
 	"""Permanently delete the current parent's account and all related data."""
-	parent = _current_parent()
+	parent = current_parent()
 	if not parent or parent.id != parent_id:
 		flash('Unauthorized request.', 'error')
 		return redirect(url_for('auth.login'))
 	# Delete the parent; cascades handle children and vaccinations
+	child_ids = [c.id for c in parent.children]
 	db.session.delete(parent)
 	db.session.commit()
-	session.pop('parent_id', None)
+	for child_id in child_ids:
+		invalidate_child_caches(child_id)
+	_sign_out()
 	flash('Your account and all associated data have been permanently deleted.', 'success')
 	return redirect(url_for('auth.login'))
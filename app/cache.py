@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache bounded by total size and/or entry count.
+
+    ``sizeof`` reports the cost of a value in bytes (``len`` by default); values
+    larger than ``max_bytes`` are not stored. Entries can be tagged (e.g. with a
+    child id) so every entry derived from the same record can be dropped at once.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = len):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = ()) -> None:
+        size = self._sizeof(value)
+        tags = tuple(tags)
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._data and (
+                (self.max_bytes is not None and self._bytes > self.max_bytes)
+                or (self.max_entries is not None and len(self._data) > self.max_entries)
+            ):
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Drop every entry stored with ``tag``; returns how many were removed."""
+        with self._lock:
+            keys = self._tags.pop(tag, set())
+            for key in list(keys):
+                self._pop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def _pop(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        _value, size, tags = item
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
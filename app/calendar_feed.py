@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+import hashlib
+import hmac
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from . import db
+from .models import Child, Parent, Vaccination, new_calendar_secret
+from .schedule_data import entry_due_date, get_compiled_schedule, get_schedule_version
+
+_MAX_LINE_OCTETS = 75
+
+
+def ics_escape(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)."""
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def fold_ics_line(line: str) -> str:
+    """Fold a content line to at most 75 octets per physical line (RFC 5545 section 3.1).
+
+    Continuation lines start with a single space; multi-byte UTF-8 characters
+    are never split.
+    """
+    if len(line.encode('utf-8')) <= _MAX_LINE_OCTETS:
+        return line
+    parts = []
+    current = []
+    size = 0
+    limit = _MAX_LINE_OCTETS
+    for ch in line:
+        n = len(ch.encode('utf-8'))
+        if size + n > limit:
+            parts.append(''.join(current))
+            current, size, limit = [], 0, _MAX_LINE_OCTETS - 1
+        current.append(ch)
+        size += n
+    parts.append(''.join(current))
+    return '\r\n '.join(parts)
+
+
+def child_calendar_events(child, with_child_name: bool = False) -> List[Dict[str, str]]:
+    """One all-day event per schedule age group, computed without touching the database."""
+    prefix = f"{child.name}: " if with_child_name else ''
+    events = []
+    for entry in get_compiled_schedule(child.country or 'India').entries:
+        dtstart = entry_due_date(child.dob, entry).strftime('%Y%m%d')
+        events.append({
+            'uid': f"{child.id}-{entry.age.replace(' ', '')}-{dtstart}@vaccinationtracker",
+            'dtstart': dtstart,
+            'summary': f"{prefix}{entry.age} Vaccines",
+            'description': ', '.join(entry.vaccines),
+        })
+    return events
+
+
+def iter_ics(calendar_name: str, events: Iterable[Dict[str, str]], dtstamp: datetime) -> Iterator[str]:
+    """Yield a VCALENDAR line by line (each folded and CRLF-terminated)."""
+    stamp = dtstamp.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//VaccinationTracker//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{ics_escape(calendar_name)}',
+    ]
+    for line in header:
+        yield fold_ics_line(line) + '\r\n'
+    for event in events:
+        for line in (
+            'BEGIN:VEVENT',
+            f"UID:{event['uid']}",
+            f'DTSTAMP:{stamp}',
+            f"DTSTART;VALUE=DATE:{event['dtstart']}",
+            f"SUMMARY:{ics_escape(event['summary'])}",
+            f"DESCRIPTION:{ics_escape(event['description'])}",
+            'END:VEVENT',
+        ):
+            yield fold_ics_line(line) + '\r\n'
+    yield 'END:VCALENDAR\r\n'
+
+
+def calendar_state(children) -> Tuple[str, datetime]:
+    """Return (etag, last_modified) for a calendar covering ``children``.
+
+    Derived from the children's schedule inputs, their vaccination rows (one
+    aggregate query) and the schedule version, so an unchanged calendar can be
+    answered with 304 without rendering it. Last-Modified also follows child
+    edits (``updated_at``), since names, birth dates and countries are rendered.
+    """
+    child_ids = [c.id for c in children]
+    row = (0, 0, None, None)
+    if child_ids:
+        row = db.session.execute(
+            db.select(
+                db.func.count(Vaccination.id),
+                db.func.count(Vaccination.completed_at),
+                db.func.max(Vaccination.created_at),
+                db.func.max(Vaccination.completed_at),
+            ).where(Vaccination.child_id.in_(child_ids))
+        ).one()
+    parts = [get_schedule_version(), tuple(str(v) for v in row)]
+    stamps = [row[2]] if row[2] else []
+    for c in children:
+        parts.append((c.id, c.name, str(c.dob), c.country))
+        stamps.extend(s for s in (c.created_at, c.updated_at) if s)
+    etag = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+    stamps = [s if s.tzinfo else s.replace(tzinfo=timezone.utc) for s in stamps]
+    if row[3]:
+        stamps.append(datetime(row[3].year, row[3].month, row[3].day, tzinfo=timezone.utc))
+    last_modified = max(stamps) if stamps else datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return etag, last_modified.replace(microsecond=0)
+
+
+def _feed_serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='calendar-feed')
+
+
+def make_calendar_token(parent) -> str:
+    """Opaque, signed token for a parent's calendar subscription URL.
+
+    It carries the parent's ``calendar_secret``, so ``reset_calendar_secret``
+    revokes every URL handed out before.
+    """
+    return _feed_serializer().dumps([parent.id, parent.calendar_secret])
+
+
+def load_calendar_token(token: str) -> Optional[int]:
+    """The parent id a still-valid token was issued to, else None."""
+    try:
+        payload = _feed_serializer().loads(token)
+    except BadSignature:
+        return None
+    if not (isinstance(payload, list) and len(payload) == 2 and isinstance(payload[0], int) and isinstance(payload[1], str)):
+        return None
+    parent_id, secret = payload
+    current = db.session.execute(db.select(Parent.calendar_secret).where(Parent.id == parent_id)).scalar()
+    if current is None or not hmac.compare_digest(current, secret):
+        return None
+    return parent_id
+
+
+def reset_calendar_secret(parent) -> None:
+    """Give ``parent`` a new calendar secret (the caller commits)."""
+    parent.calendar_secret = new_calendar_secret()
+
+
+def parent_calendar_children(parent_id: int) -> List[Child]:
+    return Child.query.filter_by(parent_id=parent_id).order_by(Child.created_at.asc(), Child.id.asc()).all()
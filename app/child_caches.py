@@ -0,0 +1,19 @@
+"""Process-local caches of artefacts rendered from one child's data.
+
+Entries are tagged with the child id, so ``invalidate_child_caches`` drops
+everything derived from a child once its data changes.
+"""
+import os
+
+from .cache import LRUCache
+
+# Rendered schedule-card HTML of child_view, keyed by everything the fragment depends on
+SCHEDULE_FRAGMENT_CACHE = LRUCache(max_bytes=int(os.environ.get('SCHEDULE_FRAGMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024)), sizeof=len)
+# Rendered vaccine-record PDFs: (etag, pdf bytes, filename) keyed by a digest of everything the PDF depends on
+PDF_CACHE = LRUCache(max_bytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', 16 * 1024 * 1024)), sizeof=lambda item: len(item[1]))
+
+
+def invalidate_child_caches(child_id: int) -> None:
+    """Drop every cached artefact derived from this child's data."""
+    PDF_CACHE.invalidate_tag(child_id)
+    SCHEDULE_FRAGMENT_CACHE.invalidate_tag(child_id)
@@ -0,0 +1,84 @@
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from .models import Child
+
+
+@click.command('export-records')
+@click.option('--parent-id', 'parent_ids', type=int, multiple=True, help='Parent whose children to export (repeatable).')
+@click.option('--all', 'all_parents', is_flag=True, help='Export every child in the database (admin bulk export).')
+@click.option('--output', '-o', required=True, type=click.Path(dir_okay=False, writable=True), help='ZIP file to write.')
+@click.option('--workers', type=int, default=1, envvar='PDF_EXPORT_WORKERS', show_default=True, help='Render processes (>1 only helps on a multi-core host).')
+@with_appcontext
+def export_records_command(parent_ids, all_parents, output, workers):
+    """Export vaccine-record PDFs for many children into one ZIP archive."""
+    from .exports import stream_vaccine_records_zip, uk_today, vaccine_record_export_jobs
+
+    if not parent_ids and not all_parents:
+        raise click.UsageError('Pass --parent-id at least once, or --all.')
+    query = Child.query.order_by(Child.parent_id.asc(), Child.id.asc())
+    if not all_parents:
+        query = query.filter(Child.parent_id.in_(parent_ids))
+    started = time.perf_counter()
+    jobs = vaccine_record_export_jobs(query.all(), uk_today())
+    with open(output, 'wb') as f:
+        for chunk in stream_vaccine_records_zip(jobs, workers):
+            f.write(chunk)
+    elapsed = time.perf_counter() - started
+    rate = len(jobs) / elapsed if elapsed else float('inf')
+    click.echo(f'Exported {len(jobs)} records to {output} in {elapsed:.2f}s ({rate:.1f} records/sec).')
+
+
+@click.command('migrate')
+@with_appcontext
+def migrate_command():
+    """Apply pending schema migrations (run at deploy time when SKIP_MIGRATIONS is set)."""
+    from . import db
+    from .migrations import LATEST_VERSION, run_migrations
+
+    applied = run_migrations(db.engine, db.metadata)
+    if applied:
+        click.echo(f"Applied migrations {', '.join(str(v) for v in applied)}; schema at version {LATEST_VERSION}")
+    else:
+        click.echo(f"Schema up to date (version {LATEST_VERSION})")
+
+
+@click.command('send-reminders')
+@click.option('--date', 'run_date', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Day to run for (default: today).')
+@click.option('--windows', default=None, help='Comma-separated lead days (default: REMINDER_WINDOWS or 0,7,30).')
+@click.option('--sink', 'sink_spec', default=None, help='maildir:PATH or jsonl:PATH / jsonl:- (default: REMINDER_SINK or jsonl:-).')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Parents per keyset page.')
+@with_appcontext
+def send_reminders_command(run_date, windows, sink_spec, batch_size):
+    """Send due-vaccine reminders, one per parent (run daily from cron)."""
+    import os
+    from datetime import date
+
+    from .reminders import make_sink, parse_windows, run_reminder_scan
+
+    try:
+        lead_days = parse_windows(windows or os.environ.get('REMINDER_WINDOWS'))
+        sink = make_sink(sink_spec or os.environ.get('REMINDER_SINK', 'jsonl:-'))
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    today = run_date.date() if run_date else date.today()
+    started = time.perf_counter()
+    result = run_reminder_scan(sink, today, lead_days, batch_size)
+    elapsed = time.perf_counter() - started
+    click.echo(f"Sent {result['parents']} reminders covering {result['items']} vaccinations in {elapsed:.2f}s.", err=True)
+
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Pre-compress static files (``<file>.gz``) so they are served gzip-encoded (run at build time)."""
+    from flask import current_app
+
+    from .assets import build_asset_manifest, build_gzip_variants
+
+    built = build_gzip_variants(current_app.static_folder)
+    manifest = build_asset_manifest(current_app.static_folder)
+    compressed = sum(1 for asset in manifest.assets.values() if asset.gzip_path)
+    click.echo(f'Built {built} gzip variants; {compressed} of {len(manifest.urls)} static assets have one.')
@@ -0,0 +1,112 @@
+from datetime import date
+import hashlib
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from .cache import LRUCache
+from .schedule_data import entry_due_date, get_schedule_snapshot
+
+# Ages are measured from a fixed reference birthday, so "2 Months" and "8 Weeks"
+# land on comparable calendar-exact day counts instead of 30-day months
+_REFERENCE_DOB = date(2000, 1, 1)
+# Labels with no parseable offset other than birth sort after every real age
+_UNPARSED_AGE_DAYS = 10 ** 6
+_DIGIT_RE = re.compile(r'\d')
+# Rendered comparisons keyed by (schedule version, selected countries)
+_COMPARISONS = LRUCache(max_entries=256, sizeof=lambda item: 1)
+
+
+class ComparisonIndex(NamedTuple):
+    """Everything /compare needs for one schedule version, computed once."""
+    version: str
+    countries: Tuple[str, ...]
+    # (age label, days since birth) in canonical order across all countries
+    axis: Tuple[Tuple[str, int], ...]
+    # country -> age label -> vaccines (labels repeated within a country are merged)
+    vaccines_by_age: Dict[str, Dict[str, Tuple[str, ...]]]
+    reference_urls: Dict[str, str]
+    schedules: Dict[str, List[Dict[str, Any]]]
+
+
+_index_lock = threading.Lock()
+_index: Dict[str, ComparisonIndex] = {}
+
+
+def _age_days(entry) -> int:
+    # Numberless labels such as 'Every Year' get a default offset for due dates,
+    # but in a comparison they read as recurring doses, so they go last
+    if (entry.years or entry.months or entry.weeks) and _DIGIT_RE.search(entry.age):
+        return (entry_due_date(_REFERENCE_DOB, entry) - _REFERENCE_DOB).days
+    return 0 if 'birth' in entry.age.lower() else _UNPARSED_AGE_DAYS
+
+
+def get_comparison_index() -> ComparisonIndex:
+    """The comparison index of the schedules currently served (rebuilt after a reload)."""
+    snapshot = get_schedule_snapshot()
+    index = _index.get(snapshot.version)
+    if index is not None:
+        return index
+    with _index_lock:
+        index = _index.get(snapshot.version)
+        if index is None:
+            index = _build_index(snapshot)
+            # Only the current version is ever needed
+            _index.clear()
+            _index[snapshot.version] = index
+    return index
+
+
+def _build_index(snapshot) -> ComparisonIndex:
+    ages: Dict[str, int] = {}
+    vaccines_by_age: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+    for country, schedule in snapshot.compiled.items():
+        by_age: Dict[str, Tuple[str, ...]] = {}
+        for entry in schedule.entries:
+            by_age[entry.age] = by_age.get(entry.age, ()) + entry.vaccines
+            ages.setdefault(entry.age, _age_days(entry))
+        vaccines_by_age[country] = by_age
+    axis = tuple(sorted(ages.items(), key=lambda item: (item[1], item[0])))
+    return ComparisonIndex(
+        version=snapshot.version,
+        countries=tuple(snapshot.compiled),
+        axis=axis,
+        vaccines_by_age=vaccines_by_age,
+        reference_urls={c: s.reference_url for c, s in snapshot.compiled.items()},
+        schedules={c: cdata.get('schedule', []) for c, cdata in snapshot.data.items()},
+    )
+
+
+def normalize_countries(requested: Sequence[str], index: ComparisonIndex) -> Tuple[str, ...]:
+    """Known countries in request order without duplicates; India and UK when none are asked for."""
+    if not requested:
+        requested = ['India', 'UK']
+    selected = tuple(dict.fromkeys(c for c in requested if c in index.vaccines_by_age))
+    return selected or ('India',)
+
+
+def comparison_etag(index: ComparisonIndex, countries: Tuple[str, ...]) -> str:
+    return hashlib.sha256(repr((index.version, countries)).encode('utf-8')).hexdigest()[:32]
+
+
+def compare_countries(index: ComparisonIndex, countries: Tuple[str, ...]) -> Dict[str, Any]:
+    """Comparison rows for ``countries``: ages any of them schedule, in canonical order (memoized)."""
+    key = (index.version, countries)
+    result = _COMPARISONS.get(key)
+    if result is None:
+        rows = []
+        for age, days in index.axis:
+            if not any(age in index.vaccines_by_age[country] for country in countries):
+                continue
+            cells = {country: list(index.vaccines_by_age[country].get(age, ())) for country in countries}
+            rows.append({'age': age, 'age_days': None if days == _UNPARSED_AGE_DAYS else days, 'countries': cells})
+        result = {
+            'selected_countries': list(countries),
+            'comparison_table': rows,
+            'comparison_data': {
+                country: {'schedule': index.schedules.get(country, []), 'reference_url': index.reference_urls.get(country, '')}
+                for country in countries
+            },
+        }
+        _COMPARISONS.set(key, result)
+    return result
@@ -0,0 +1,69 @@
+from datetime import date
+from typing import Iterable, Mapping, Optional, Tuple
+
+from . import db
+from .models import Vaccination
+from .schedule_data import get_compiled_schedule, materialize_vaccinations
+from .status_summary import refresh_child_summaries
+
+
+def age_group_vaccines(country: Optional[str], age: str) -> Optional[Tuple[str, ...]]:
+    """Vaccines of the schedule age group labelled ``age``, or None if there is no such group."""
+    for entry in get_compiled_schedule(country or 'India').entries:
+        if entry.age == age:
+            return entry.vaccines
+    return None
+
+
+def vaccine_age_group(country: Optional[str], name: str) -> Optional[Tuple[str, ...]]:
+    """Vaccines of the age group that schedules ``name`` (legacy single-vaccine form posts)."""
+    for entry in get_compiled_schedule(country or 'India').entries:
+        if name in entry.vaccines:
+            return entry.vaccines
+    return None
+
+
+def complete_vaccinations(child, names: Iterable[str], completed_at: date) -> int:
+    """Mark the pending vaccinations ``names`` of ``child`` completed on ``completed_at``.
+
+    Missing schedule rows are inserted first; then a single
+    ``UPDATE ... WHERE child_id = ? AND name IN (...) AND completed_at IS NULL``
+    runs with the status-summary refresh, all in the caller's transaction. Already
+    completed vaccines keep their date. Returns the number of rows updated.
+    """
+    names = sorted(set(names))
+    if not names:
+        return 0
+    materialize_vaccinations([child], commit=False)
+    updated = db.session.execute(
+        db.update(Vaccination)
+        .where(Vaccination.child_id == child.id, Vaccination.name.in_(names), Vaccination.completed_at.is_(None))
+        .values(completed_at=completed_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated:
+        refresh_child_summaries([child.id])
+    return updated
+
+
+def import_completion_history(child, completions: Mapping[str, date]) -> int:
+    """Set the completion date of each vaccine in ``completions`` (e.g. from a paper record).
+
+    Unlike ``complete_vaccinations`` existing dates are overwritten. All dates are
+    written by one ``UPDATE ... SET completed_at = CASE name ... END`` in the
+    caller's transaction, together with the status-summary refresh. Returns the
+    number of rows updated.
+    """
+    if not completions:
+        return 0
+    materialize_vaccinations([child], commit=False)
+    names = sorted(completions)
+    updated = db.session.execute(
+        db.update(Vaccination)
+        .where(Vaccination.child_id == child.id, Vaccination.name.in_(names))
+        .values(completed_at=db.case({name: completions[name] for name in names}, value=Vaccination.name))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated:
+        refresh_child_summaries([child.id])
+    return updated
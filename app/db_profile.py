@@ -0,0 +1,81 @@
+import os
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event
+
+_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+_SYNCHRONOUS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def _setting(env: Mapping[str, str], key: str, default: str) -> str:
+    return (env.get(key) or default).strip()
+
+
+def sqlite_pragmas(env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """PRAGMAs applied to every new SQLite connection, overridable via ``SQLITE_*`` env vars.
+
+    Defaults suit several gunicorn workers sharing one file: WAL lets readers run
+    alongside a writer, busy_timeout makes writers wait instead of failing with
+    "database is locked", and synchronous=NORMAL is durable under WAL while
+    avoiding an fsync per commit.
+    """
+    env = os.environ if env is None else env
+    journal_mode = _setting(env, 'SQLITE_JOURNAL_MODE', 'WAL').upper()
+    synchronous = _setting(env, 'SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    if journal_mode not in _JOURNAL_MODES:
+        raise ValueError(f'Invalid SQLITE_JOURNAL_MODE: {journal_mode}')
+    if synchronous not in _SYNCHRONOUS:
+        raise ValueError(f'Invalid SQLITE_SYNCHRONOUS: {synchronous}')
+    return {
+        'journal_mode': journal_mode,
+        'busy_timeout': int(_setting(env, 'SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'synchronous': synchronous,
+        'mmap_size': int(_setting(env, 'SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        # Negative values are KiB: 64MB page cache per connection
+        'cache_size': int(_setting(env, 'SQLITE_CACHE_SIZE', '-65536')),
+        'temp_store': 'MEMORY',
+    }
+
+
+def engine_options(db_url: str, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """Return ``SQLALCHEMY_ENGINE_OPTIONS`` (pool settings) for ``db_url``."""
+    env = os.environ if env is None else env
+    if db_url.startswith('sqlite'):
+        if ':memory:' in db_url or db_url in ('sqlite://', 'sqlite:///'):
+            # In-memory databases use SQLAlchemy's single-connection pools
+            return {}
+        busy_timeout = sqlite_pragmas(env)['busy_timeout']
+        return {
+            'pool_size': int(_setting(env, 'DB_POOL_SIZE', '5')),
+            'max_overflow': int(_setting(env, 'DB_MAX_OVERFLOW', '10')),
+            'pool_timeout': 30,
+            # Python's sqlite3 lock wait, kept in step with busy_timeout
+            'connect_args': {'timeout': busy_timeout / 1000.0},
+        }
+    if db_url.startswith(('postgres', 'postgresql')):
+        statement_timeout = int(_setting(env, 'DB_STATEMENT_TIMEOUT_MS', '15000'))
+        return {
+            'pool_size': int(_setting(env, 'DB_POOL_SIZE', '5')),
+            'max_overflow': int(_setting(env, 'DB_MAX_OVERFLOW', '10')),
+            'pool_timeout': 30,
+            'pool_recycle': int(_setting(env, 'DB_POOL_RECYCLE', '1800')),
+            'pool_pre_ping': True,
+            'connect_args': {'options': f'-c statement_timeout={statement_timeout}'},
+        }
+    return {}
+
+
+def install_sqlite_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """Apply ``pragmas`` on every new DBAPI connection of a SQLite ``engine``."""
+    if engine.dialect.name != 'sqlite':
+        return
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
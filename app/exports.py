@@ -0,0 +1,389 @@
+"""Vaccine-record PDFs: rendering, per-child caching and streamed batch exports (ZIP)."""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from io import BytesIO
+import hashlib
+import multiprocessing
+import os
+from typing import Tuple
+import zipfile
+from zoneinfo import ZoneInfo
+
+from . import db
+from .child_caches import PDF_CACHE
+from .models import Child, Vaccination
+from .pdf_writer import stream_pdf
+from .schedule_data import build_schedule_for_child, get_schedule_version, virtual_vaccinations
+
+# Flate-compress PDF content streams (smaller downloads, but not greppable text)
+_PDF_COMPRESS = os.environ.get('PDF_COMPRESS_STREAMS', '0').lower() in ('1', 'true', 'yes')
+
+
+def uk_today() -> date:
+    try:
+        return datetime.now(ZoneInfo('Europe/London')).date()
+    except Exception:
+        return date.today()
+
+
+def _format_pdf_date(value) -> str:
+    if not value:
+        return '—'
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.strftime('%d %b %Y')
+
+
+def _build_vaccine_record_rows(vaccinations, today: date):
+    rows = []
+    for vac in vaccinations:
+        if vac.completed_at:
+            status = 'Completed'
+            display_date = _format_pdf_date(vac.completed_at)
+        elif not vac.due_date:
+            status = 'Due'
+            display_date = '—'
+        elif vac.due_date <= today:
+            status = 'Overdue'
+            display_date = _format_pdf_date(vac.due_date)
+        else:
+            status = 'Due'
+            display_date = _format_pdf_date(vac.due_date)
+        rows.append({
+            'vaccine': vac.name,
+            'status': status,
+            'date': display_date,
+        })
+    return rows
+
+
+def _build_grouped_vaccine_record_rows(schedule_entries, vaccinations, today: date):
+    vac_by_name = {v.name: v for v in vaccinations}
+    seen = set()
+    groups = []
+
+    for entry in schedule_entries or []:
+        age_label = entry.get('age') or 'Schedule'
+        group_rows = []
+        for vac_name in entry.get('vaccines') or []:
+            vac = vac_by_name.get(vac_name)
+            if not vac:
+                # Keep schedule completeness even if DB row doesn't exist yet.
+                due_date = entry.get('due_date')
+
+                class _TempVac:
+                    def __init__(self, name, due_date):
+                        self.name = name
+                        self.due_date = due_date
+                        self.completed_at = None
+
+                vac = _TempVac(vac_name, due_date)
+            row = _build_vaccine_record_rows([vac], today)[0]
+            group_rows.append(row)
+            seen.add(vac_name)
+        if group_rows:
+            groups.append({'age': age_label, 'rows': group_rows})
+
+    leftover = [v for v in vaccinations if v.name not in seen]
+    if leftover:
+        leftover_rows = _build_vaccine_record_rows(leftover, today)
+        groups.append({'age': 'Other', 'rows': leftover_rows})
+
+    return groups
+
+
+def _name_initials(name: str) -> str:
+    parts = [p for p in (name or '').split() if p]
+    if not parts:
+        return 'CH'
+    initials = ''.join(part[0] for part in parts if part and part[0].isalpha()).upper()
+    return initials or 'CH'
+
+
+def _escape_pdf_text(text: str) -> str:
+    safe = (text or '').replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return safe.encode('latin-1', errors='replace').decode('latin-1')
+
+
+def _pdf_text(x: int, y: int, text: str, font: str = 'F1', size: int = 10, color=(0, 0, 0)) -> str:
+    r, g, b = color
+    return f"BT {r:.3f} {g:.3f} {b:.3f} rg /{font} {size} Tf {x} {y} Td ({_escape_pdf_text(text)}) Tj ET"
+
+
+def _status_color(status: str):
+    if status == 'Completed':
+        return (0.020, 0.588, 0.412)
+    if status == 'Overdue':
+        return (0.863, 0.149, 0.149)
+    return (0.851, 0.467, 0.024)
+
+
+def _build_vaccine_record_stats(vaccinations, today: date):
+    due_soon_window = today + timedelta(days=30)
+    completed = sum(1 for v in vaccinations if v.completed_at)
+    overdue = sum(1 for v in vaccinations if (not v.completed_at) and v.due_date and v.due_date <= today)
+    due_soon = sum(1 for v in vaccinations if (not v.completed_at) and v.due_date and today < v.due_date <= due_soon_window)
+    return {
+        'completed': completed,
+        'overdue': overdue,
+        'due_soon': due_soon,
+        'total': len(vaccinations),
+    }
+
+
+_PDF_FIRST_TABLE_TOP = 699
+_PDF_NEXT_TABLE_TOP = 770
+_PDF_TABLE_BOTTOM = 94
+_PDF_LINE_HEIGHT = 11
+
+
+def _pdf_lines_per_page(top: int) -> int:
+    return (top - _PDF_TABLE_BOTTOM) // _PDF_LINE_HEIGHT + 1
+
+
+def _paginate_vaccine_record(groups):
+    """Split grouped rows into pages of table lines.
+
+    A group label is never left alone at the bottom of a page, and a group that
+    continues onto a new page repeats its label there.
+    """
+    pages = [[]]
+    lines_left = _pdf_lines_per_page(_PDF_FIRST_TABLE_TOP)
+    for group in groups or []:
+        label = group.get('age') or 'Schedule'
+        rows = group.get('rows') or []
+        if not rows:
+            continue
+        if lines_left < 2:
+            pages.append([])
+            lines_left = _pdf_lines_per_page(_PDF_NEXT_TABLE_TOP)
+        pages[-1].append({'kind': 'group', 'label': label})
+        lines_left -= 1
+        for row in rows:
+            if lines_left < 1:
+                pages.append([{'kind': 'group', 'label': f"{label} (cont.)"}])
+                lines_left = _pdf_lines_per_page(_PDF_NEXT_TABLE_TOP) - 1
+            pages[-1].append({'kind': 'row', 'row': row})
+            lines_left -= 1
+    return pages
+
+
+def _vaccine_record_page_commands(items, page_no: int, page_count: int, generated_on: date, child_name: str, parent_name: str, stats) -> bytes:
+    page_cmds = []
+    if page_no == 1:
+        page_cmds.append(_pdf_text(42, 805, 'Vaccination Record', font='F2', size=18))
+        page_cmds.append(_pdf_text(465, 805, 'VaxGuard', font='F2', size=12, color=(0.145, 0.388, 0.922)))
+        page_cmds.append(_pdf_text(42, 786, f"Generated on: {_format_pdf_date(generated_on)}"))
+        page_cmds.append(_pdf_text(42, 770, f"Child: {child_name}"))
+        page_cmds.append(_pdf_text(42, 754, f"Parent: {parent_name}"))
+        page_cmds.append(_pdf_text(42, 734, f"Overdue: {stats['overdue']}", font='F2', size=10, color=(0.863, 0.149, 0.149)))
+        page_cmds.append(_pdf_text(170, 734, f"Due Soon: {stats['due_soon']}", font='F2', size=10, color=(0.851, 0.467, 0.024)))
+        page_cmds.append(_pdf_text(312, 734, f"Complete: {stats['completed']}/{stats['total']}", font='F2', size=10, color=(0.020, 0.588, 0.412)))
+        header_y = 714
+        y = _PDF_FIRST_TABLE_TOP
+    else:
+        page_cmds.append(_pdf_text(42, 805, f"Vaccination Record - {child_name} (continued)", font='F2', size=12))
+        page_cmds.append(_pdf_text(465, 805, 'VaxGuard', font='F2', size=12, color=(0.145, 0.388, 0.922)))
+        header_y = 785
+        y = _PDF_NEXT_TABLE_TOP
+
+    if items:
+        page_cmds.append(_pdf_text(42, header_y, 'Vaccine', font='F2', size=9))
+        page_cmds.append(_pdf_text(375, header_y, 'Status', font='F2', size=9))
+        page_cmds.append(_pdf_text(462, header_y, 'Date', font='F2', size=9))
+        for item in items:
+            if item['kind'] == 'group':
+                page_cmds.append(_pdf_text(42, y, item['label'], font='F2', size=8, color=(0.122, 0.161, 0.235)))
+                y -= _PDF_LINE_HEIGHT
+                continue
+            row = item['row']
+            color = _status_color(row['status'])
+            page_cmds.append(_pdf_text(54, y, (row['vaccine'] or '')[:56], font='F1', size=8))
+            page_cmds.append(_pdf_text(375, y, row['status'], font='F2', size=8, color=color))
+            page_cmds.append(_pdf_text(462, y, row['date'], font='F2', size=8, color=color))
+            y -= _PDF_LINE_HEIGHT
+    elif page_no == 1:
+        page_cmds.append(_pdf_text(42, 697, 'No vaccination schedule available.', font='F1', size=11))
+
+    page_cmds.append(_pdf_text(42, 78, 'Due = upcoming based on schedule', size=9))
+    page_cmds.append(_pdf_text(42, 64, 'Overdue = past scheduled date', size=9))
+    page_cmds.append(_pdf_text(42, 32, 'VaxGuard', size=8))
+    page_cmds.append(_pdf_text(470, 32, f'Page {page_no} of {page_count}', size=8))
+    return '\n'.join(page_cmds).encode('latin-1', errors='replace')
+
+
+def _iter_vaccine_record_pdf(groups, generated_on: date, child_name: str, parent_name: str, stats, compress: bool = None):
+    """Yield the vaccine-record PDF in chunks, one page at a time."""
+    if compress is None:
+        compress = _PDF_COMPRESS
+    pages = _paginate_vaccine_record(groups)
+    page_count = len(pages)
+    contents = (
+        _vaccine_record_page_commands(items, page_no, page_count, generated_on, child_name, parent_name, stats)
+        for page_no, items in enumerate(pages, start=1)
+    )
+    return stream_pdf(contents, compress=compress)
+
+
+def _build_vaccine_record_pdf(groups, generated_on: date, child_name: str, parent_name: str, stats, compress: bool = None) -> bytes:
+    output = BytesIO()
+    for chunk in _iter_vaccine_record_pdf(groups, generated_on, child_name, parent_name, stats, compress=compress):
+        output.write(chunk)
+    return output.getvalue()
+
+
+def _vaccine_record_filename(child, generated_on: date, with_id: bool = False) -> str:
+    initials = _name_initials(child.name)
+    suffix = f"_{child.id}" if with_id else ''
+    return f"{initials}{suffix}_vaxguard_vaccine_record_{generated_on.strftime('%Y-%m-%d')}.pdf"
+
+
+def vaccine_record_export_jobs(children, generated_on: date):
+    """Return picklable render jobs for ``children`` without per-child queries.
+
+    Read-only: children (with parents) are reloaded in one query, every
+    child's vaccinations come from a single bulk SELECT and scheduled vaccines
+    without a row are rendered from the schedule.
+    """
+    child_ids = [c.id for c in children]
+    if not child_ids:
+        return []
+    by_id = {
+        c.id: c for c in Child.query.options(db.joinedload(Child.parent)).filter(Child.id.in_(child_ids)).all()
+    }
+    vaccinations = {cid: [] for cid in child_ids}
+    rows = Vaccination.query.filter(Vaccination.child_id.in_(child_ids)).order_by(
+        Vaccination.child_id.asc(),
+        Vaccination.due_date.asc(),
+        Vaccination.name.asc(),
+    ).all()
+    for vac in rows:
+        vaccinations[vac.child_id].append(vac)
+
+    jobs = []
+    for cid in child_ids:
+        child = by_id.get(cid)
+        if child is None:
+            continue
+        schedule_entries = build_schedule_for_child(child.dob, country=child.country or 'India')
+        vacs = vaccinations[cid]
+        parent_name = child.parent.name if child.parent and child.parent.name else 'Parent'
+        jobs.append((
+            _vaccine_record_filename(child, generated_on, with_id=True),
+            _build_grouped_vaccine_record_rows(schedule_entries, vacs, generated_on),
+            generated_on,
+            child.name or 'Child',
+            parent_name,
+            _build_vaccine_record_stats(vacs + virtual_vaccinations(child, vacs), generated_on),
+        ))
+    return jobs
+
+
+def _render_vaccine_record_job(job):
+    filename, groups, generated_on, child_name, parent_name, stats = job
+    return filename, _build_vaccine_record_pdf(groups, generated_on, child_name, parent_name, stats)
+
+
+def _pool_context():
+    # Never fork: the parent may hold threads (gunicorn gthread) and DB connections
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _iter_rendered_vaccine_records(jobs, workers: int = 1):
+    """Yield (filename, pdf bytes) as records finish rendering.
+
+    Records render inline by default. With more than one worker (the
+    export-records command on a multi-core host), they render in a process
+    pool with at most two jobs per worker in flight, so finished PDFs never
+    pile up in memory.
+    """
+    if workers <= 1 or len(jobs) < 2:
+        for job in jobs:
+            yield _render_vaccine_record_job(job)
+        return
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=_pool_context())
+    try:
+        queue = iter(jobs)
+        pending = {pool.submit(_render_vaccine_record_job, job) for _, job in zip(range(workers * 2), queue)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                job = next(queue, None)
+                if job is not None:
+                    pending.add(pool.submit(_render_vaccine_record_job, job))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _StreamSink:
+    """Write-only, non-seekable file object; zipfile then emits data descriptors."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_vaccine_records_zip(jobs, workers: int = 1):
+    """Yield a ZIP archive of rendered records, one entry at a time."""
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for filename, pdf_bytes in _iter_rendered_vaccine_records(jobs, workers):
+            zf.writestr(filename, pdf_bytes)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _vaccination_fingerprint(child_id: int) -> str:
+    """Digest of every (name, due date, completion date) of the child's rows.
+
+    Aggregates such as counts and max dates miss a re-dated completion, and other
+    processes never see this one's cache invalidation, so the full state is hashed.
+    """
+    rows = db.session.execute(
+        db.select(Vaccination.name, Vaccination.due_date, Vaccination.completed_at)
+        .where(Vaccination.child_id == child_id)
+        .order_by(Vaccination.name.asc())
+    ).all()
+    return hashlib.sha256(repr([tuple(row) for row in rows]).encode('utf-8')).hexdigest()
+
+
+def _vaccine_record_cache_key(child, parent_name: str, generated_on: date) -> str:
+    parts = (
+        child.id, child.name, child.dob, child.country, parent_name,
+        _vaccination_fingerprint(child.id), get_schedule_version(), generated_on,
+    )
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+    return f"{child.id}:{digest}"
+
+
+def vaccine_record_pdf(child, generated_on: date) -> Tuple[str, bytes, str]:
+    """Return ``(etag, pdf bytes, filename)`` of the child's vaccine record, rendered at most once per state."""
+    parent_name = child.parent.name if child.parent and child.parent.name else 'Parent'
+    cache_key = _vaccine_record_cache_key(child, parent_name, generated_on)
+    cached = PDF_CACHE.get(cache_key)
+    if cached is None:
+        # Read-only: scheduled vaccines without a row are rendered from the schedule
+        vaccinations = Vaccination.query.filter_by(child_id=child.id).order_by(
+            Vaccination.due_date.asc(),
+            Vaccination.name.asc(),
+        ).all()
+        schedule_entries = build_schedule_for_child(child.dob, child=child, country=child.country or 'India', vaccinations=vaccinations)
+        grouped_rows = _build_grouped_vaccine_record_rows(schedule_entries, vaccinations, generated_on)
+        stats = _build_vaccine_record_stats(vaccinations + virtual_vaccinations(child, vaccinations), generated_on)
+        pdf_bytes = _build_vaccine_record_pdf(grouped_rows, generated_on, child.name or 'Child', parent_name, stats)
+        cached = (hashlib.sha256(pdf_bytes).hexdigest(), pdf_bytes, _vaccine_record_filename(child, generated_on))
+        PDF_CACHE.set(cache_key, cached, tags=(child.id,))
+    return cached
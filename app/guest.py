@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from flask import session
+
+from .schedule_data import build_schedule_for_child, get_compiled_schedule
+
+# Guest profiles live in the server-side session under one key:
+#   {'name', 'dob' (ISO), 'country', 'layout', 'done'}
+# ``done[i]`` is the proleptic ordinal of the completion date of compiled-schedule
+# entry ``i`` (0 = not completed, trailing zeros trimmed). ``layout`` hashes the
+# country's age labels so positions recorded against another schedule are dropped.
+_SESSION_KEY = 'guest'
+
+
+class GuestChild(NamedTuple):
+    """Duck-types ``Child`` for schedule building and templates; guests have no id."""
+    name: str
+    dob: date
+    country: str
+    id: Optional[int] = None
+
+
+def _layout(country: str) -> str:
+    ages = '\n'.join(entry.age for entry in get_compiled_schedule(country).entries)
+    return hashlib.sha1(ages.encode('utf-8')).hexdigest()[:12]
+
+
+def _profile() -> Optional[dict]:
+    profile = session.get(_SESSION_KEY)
+    return profile if isinstance(profile, dict) else None
+
+
+def load_guest_child() -> Optional[GuestChild]:
+    """The session's guest child, or None when there is none (or it is unreadable)."""
+    profile = _profile()
+    if not profile:
+        return None
+    try:
+        dob = datetime.strptime(profile.get('dob') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    return GuestChild(profile.get('name') or '', dob, profile.get('country') or 'India')
+
+
+def guest_form_data() -> Optional[Dict[str, str]]:
+    profile = _profile()
+    if not profile:
+        return None
+    return {'child_name': profile.get('name') or '', 'dob': profile.get('dob') or '', 'country': profile.get('country') or 'India'}
+
+
+def _completion_ordinals(profile: dict, country: str) -> List[int]:
+    if profile.get('layout') != _layout(country):
+        return []
+    return [d if isinstance(d, int) else 0 for d in profile.get('done') or []]
+
+
+def save_guest_child(name: str, dob_str: str, country: str) -> None:
+    """Create or update the guest child; completions survive unless the schedule layout changes."""
+    previous = _profile() or {}
+    done = _completion_ordinals(previous, country) if previous.get('dob') == dob_str else []
+    session[_SESSION_KEY] = {'name': name, 'dob': dob_str, 'country': country, 'layout': _layout(country), 'done': done}
+
+
+def complete_guest_group(age: str, completed_at: date) -> bool:
+    """Record ``age``'s group as completed on ``completed_at``; False if there is no such group."""
+    profile = _profile()
+    if not profile:
+        return False
+    country = profile.get('country') or 'India'
+    entries = get_compiled_schedule(country).entries
+    position = next((i for i, entry in enumerate(entries) if entry.age == age), None)
+    if position is None:
+        return False
+    done = _completion_ordinals(profile, country)
+    done += [0] * (position + 1 - len(done))
+    done[position] = completed_at.toordinal()
+    # Reassign so the session notices the change (nested mutation is invisible to it)
+    session[_SESSION_KEY] = dict(profile, layout=_layout(country), done=done)
+    return True
+
+
+def _completed_positions(child: GuestChild) -> Dict[int, date]:
+    """Schedule position -> completion date of the guest's completed groups."""
+    profile = _profile() or {}
+    return {i: date.fromordinal(o) for i, o in enumerate(_completion_ordinals(profile, child.country)) if o > 0}
+
+
+def guest_schedule(child: GuestChild) -> Tuple[List[dict], dict]:
+    """Schedule entries and stats of the guest child, completion tracked per age group.
+
+    A vaccine name can recur across groups (e.g. DTaP, Hepatitis B), so completing
+    one group must never mark another group that shares a name.
+    """
+    entries = build_schedule_for_child(child.dob, child=None, country=child.country)
+    done = _completed_positions(child)
+    today = date.today()
+    due_soon_window = today + timedelta(days=30)
+    stats = {'completed': 0, 'overdue': 0, 'due_soon': 0, 'upcoming': 0, 'total': 0}
+    for position, entry in enumerate(entries):
+        count = len(entry['vaccines'])
+        stats['total'] += count
+        completed_at = done.get(position)
+        if completed_at:
+            entry.update(group_completed=True, group_completed_date=completed_at, status_class='status-completed', status_text='Completed')
+            stats['completed'] += count
+        elif entry['due_date'] <= today:
+            stats['overdue'] += count
+        elif entry['due_date'] <= due_soon_window:
+            stats['due_soon'] += count
+        else:
+            stats['upcoming'] += count
+    return entries, stats
+
+
+def guest_completions(child: GuestChild) -> Dict[str, date]:
+    """Completion dates to import into Vaccination rows, which exist once per vaccine name.
+
+    A row stands for the first group listing the name (its due date comes from
+    there), so a name counts as completed only when that group is.
+    """
+    done = _completed_positions(child)
+    completions: Dict[str, date] = {}
+    seen = set()
+    for position, entry in enumerate(get_compiled_schedule(child.country).entries):
+        for name in entry.vaccines:
+            if name in seen:
+                continue
+            seen.add(name)
+            if position in done:
+                completions[name] = done[position]
+    return completions
+
+
+def pop_guest_child():
+    """Remove the guest from the session; return ``(GuestChild, {vaccine: completed date})`` or None."""
+    child = load_guest_child()
+    completions = guest_completions(child) if child else {}
+    session.pop(_SESSION_KEY, None)
+    return (child, completions) if child else None
@@ -0,0 +1,171 @@
+"""Opt-in per-request instrumentation: SQL statement count/time, template time and latency.
+
+Enabled with ``INSTRUMENTATION_ENABLED=1``. When disabled nothing is registered,
+so there is no per-request or per-statement cost at all.
+"""
+import hmac
+import logging
+import threading
+import time
+from typing import Dict, List
+
+from flask import Response, abort, before_render_template, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Request latency histogram buckets (seconds)
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_MAX_CAPTURED_SQL = 100
+_LOOPBACK = ('127.0.0.1', '::1')
+
+
+class RequestMetrics:
+    """Per-endpoint aggregates rendered in Prometheus text format (per process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_endpoint: Dict[str, Dict] = {}
+
+    def observe(self, endpoint: str, latency: float, db_time: float, statements: int, template_time: float) -> None:
+        with self._lock:
+            m = self._by_endpoint.get(endpoint)
+            if m is None:
+                m = self._by_endpoint[endpoint] = {
+                    'count': 0, 'latency': 0.0, 'db_time': 0.0, 'statements': 0, 'template_time': 0.0,
+                    'buckets': [0] * len(_BUCKETS),
+                }
+            m['count'] += 1
+            m['latency'] += latency
+            m['db_time'] += db_time
+            m['statements'] += statements
+            m['template_time'] += template_time
+            for i, bound in enumerate(_BUCKETS):
+                if latency <= bound:
+                    m['buckets'][i] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = {ep: dict(m, buckets=list(m['buckets'])) for ep, m in sorted(self._by_endpoint.items())}
+        lines: List[str] = [
+            '# HELP vaxguard_request_duration_seconds End-to-end request latency by endpoint.',
+            '# TYPE vaxguard_request_duration_seconds histogram',
+        ]
+        for ep, m in snapshot.items():
+            for bound, n in zip(_BUCKETS, m['buckets']):
+                lines.append(f'vaxguard_request_duration_seconds_bucket{{endpoint="{ep}",le="{bound}"}} {n}')
+            lines.append(f'vaxguard_request_duration_seconds_bucket{{endpoint="{ep}",le="+Inf"}} {m["count"]}')
+            lines.append(f'vaxguard_request_duration_seconds_sum{{endpoint="{ep}"}} {m["latency"]:.6f}')
+            lines.append(f'vaxguard_request_duration_seconds_count{{endpoint="{ep}"}} {m["count"]}')
+        for name, key, help_text in (
+            ('vaxguard_db_statements_total', 'statements', 'SQL statements executed, by endpoint.'),
+            ('vaxguard_db_duration_seconds_total', 'db_time', 'Time spent executing SQL, by endpoint.'),
+            ('vaxguard_template_duration_seconds_total', 'template_time', 'Time spent rendering templates, by endpoint.'),
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for ep, m in snapshot.items():
+                value = m[key]
+                lines.append(f'{name}{{endpoint="{ep}"}} {value:.6f}' if isinstance(value, float) else f'{name}{{endpoint="{ep}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _current():
+    return g.get('_instrumentation') if has_app_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_instr_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_instr_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    state = _current()
+    if state is None:
+        return
+    state['statements'] += 1
+    state['db_time'] += elapsed
+    if len(state['sql']) < _MAX_CAPTURED_SQL:
+        state['sql'].append((elapsed, statement))
+
+
+def _handle_error(exception_context):
+    # The statement failed, so after_cursor_execute never runs: drop its start time
+    conn = exception_context.connection
+    started = conn.info.get('_instr_started') if conn is not None else None
+    if started:
+        started.pop()
+
+
+def _metrics_allowed(token: str) -> bool:
+    """With ``METRICS_TOKEN`` set, require it as a bearer token; otherwise only direct loopback scrapes."""
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        return hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8'))
+    # A local reverse proxy also connects from loopback; proxied requests carry X-Forwarded-For
+    return request.remote_addr in _LOOPBACK and 'X-Forwarded-For' not in request.headers
+
+
+def _before_render(sender, template, context, **extra):
+    state = _current()
+    if state is not None:
+        state['render_started'].append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    state = _current()
+    if state is not None and state['render_started']:
+        state['template_time'] += time.perf_counter() - state['render_started'].pop()
+
+
+def init_instrumentation(app, engine) -> None:
+    """Register request hooks, engine listeners and /metrics when enabled in config."""
+    if not app.config.get('INSTRUMENTATION_ENABLED'):
+        return
+    metrics = app.extensions['vaxguard_metrics'] = RequestMetrics()
+    slow_ms = float(app.config.get('SLOW_REQUEST_MS', 500))
+    metrics_token = app.config.get('METRICS_TOKEN') or ''
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def _start_request_timer():
+        g._instrumentation = {
+            'started': time.perf_counter(), 'statements': 0, 'db_time': 0.0, 'sql': [],
+            'template_time': 0.0, 'render_started': [],
+        }
+
+    @app.after_request
+    def _record_request(response):
+        state = g.pop('_instrumentation', None)
+        if state is None:
+            return response
+        latency = time.perf_counter() - state['started']
+        endpoint = request.endpoint or 'unknown'
+        metrics.observe(endpoint, latency, state['db_time'], state['statements'], state['template_time'])
+        response.headers.add('Server-Timing', (
+            f'db;dur={state["db_time"] * 1000:.2f};desc="{state["statements"]} queries", '
+            f'tpl;dur={state["template_time"] * 1000:.2f}, '
+            f'total;dur={latency * 1000:.2f}'
+        ))
+        if latency * 1000 >= slow_ms:
+            sql = '\n'.join(f'  [{t * 1000:.2f}ms] {s}' for t, s in state['sql'])
+            logger.warning(
+                'Slow request %s %s (%s): %.1fms, %d statements, %.1fms db, %.1fms templates\n%s',
+                request.method, request.path, endpoint, latency * 1000, state['statements'],
+                state['db_time'] * 1000, state['template_time'] * 1000, sql,
+            )
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        if not _metrics_allowed(metrics_token):
+            abort(403)
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,157 @@
+import logging
+import secrets
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_xact_lock
+_PG_LOCK_KEY = 0x5641584D  # 'VAXM'
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable
+
+
+def _add_child_country(conn) -> None:
+    columns = {col['name'] for col in inspect(conn).get_columns('children')}
+    if 'country' not in columns:
+        conn.execute(text("ALTER TABLE children ADD COLUMN country VARCHAR(50)"))
+    conn.execute(text("UPDATE children SET country = 'India' WHERE country IS NULL"))
+
+
+def _add_schedule_indexes(conn) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_vaccinations_child_due ON vaccinations (child_id, due_date)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_vaccinations_pending_due ON vaccinations (due_date, child_id) "
+        "WHERE completed_at IS NULL"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_children_parent_created ON children (parent_id, created_at)"))
+    # Superseded by the composite indexes above (same leading column)
+    conn.execute(text("DROP INDEX IF EXISTS ix_vaccinations_child_id"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_children_parent_id"))
+
+
+def _add_child_status_summary(conn) -> None:
+    # Rows are filled lazily: the dashboard summarizes children without a current summary
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS child_status_summary ("
+        "child_id INTEGER NOT NULL PRIMARY KEY REFERENCES children (id) ON DELETE CASCADE, "
+        "total INTEGER NOT NULL, "
+        "completed INTEGER NOT NULL, "
+        "pending_due JSON NOT NULL, "
+        "next_due_date DATE, "
+        "next_due_vaccines JSON NOT NULL, "
+        "schedule_version VARCHAR(64), "
+        "updated_at TIMESTAMP)"
+    ))
+
+
+def _add_children_keyset_index(conn) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_children_parent_created_id ON children (parent_id, created_at, id)"))
+    # Superseded by (parent_id, created_at, id), which also orders the keyset tie-breaker
+    conn.execute(text("DROP INDEX IF EXISTS ix_children_parent_created"))
+
+
+def _add_child_pending_due(conn) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS child_pending_due ("
+        "child_id INTEGER NOT NULL REFERENCES children (id) ON DELETE CASCADE, "
+        "due_date DATE NOT NULL, "
+        "count INTEGER NOT NULL, "
+        "PRIMARY KEY (child_id, due_date))"
+    ))
+    # Mark every summary stale so the next dashboard visit rewrites it together with its pending rows
+    conn.execute(text("UPDATE child_status_summary SET schedule_version = NULL"))
+
+
+def _add_calendar_secret_and_child_updated_at(conn) -> None:
+    if 'calendar_secret' not in {col['name'] for col in inspect(conn).get_columns('parents')}:
+        conn.execute(text("ALTER TABLE parents ADD COLUMN calendar_secret VARCHAR(32)"))
+    # Feed URLs issued before this migration were signed over the parent id alone and stop working
+    for (parent_id,) in conn.execute(text("SELECT id FROM parents WHERE calendar_secret IS NULL")).all():
+        conn.execute(text("UPDATE parents SET calendar_secret = :s WHERE id = :id"), {'s': secrets.token_urlsafe(16), 'id': parent_id})
+    if 'updated_at' not in {col['name'] for col in inspect(conn).get_columns('children')}:
+        conn.execute(text("ALTER TABLE children ADD COLUMN updated_at TIMESTAMP"))
+    conn.execute(text("UPDATE children SET updated_at = created_at WHERE updated_at IS NULL"))
+
+
+# Append only: a migration's version must never change once released
+MIGRATIONS = (
+    Migration(1, "Add children.country (defaults to 'India')", _add_child_country),
+    Migration(2, "Index vaccinations (child_id, due_date), pending due dates and children (parent_id, created_at)", _add_schedule_indexes),
+    Migration(3, "Add child_status_summary projection", _add_child_status_summary),
+    Migration(4, "Index children (parent_id, created_at, id) for keyset pagination", _add_children_keyset_index),
+    Migration(5, "Add child_pending_due counts for SQL dashboard totals", _add_child_pending_due),
+    Migration(6, "Add parents.calendar_secret and children.updated_at", _add_calendar_secret_and_child_updated_at),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _read_version(conn) -> Optional[int]:
+    """Return the stored schema version, or None if the version table does not exist yet."""
+    try:
+        with conn.begin_nested():
+            return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+    except DBAPIError:
+        return None
+
+
+def _write_version(conn, version: int) -> None:
+    updated = conn.execute(text("UPDATE schema_version SET version = :v WHERE id = 1"), {'v': version}).rowcount
+    if not updated:
+        conn.execute(text("INSERT INTO schema_version (id, version) VALUES (1, :v)"), {'v': version})
+
+
+@contextmanager
+def _migration_lock(engine):
+    """Yield a connection inside a transaction that only one process can hold at a time."""
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            # Take the write lock up front; other workers wait (busy_timeout) instead of racing
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+        elif dialect == 'postgresql':
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': _PG_LOCK_KEY})
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def run_migrations(engine, metadata) -> List[int]:
+    """Bring the database schema up to ``LATEST_VERSION``; return the versions applied.
+
+    The common case (schema current) costs a single SELECT. Otherwise the
+    migration lock is taken, the version is re-read and pending migrations run in
+    one transaction, so concurrent workers starting together migrate exactly once.
+    A database without a version row is stamped at the latest version when it was
+    just created from the models, and migrated from version 0 when it predates
+    versioning.
+    """
+    with engine.connect() as conn:
+        if _read_version(conn) == LATEST_VERSION:
+            return []
+    with _migration_lock(engine) as conn:
+        version = _read_version(conn)
+        if version == LATEST_VERSION:
+            return []
+        fresh = version is None and not inspect(conn).has_table('children')
+        metadata.create_all(conn)
+        applied = []
+        if fresh:
+            version = LATEST_VERSION
+        for migration in MIGRATIONS:
+            if migration.version > (version or 0):
+                logger.info('Applying migration %d: %s', migration.version, migration.description)
+                migration.apply(conn)
+                applied.append(migration.version)
+        _write_version(conn, LATEST_VERSION)
+    return applied
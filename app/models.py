@@ -1,7 +1,12 @@
 from datetime import datetime, timezone
+import secrets
 from . import db
 
 
+def new_calendar_secret() -> str:
+    return secrets.token_urlsafe(16)
+
+
 class Parent(db.Model):
     __tablename__ = 'parents'
     id = db.Column(db.Integer, primary_key=True)
@@ -10,6 +15,8 @@ class Parent(db.Model):
     email = db.Column(db.String(180), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Signed into the calendar feed URL; replacing it revokes every link issued so far
+    calendar_secret = db.Column(db.String(32), nullable=True, default=new_calendar_secret)
 
     children = db.relationship('Child', back_populates='parent', cascade='all, delete-orphan')
 
@@ -20,17 +27,26 @@ class Parent(db.Model):
 class Child(db.Model):
     __tablename__ = 'children'
     id = db.Column(db.Integer, primary_key=True)
-    parent_id = db.Column(db.Integer, db.ForeignKey('parents.id', ondelete='CASCADE'), nullable=False, index=True)
+    parent_id = db.Column(db.Integer, db.ForeignKey('parents.id', ondelete='CASCADE'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     dob = db.Column(db.Date, nullable=False)
     # Country for schedule selection (e.g., 'India', 'UK').
     # Keep nullable=True for backward compatibility with existing DBs created before this column existed.
     country = db.Column(db.String(50), nullable=True, default='India')
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Bumped on every edit so calendar Last-Modified follows renames and DOB/country changes
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationship to Vaccination records
     vaccinations = db.relationship('Vaccination', back_populates='child', cascade='all, delete-orphan')
     parent = db.relationship('Parent', back_populates='children')
+    status_summary = db.relationship('ChildStatusSummary', back_populates='child', cascade='all, delete-orphan', uselist=False)
+    pending_due_counts = db.relationship('ChildPendingDue', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Dashboard keyset pages / export listing: WHERE parent_id = ? ORDER BY created_at, id (also serves parent_id lookups)
+        db.Index('ix_children_parent_created_id', 'parent_id', 'created_at', 'id'),
+    )
 
     def __repr__(self):
         return f"<Child {self.id} {self.name}>"
@@ -39,7 +55,7 @@ class Child(db.Model):
 class Vaccination(db.Model):
     __tablename__ = 'vaccinations'
     id = db.Column(db.Integer, primary_key=True)
-    child_id = db.Column(db.Integer, db.ForeignKey('children.id', ondelete='CASCADE'), nullable=False, index=True)
+    child_id = db.Column(db.Integer, db.ForeignKey('children.id', ondelete='CASCADE'), nullable=False)
     name = db.Column(db.String(150), nullable=False)
     due_date = db.Column(db.Date, nullable=False)
     completed_at = db.Column(db.Date, nullable=True)
@@ -49,7 +65,64 @@ class Vaccination(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('child_id', 'name', name='uq_child_vaccine_name'),
+        # Per-child schedule reads ordered by due date (also serves child_id lookups)
+        db.Index('ix_vaccinations_child_due', 'child_id', 'due_date'),
+        # Pending-only due-date range scans (reminders, overdue counts); completed rows are not indexed
+        db.Index(
+            'ix_vaccinations_pending_due', 'due_date', 'child_id',
+            sqlite_where=db.text('completed_at IS NULL'),
+            postgresql_where=db.text('completed_at IS NULL'),
+        ),
     )
 
     def __repr__(self):
         return f"<Vaccination {self.id} child={self.child_id} {self.name} completed={self.completed_at is not None}>"
+
+
+class ChildStatusSummary(db.Model):
+    """Per-child vaccination status projection, rewritten whenever the child's vaccinations change.
+
+    ``pending_due`` holds ``[iso_due_date, count]`` pairs of incomplete vaccinations
+    in date order, so "overdue"/"due soon" as of any day are derived without
+    reading vaccination rows.
+    """
+    __tablename__ = 'child_status_summary'
+    child_id = db.Column(db.Integer, db.ForeignKey('children.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    pending_due = db.Column(db.JSON, nullable=False, default=list)
+    next_due_date = db.Column(db.Date, nullable=True)
+    next_due_vaccines = db.Column(db.JSON, nullable=False, default=list)
+    # Schedule version the child's rows were materialized against; a reload marks the summary stale
+    schedule_version = db.Column(db.String(64), nullable=True)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    child = db.relationship('Child', back_populates='status_summary')
+
+    def __repr__(self):
+        return f"<ChildStatusSummary child={self.child_id} {self.completed}/{self.total}>"
+
+
+class ChildPendingDue(db.Model):
+    """Incomplete vaccinations per child and due date, the relational twin of ``ChildStatusSummary.pending_due``.
+
+    Lets account-wide "overdue as of today" totals be one SQL ``SUM`` instead of
+    decoding every summary's JSON in Python. Rewritten with the summary.
+    """
+    __tablename__ = 'child_pending_due'
+    child_id = db.Column(db.Integer, db.ForeignKey('children.id', ondelete='CASCADE'), primary_key=True)
+    due_date = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ChildPendingDue child={self.child_id} {self.due_date} x{self.count}>"
+
+
+class SchemaVersion(db.Model):
+    """Single-row table holding the schema version applied by ``app.migrations``."""
+    __tablename__ = 'schema_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaVersion {self.version}>"
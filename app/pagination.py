@@ -0,0 +1,35 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from . import db
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque, URL-safe cursor for the row ``(created_at, row_id)``."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Return ``(created_at, row_id)`` from a cursor, None when empty; ValueError when malformed."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('ascii')
+        created_at, row_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f'Invalid cursor: {token}')
+
+
+def newest_first_after(created_col, id_col, cursor: Optional[Tuple[datetime, int]]):
+    """Keyset condition for rows after ``cursor`` in ``ORDER BY created_at DESC, id DESC``.
+
+    The leading ``created_at <=`` bound keeps the predicate an index range scan.
+    """
+    if cursor is None:
+        return db.true()
+    created_at, row_id = cursor
+    return db.and_(created_col <= created_at, db.or_(created_col < created_at, id_col < row_id))
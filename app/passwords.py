@@ -0,0 +1,116 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusy(Exception):
+    """Raised instead of queueing when the hashing pool already has its maximum backlog."""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Password hashing is saturated')
+        self.retry_after = retry_after
+
+
+def _canonical_method(method: str) -> str:
+    """The method string werkzeug stores in hashes made with ``method`` ('scrypt' -> 'scrypt:32768:8:1')."""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = args or (2 ** 15, 8, 1)
+        return f'scrypt:{int(n)}:{int(r)}:{int(p)}'
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    raise ValueError(f'Invalid PASSWORD_HASH_METHOD: {method}')
+
+
+class PasswordHasher:
+    """Hash and verify passwords on a bounded process pool, off the request thread.
+
+    At most ``max_pending`` operations may be queued or running in this process;
+    beyond that callers get ``HashingBusy`` at once rather than waiting behind the
+    backlog. The limit only bites with concurrent requests per process, hence the
+    threaded workers in gunicorn.conf.py.
+    ``workers=0`` hashes inline (still subject to the same admission limit).
+    """
+
+    def __init__(self, method: str = 'scrypt', salt_length: int = 16, workers: int = 2,
+                 max_pending: Optional[int] = None, retry_after: int = 1):
+        self.method = _canonical_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending if max_pending is not None else max(workers, 1) * 4
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created on first use, so app start-up (and forked web workers) do not pay for it.
+        # Workers come from a forkserver (or spawn), never a fork of a threaded web worker.
+        with self._lock:
+            if self._executor is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy(self.retry_after)
+        try:
+            if not self.workers:
+                return fn(*args)
+            try:
+                return self._pool().submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool and retry once
+                logger.warning('Password hashing pool broke; restarting it')
+                with self._lock:
+                    self._executor = None
+                return self._pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True when ``pwhash`` was made with other parameters than the configured ones."""
+        method, _, rest = (pwhash or '').partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.method or len(salt) != self.salt_length
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def init_password_hasher(app) -> None:
+    """Configure the app's PasswordHasher from PASSWORD_HASH_* environment variables."""
+    workers = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+    pending = os.environ.get('PASSWORD_HASH_MAX_PENDING')
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'),
+        salt_length=int(os.environ.get('PASSWORD_SALT_LENGTH', '16')),
+        workers=workers,
+        max_pending=int(pending) if pending else None,
+        retry_after=int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', '1')),
+    )
+
+
+def password_hasher() -> PasswordHasher:
+    return current_app.extensions['password_hasher']
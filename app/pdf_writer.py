@@ -0,0 +1,104 @@
+import zlib
+from typing import Iterable, Iterator
+
+_PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+_FONTS = (('F1', 'Helvetica'), ('F2', 'Helvetica-Bold'))
+
+
+class PdfWriter:
+    """Minimal streaming PDF writer: A4 pages, Helvetica fonts, one content stream per page.
+
+    Objects are serialized as soon as they are added and only their byte offsets
+    are kept for the xref table, so memory stays proportional to one page. Call
+    ``drain()`` to take the bytes produced so far (e.g. to yield them to a client).
+    """
+
+    def __init__(self, compress: bool = False, media_box=(0, 0, 595, 842)):
+        self.compress = compress
+        self._media_box = ' '.join(str(v) for v in media_box)
+        self._chunks = []
+        self._pos = 0
+        self._offsets = {}
+        self._next_id = 1
+        self._page_ids = []
+        self._closed = False
+        self._write(_PDF_HEADER)
+        self._font_ids = {
+            name: self._add_object(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} >>".encode('latin-1'))
+            for name, base in _FONTS
+        }
+        # Pages tree is written last (it lists every page) but pages reference it, so reserve its id now
+        self._pages_id = self._reserve()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def add_page(self, content: bytes) -> None:
+        """Append a page whose content stream is ``content`` (raw PDF operators)."""
+        if self._closed:
+            raise ValueError('PDF already closed')
+        if self.compress:
+            content = zlib.compress(content)
+            stream_dict = b"<< /Length %d /Filter /FlateDecode >>" % len(content)
+        else:
+            stream_dict = b"<< /Length %d >>" % len(content)
+        content_id = self._add_object(stream_dict + b"\nstream\n" + content + b"\nendstream")
+        fonts = ' '.join(f"/{name} {obj_id} 0 R" for name, obj_id in self._font_ids.items())
+        page_id = self._add_object((
+            "<< /Type /Page "
+            f"/Parent {self._pages_id} 0 R "
+            f"/MediaBox [{self._media_box}] "
+            f"/Contents {content_id} 0 R "
+            f"/Resources << /Font << {fonts} >> >> >>"
+        ).encode('latin-1'))
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        """Write the page tree, catalog, xref table and trailer."""
+        if self._closed:
+            return
+        kids = ' '.join(f"{pid} 0 R" for pid in self._page_ids)
+        self._add_object(
+            f"<< /Type /Pages /Count {len(self._page_ids)} /Kids [ {kids} ] >>".encode('latin-1'),
+            obj_id=self._pages_id,
+        )
+        catalog_id = self._add_object(f"<< /Type /Catalog /Pages {self._pages_id} 0 R >>".encode('latin-1'))
+        size = self._next_id
+        xref_pos = self._pos
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self._offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, size))
+        lines.append(f"trailer\n<< /Size {size} /Root {catalog_id} 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n")
+        self._write(''.join(lines).encode('latin-1'))
+        self._closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+    def _reserve(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write(self, data: bytes) -> None:
+        self._chunks.append(data)
+        self._pos += len(data)
+
+    def _add_object(self, body: bytes, obj_id: int = None) -> int:
+        if obj_id is None:
+            obj_id = self._reserve()
+        self._offsets[obj_id] = self._pos
+        self._write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+        return obj_id
+
+
+def stream_pdf(pages: Iterable[bytes], compress: bool = False) -> Iterator[bytes]:
+    """Yield a PDF document chunk by chunk, one chunk per page content stream."""
+    writer = PdfWriter(compress=compress)
+    for content in pages:
+        writer.add_page(content)
+        yield writer.drain()
+    writer.close()
+    yield writer.drain()
@@ -0,0 +1,168 @@
+import json
+import mailbox
+import os
+import sys
+from datetime import date, timedelta
+from email.message import EmailMessage
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, TextIO
+
+from . import db
+from .models import Child, Parent, Vaccination
+
+# Lead times in days: a pending vaccine is reminded when it is due in exactly this many days
+DEFAULT_WINDOWS = (0, 7, 30)
+
+
+class ReminderItem(NamedTuple):
+    child_id: int
+    child_name: str
+    vaccine: str
+    due_date: date
+    days_ahead: int
+
+
+class ParentReminder(NamedTuple):
+    parent_id: int
+    parent_name: str
+    email: str
+    items: tuple
+
+
+def parse_windows(value: Optional[str]) -> tuple:
+    """Parse ``"0,7,30"`` into sorted, de-duplicated non-negative lead days."""
+    if not value:
+        return DEFAULT_WINDOWS
+    windows = sorted({int(part) for part in value.split(',') if part.strip()})
+    if not windows or windows[0] < 0:
+        raise ValueError(f'Invalid reminder windows: {value}')
+    return tuple(windows)
+
+
+def iter_parent_reminders(today: date, windows: Sequence[int] = DEFAULT_WINDOWS, batch_size: int = 1000) -> Iterator[ParentReminder]:
+    """Yield one reminder per parent with pending vaccines due ``today + w`` for any window ``w``.
+
+    Parents are walked in keyset-paginated batches by id. Each batch costs one
+    query whose pending due-date lookup is an index range scan
+    (``ix_vaccinations_pending_due``), so a parent's reminder is always complete
+    within its batch and memory is bounded by ``batch_size`` parents whatever the
+    table size. Plain Core rows are used so nothing accumulates in the session.
+    """
+    due_dates = {today + timedelta(days=w): w for w in windows}
+    last_id = 0
+    while True:
+        parent_ids = db.session.execute(
+            db.select(Parent.id).where(Parent.id > last_id).order_by(Parent.id).limit(batch_size)
+        ).scalars().all()
+        if not parent_ids:
+            return
+        upper_id = parent_ids[-1]
+        rows = db.session.execute(
+            db.select(
+                Parent.id, Parent.name, Parent.email,
+                Child.id, Child.name,
+                Vaccination.name, Vaccination.due_date,
+            )
+            .join(Child, Child.parent_id == Parent.id)
+            .join(Vaccination, Vaccination.child_id == Child.id)
+            .where(
+                Parent.id > last_id,
+                Parent.id <= upper_id,
+                Vaccination.completed_at.is_(None),
+                Vaccination.due_date.between(min(due_dates), max(due_dates)),
+                Vaccination.due_date.in_(list(due_dates)),
+            )
+            .order_by(Parent.id, Vaccination.due_date, Child.id, Vaccination.name)
+        )
+        current = None
+        items: List[ReminderItem] = []
+        for parent_id, parent_name, email, child_id, child_name, vaccine, due_date in rows:
+            if current is not None and current[0] != parent_id:
+                yield ParentReminder(*current, tuple(items))
+                items = []
+            current = (parent_id, parent_name, email)
+            items.append(ReminderItem(child_id, child_name, vaccine, due_date, due_dates[due_date]))
+        if current is not None:
+            yield ParentReminder(*current, tuple(items))
+        last_id = upper_id
+
+
+def _when(days_ahead: int) -> str:
+    if days_ahead == 0:
+        return 'today'
+    return 'tomorrow' if days_ahead == 1 else f'in {days_ahead} days'
+
+
+def format_reminder(reminder: ParentReminder) -> str:
+    lines = [f"Hi {reminder.parent_name},", '', 'The following vaccinations are coming up:', '']
+    for item in reminder.items:
+        lines.append(f"- {item.child_name}: {item.vaccine} due {_when(item.days_ahead)} ({item.due_date.strftime('%d %b %Y')})")
+    lines += ['', 'You can mark them complete in VaxGuard once given.']
+    return '\n'.join(lines)
+
+
+class JsonLinesSink:
+    """Write one JSON object per parent reminder to a text stream."""
+
+    def __init__(self, stream: TextIO, owns_stream: bool = False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+
+    def send(self, reminder: ParentReminder) -> None:
+        self.stream.write(json.dumps({
+            'parent_id': reminder.parent_id,
+            'email': reminder.email,
+            'items': [
+                {'child_id': i.child_id, 'child': i.child_name, 'vaccine': i.vaccine, 'due_date': i.due_date.isoformat(), 'days_ahead': i.days_ahead}
+                for i in reminder.items
+            ],
+        }) + '\n')
+
+    def close(self) -> None:
+        if self.owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class MaildirSink:
+    """Deliver each parent reminder as an email message into a local Maildir."""
+
+    def __init__(self, path: str, sender: str = 'reminders@vaxguard.local'):
+        self.mailbox = mailbox.Maildir(path, create=True)
+        self.sender = sender
+
+    def send(self, reminder: ParentReminder) -> None:
+        msg = EmailMessage()
+        msg['From'] = self.sender
+        msg['To'] = reminder.email
+        msg['Subject'] = f"Vaccination reminder: {len(reminder.items)} due soon"
+        msg.set_content(format_reminder(reminder))
+        self.mailbox.add(msg)
+
+    def close(self) -> None:
+        self.mailbox.close()
+
+
+def make_sink(spec: str):
+    """Build a sink from ``maildir:PATH`` or ``jsonl:PATH`` (``jsonl:-`` for stdout)."""
+    kind, _, target = spec.partition(':')
+    if kind == 'maildir' and target:
+        return MaildirSink(os.path.expanduser(target))
+    if kind == 'jsonl' and target == '-':
+        return JsonLinesSink(sys.stdout)
+    if kind == 'jsonl' and target:
+        return JsonLinesSink(open(os.path.expanduser(target), 'a', encoding='utf-8'), owns_stream=True)
+    raise ValueError(f'Unknown reminder sink: {spec}')
+
+
+def run_reminder_scan(sink, today: date, windows: Sequence[int] = DEFAULT_WINDOWS, batch_size: int = 1000) -> Dict[str, int]:
+    """Send every parent reminder for ``today`` to ``sink``; return parent/item counts."""
+    parents = items = 0
+    try:
+        for reminder in iter_parent_reminders(today, windows, batch_size):
+            sink.send(reminder)
+            parents += 1
+            items += len(reminder.items)
+    finally:
+        sink.close()
+    return {'parents': parents, 'items': items}
@@ -0,0 +1,21 @@
+from typing import Any, Callable, Hashable
+
+from flask import g, has_request_context, request
+
+_MEMO_ATTR = '_request_memo'
+
+
+def request_memo(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Return ``compute()``, evaluated at most once per request for ``key``.
+
+    Values live on the request object, not ``g``: an app context can outlive many
+    requests (tests, CLI). Outside a request they are kept for the app context.
+    """
+    holder = request._get_current_object() if has_request_context() else g._get_current_object()
+    memo = getattr(holder, _MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(holder, _MEMO_ATTR, memo)
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
@@ -1,35 +1,202 @@
 from datetime import date, timedelta
+import hashlib
 import json
+import logging
 import os
 import re
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
 from . import db
 from .models import Vaccination
 
-# Lazy-loaded cache
-_SCHEDULE_DATA: Optional[Dict[str, Any]] = None
+logger = logging.getLogger(__name__)
 
-def _load_schedules() -> Dict[str, Any]:
-    global _SCHEDULE_DATA
-    if _SCHEDULE_DATA is not None:
-        return _SCHEDULE_DATA
-    # schedules.json is placed under app/static for easy serving
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    json_path = os.path.join(base_dir, 'static', 'schedules.json')
-    try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            _SCHEDULE_DATA = json.load(f)
-    except Exception:
-        # Fallback: minimal India-only if file missing
-        _SCHEDULE_DATA = {
-            'India': {
-                'reference_url': 'https://iapindia.org/pdf/Indian-Pediatrics/2024/Indian-Pediatrics-February-2024-issue.pdf',
-                'schedule': [
-                    {"age": "Birth", "vaccines": ["BCG", "OPV 0", "Hepatitis B-1"]}
-                ]
-            }
+
+class CompiledEntry(NamedTuple):
+    """One age group of a schedule with its label pre-parsed into offsets from DOB."""
+    age: str
+    vaccines: Tuple[str, ...]
+    years: int
+    months: int
+    weeks: int
+
+
+class CompiledSchedule(NamedTuple):
+    country: str
+    reference_url: str
+    entries: Tuple[CompiledEntry, ...]
+
+
+class VirtualVaccination(NamedTuple):
+    """Stand-in for a scheduled vaccine that has no Vaccination row yet (read path only)."""
+    child_id: Optional[int]
+    name: str
+    due_date: date
+    completed_at: Optional[date] = None
+    id: Optional[int] = None
+
+
+class ScheduleSnapshot(NamedTuple):
+    """An immutable, validated and compiled version of schedules.json."""
+    data: Dict[str, Any]
+    compiled: Dict[str, CompiledSchedule]
+    version: str
+    stat_key: Optional[Tuple[int, int]]
+
+
+_FALLBACK_SCHEDULES = {
+    'India': {
+        'reference_url': 'https://iapindia.org/pdf/Indian-Pediatrics/2024/Indian-Pediatrics-February-2024-issue.pdf',
+        'schedule': [
+            {"age": "Birth", "vaccines": ["BCG", "OPV 0", "Hepatitis B-1"]}
+        ]
+    }
+}
+
+
+def _validate_schedules(data: Any) -> None:
+    """Raise ValueError unless ``data`` has the shape schedules.json is expected to have."""
+    if not isinstance(data, dict) or not data:
+        raise ValueError('schedules must be a non-empty object keyed by country')
+    for country, cdata in data.items():
+        if not isinstance(cdata, dict) or not isinstance(cdata.get('schedule'), list):
+            raise ValueError(f'{country}: missing "schedule" list')
+        if not isinstance(cdata.get('reference_url', ''), str):
+            raise ValueError(f'{country}: "reference_url" must be a string')
+        for item in cdata['schedule']:
+            if not isinstance(item, dict) or not isinstance(item.get('age'), str):
+                raise ValueError(f'{country}: every schedule item needs an "age" label')
+            vaccines = item.get('vaccines')
+            if not isinstance(vaccines, list) or not all(isinstance(v, str) and v for v in vaccines):
+                raise ValueError(f'{country} {item["age"]}: "vaccines" must be a list of names')
+
+
+class ScheduleRegistry:
+    """Serves the current schedules and hot-reloads them when the JSON file changes.
+
+    The file is stat()ed at most once per ``check_interval`` seconds; a change in
+    mtime/size triggers a reload that is validated and compiled before the new
+    snapshot is swapped in. If the new file is unreadable or invalid the previous
+    snapshot keeps being served. The bundled India fallback is only used when no
+    valid version was ever loaded.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot: Optional[ScheduleSnapshot] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> ScheduleSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or time.monotonic() >= self._next_check:
+                self._refresh()
+                self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force a stat() on the next access (e.g. after writing the file)."""
+        self._next_check = 0.0
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self) -> None:
+        stat_key = self._stat_key()
+        current = self._snapshot
+        if current is not None and stat_key == current.stat_key:
+            return
+        try:
+            if stat_key is None:
+                raise FileNotFoundError(self.path)
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw.decode('utf-8'))
+            _validate_schedules(data)
+            snapshot = ScheduleSnapshot(data, _compile_schedules(data), hashlib.sha256(raw).hexdigest()[:16], stat_key)
+        except Exception:
+            if current is not None:
+                logger.exception('Ignoring invalid schedules file %s; keeping version %s', self.path, current.version)
+                # Remember the bad stat key so the broken file is not re-parsed every interval
+                self._snapshot = current._replace(stat_key=stat_key)
+                return
+            logger.exception('Could not load schedules file %s; using built-in fallback', self.path)
+            data = _FALLBACK_SCHEDULES
+            raw = json.dumps(data, sort_keys=True).encode('utf-8')
+            snapshot = ScheduleSnapshot(data, _compile_schedules(data), hashlib.sha256(raw).hexdigest()[:16], stat_key)
+        self._snapshot = snapshot
+
+
+# schedules.json is placed under app/static for easy serving
+_SCHEDULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'schedules.json')
+_REGISTRY = ScheduleRegistry(_SCHEDULES_PATH, float(os.environ.get('SCHEDULE_RELOAD_INTERVAL', '5')))
+
+
+def configure_schedule_registry(path: Optional[str] = None, check_interval: Optional[float] = None) -> ScheduleRegistry:
+    """Point the process-wide registry at another file and/or change its check interval."""
+    if path is not None and path != _REGISTRY.path:
+        with _REGISTRY._lock:
+            _REGISTRY.path = path
+            _REGISTRY._snapshot = None
+    if check_interval is not None:
+        _REGISTRY.check_interval = check_interval
+    _REGISTRY.invalidate()
+    return _REGISTRY
+
+
+def get_schedule_snapshot() -> ScheduleSnapshot:
+    return _REGISTRY.current()
+
+
+def get_schedule_version() -> str:
+    """Short content hash of the schedules currently being served."""
+    return _REGISTRY.current().version
+
+
+_DEFAULT_COUNTRY = 'India'
+# Template defaults of the current schedule version (at most one entry)
+_REFERENCE_DEFAULTS: Dict[str, Dict[str, Any]] = {}
+
+
+def get_reference_defaults() -> Dict[str, Any]:
+    """Schedule-derived template globals (reference link, country list), built once per version."""
+    snapshot = _REGISTRY.current()
+    defaults = _REFERENCE_DEFAULTS.get(snapshot.version)
+    if defaults is None:
+        default = snapshot.data.get(_DEFAULT_COUNTRY)
+        defaults = {
+            'reference_url': default.get('reference_url') if isinstance(default, dict) else None,
+            'reference_label': 'Official schedule',
+            'current_country': _DEFAULT_COUNTRY,
+            'available_countries': tuple(snapshot.data),
         }
-    return _SCHEDULE_DATA
+        _REFERENCE_DEFAULTS.clear()
+        _REFERENCE_DEFAULTS[snapshot.version] = defaults
+    return defaults
+
+
+def _load_schedules() -> Dict[str, Any]:
+    return _REGISTRY.current().data
+
+def _compile_schedules(data: Dict[str, Any]) -> Dict[str, CompiledSchedule]:
+    """Parse every age label once so due dates become plain integer arithmetic."""
+    compiled = {}
+    for country, cdata in data.items():
+        entries = []
+        for item in cdata.get('schedule', []):
+            years, months, weeks = _parse_age_offset(item['age'])
+            entries.append(CompiledEntry(item['age'], tuple(item['vaccines']), years, months, weeks))
+        compiled[country] = CompiledSchedule(country, cdata.get('reference_url', ''), tuple(entries))
+    return compiled
 
 def get_countries() -> List[str]:
     return list(_load_schedules().keys())
@@ -47,10 +214,17 @@ def get_schedule(country: str) -> Tuple[List[Dict[str, Any]], str]:
     cdata = data.get(ckey, {})
     return cdata.get('schedule', []), cdata.get('reference_url', '')
 
-def _calc_due_date(dob: date, age_label: str) -> date:
+def get_compiled_schedule(country: Optional[str]) -> CompiledSchedule:
+    """Return the precompiled schedule for ``country`` (falls back to India like get_schedule)."""
+    compiled = _REGISTRY.current().compiled
+    ckey = country if country in compiled else 'India'
+    return compiled.get(ckey) or CompiledSchedule(ckey, '', ())
+
+def _parse_age_offset(age_label: str) -> Tuple[int, int, int]:
+    """Parse an age label like '3 Years 4 Months' into (years, months, weeks)."""
     label = (age_label or '').strip()
     if not label:
-        return dob
+        return 0, 0, 0
     # Handle ranges by taking the first number (e.g., '16-18 Months' -> 16 Months)
     label = re.sub(r"(\d+)\s*-\s*\d+", r"\1", label)
     # Sum all occurrences like '3 Years', '4 Months', '6 Weeks'
@@ -74,47 +248,163 @@ def _calc_due_date(dob: date, age_label: str) -> date:
             month_sum = 1
         elif re.search(r"week", label, re.IGNORECASE):
             week_sum = 1
-        else:
-            return dob
-    # Apply additions
+    return year_sum, month_sum, week_sum
+
+def _apply_offset(dob: date, years: int, months: int, weeks: int) -> date:
     d = dob
-    if year_sum:
+    if years:
         try:
-            d = date(d.year + year_sum, d.month, d.day)
+            d = date(d.year + years, d.month, d.day)
         except ValueError:
-            d = date(d.year + year_sum, d.month, min(d.day, 28))
-    if month_sum:
-        month = d.month - 1 + month_sum
+            d = date(d.year + years, d.month, min(d.day, 28))
+    if months:
+        month = d.month - 1 + months
         year = d.year + month // 12
         month = month % 12 + 1
         day = min(d.day, [31,29 if year%4==0 and (year%100!=0 or year%400==0) else 28,31,30,31,30,31,31,30,31,30,31][month-1])
         d = date(year, month, day)
-    if week_sum:
-        d = d + timedelta(weeks=week_sum)
+    if weeks:
+        d = d + timedelta(weeks=weeks)
     return d
 
-def build_schedule_for_child(dob: date, child=None, country: Optional[str] = None):
-    """Return schedule entries and ensure Vaccination rows exist.
+def _calc_due_date(dob: date, age_label: str) -> date:
+    return _apply_offset(dob, *_parse_age_offset(age_label))
+
+def entry_due_date(dob: date, entry: CompiledEntry) -> date:
+    return _apply_offset(dob, entry.years, entry.months, entry.weeks)
+
+def _insert_missing_vaccinations(rows: List[Dict[str, Any]]) -> None:
+    """Insert ``rows`` in one statement, ignoring rows that already exist.
+
+    Concurrent requests may materialize the same child at the same time, so the
+    insert relies on ``uq_child_vaccine_name`` rather than a prior existence check.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(Vaccination).on_conflict_do_nothing(constraint='uq_child_vaccine_name')
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(Vaccination).on_conflict_do_nothing(index_elements=['child_id', 'name'])
+    else:
+        from sqlalchemy import insert
+        stmt = insert(Vaccination)
+    db.session.execute(stmt, rows)
+
+
+def _missing_vaccination_rows(child_id: int, dob: date, schedule: CompiledSchedule, existing_names) -> List[Dict[str, Any]]:
+    """Return insert rows for scheduled vaccines not in ``existing_names``.
+
+    A vaccine listed in several age groups keeps the due date of its first group.
+    """
+    missing = {}
+    for entry in schedule.entries:
+        due = None
+        for vac_name in entry.vaccines:
+            if vac_name in existing_names or vac_name in missing:
+                continue
+            if due is None:
+                due = entry_due_date(dob, entry)
+            missing[vac_name] = due
+    return [{'child_id': child_id, 'name': name, 'due_date': due} for name, due in missing.items()]
+
+
+def virtual_vaccinations(child, existing) -> List[VirtualVaccination]:
+    """Return unsaved rows for the child's scheduled vaccines missing from ``existing``."""
+    schedule = get_compiled_schedule(child.country or 'India')
+    names = {v.name for v in existing}
+    return [VirtualVaccination(**row) for row in _missing_vaccination_rows(child.id, child.dob, schedule, names)]
 
-    If a child model is provided, create Vaccination rows for each vaccine if missing.
+
+def _commit_vaccination_rows(rows: List[Dict[str, Any]], child_ids) -> bool:
+    """Insert ``rows`` and refresh the status summaries of ``child_ids`` in one transaction."""
+    from .status_summary import refresh_child_summaries
+    try:
+        _insert_missing_vaccinations(rows)
+        refresh_child_summaries(child_ids)
+        db.session.commit()
+        return True
+    except Exception:
+        db.session.rollback()
+        return False
+
+
+def replace_vaccinations(child) -> None:
+    """Recreate the child's rows for its current DOB and schedule in the caller's transaction (no commit)."""
+    Vaccination.query.filter_by(child_id=child.id).delete()
+    _insert_missing_vaccinations(_missing_vaccination_rows(child.id, child.dob, get_compiled_schedule(child.country), ()))
+
+
+def materialize_vaccinations(children, commit: bool = True) -> bool:
+    """Create missing Vaccination rows for every child in ``children`` in one batch.
+
+    Uses one SELECT over (child_id, name) for all children and, only if something
+    is missing, one bulk INSERT plus a status-summary refresh for ``children`` and
+    a single commit. Returns True when rows were inserted (the commit expires
+    loaded instances, so callers may want to reload). With ``commit=False`` the
+    INSERT and refresh run in the caller's transaction instead.
+    """
+    children = [c for c in children if c is not None]
+    if not children:
+        return False
+    existing: Dict[int, set] = {c.id: set() for c in children}
+    res = db.session.execute(
+        db.select(Vaccination.child_id, Vaccination.name).where(Vaccination.child_id.in_(list(existing)))
+    )
+    for child_id, name in res:
+        existing[child_id].add(name)
+    rows = []
+    for c in children:
+        schedule = get_compiled_schedule(c.country or 'India')
+        rows.extend(_missing_vaccination_rows(c.id, c.dob, schedule, existing[c.id]))
+    if not rows:
+        return False
+    if not commit:
+        from .status_summary import refresh_child_summaries
+        _insert_missing_vaccinations(rows)
+        refresh_child_summaries(list(existing))
+        return True
+    return _commit_vaccination_rows(rows, list(existing))
+
+
+def _materialize_vaccinations(child, dob: date, schedule: CompiledSchedule) -> Dict[str, Vaccination]:
+    """Return the child's Vaccination rows by name, creating any that are missing.
+
+    Costs one SELECT when nothing is missing; otherwise one SELECT, one bulk
+    INSERT, the status-summary refresh, a commit and one SELECT reloading the
+    (now expired) rows, whatever the schedule size.
+    """
+    child_id = child.id
+    existing = {v.name: v for v in Vaccination.query.filter_by(child_id=child_id).all()}
+    rows = _missing_vaccination_rows(child_id, dob, schedule, existing)
+    if not rows or not _commit_vaccination_rows(rows, [child_id]):
+        return existing
+    return {v.name: v for v in Vaccination.query.filter_by(child_id=child_id).all()}
+
+
+def build_schedule_for_child(dob: date, child=None, country: Optional[str] = None, vaccinations=None):
+    """Return schedule entries for ``dob``, joined with the child's Vaccination rows.
+
+    If a child model is provided without ``vaccinations``, missing Vaccination rows
+    are created (write endpoints only). Passing the child's already loaded
+    ``vaccinations`` instead joins them in memory and fills the gaps with
+    ``VirtualVaccination`` rows, without touching the database.
     """
     today = date.today()
     entries = []
-    schedule, _ref = get_schedule(country or getattr(child, 'country', None) or 'India')
-
-    for item in schedule:
-        due = _calc_due_date(dob, item['age'])
-        # For each vaccine in group ensure a Vaccination record exists
-        vaccine_records = []
-        if child is not None:
-            for vac_name in item['vaccines']:
-                vac = Vaccination.query.filter_by(child_id=child.id, name=vac_name).first()
-                if not vac:
-                    vac = Vaccination(child_id=child.id, name=vac_name, due_date=due)
-                    db.session.add(vac)
-                    vaccine_records.append(vac)
-                else:
-                    vaccine_records.append(vac)
+    schedule = get_compiled_schedule(country or getattr(child, 'country', None) or 'India')
+    if child is None:
+        vac_by_name = {}
+    elif vaccinations is not None:
+        vac_by_name = {v.name: v for v in vaccinations}
+        for row in _missing_vaccination_rows(child.id, dob, schedule, vac_by_name):
+            vac_by_name[row['name']] = VirtualVaccination(**row)
+    else:
+        vac_by_name = _materialize_vaccinations(child, dob, schedule)
+
+    for item in schedule.entries:
+        due = entry_due_date(dob, item)
+        vaccine_records = [vac_by_name[n] for n in item.vaccines if n in vac_by_name]
         # Determine status based on any not completed vaccines in that age group
         group_completed = all(v.completed_at for v in vaccine_records) if vaccine_records else False
         group_completed_date = None
@@ -135,8 +425,8 @@ def build_schedule_for_child(dob: date, child=None, country: Optional[str] = Non
                 status_class = 'status-upcoming'
                 status_text = 'Upcoming'
         entries.append({
-            'age': item['age'],
-            'vaccines': item['vaccines'],
+            'age': item.age,
+            'vaccines': item.vaccines,
             'due_date': due,
             'status_class': status_class,
             'status_text': status_text,
@@ -144,9 +434,4 @@ def build_schedule_for_child(dob: date, child=None, country: Optional[str] = Non
             'group_completed': group_completed,
             'group_completed_date': group_completed_date,
         })
-    if child is not None:
-        try:
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
     return entries
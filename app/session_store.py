@@ -0,0 +1,258 @@
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+logger = logging.getLogger(__name__)
+
+# Session ids are token_urlsafe(32): 43 URL-safe characters, safe as file names
+_SID_RE = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+# Stores by (backend, absolute path), shared by every app in the process
+_STORES: Dict[Tuple[str, str], object] = {}
+_STORES_LOCK = threading.Lock()
+
+
+class SqliteSessionStore:
+    """Sessions in a local SQLite file: one row per id with its serialized data and expiry."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)')
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid: str, now: float) -> Optional[Tuple[str, float]]:
+        """Return ``(data, expires_at)`` of a live session, or None."""
+        row = self._conn().execute('SELECT data, expires_at FROM sessions WHERE id = ? AND expires_at > ?', (sid, now)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def save(self, sid: str, data: str, expires_at: float) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT INTO sessions (id, data, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at',
+                (sid, data, expires_at),
+            )
+
+    def touch(self, sid: str, expires_at: float) -> None:
+        with self._conn() as conn:
+            conn.execute('UPDATE sessions SET expires_at = ? WHERE id = ?', (expires_at, sid))
+
+    def delete(self, sid: str) -> None:
+        with self._conn() as conn:
+            conn.execute('DELETE FROM sessions WHERE id = ?', (sid,))
+
+    def sweep(self, now: float) -> int:
+        with self._conn() as conn:
+            return conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,)).rowcount
+
+
+class FileSessionStore:
+    """Sessions as one file per id in a directory; the first line holds the expiry timestamp."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid: str) -> str:
+        return os.path.join(self.directory, sid)
+
+    def _read(self, path: str):
+        try:
+            with open(path, encoding='utf-8') as fh:
+                expires_at, _, data = fh.read().partition('\n')
+            return float(expires_at), data
+        except (OSError, ValueError):
+            return None, None
+
+    def load(self, sid: str, now: float) -> Optional[Tuple[str, float]]:
+        expires_at, data = self._read(self._path(sid))
+        return (data, expires_at) if expires_at is not None and expires_at > now else None
+
+    def save(self, sid: str, data: str, expires_at: float) -> None:
+        # Write-then-rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            fh.write(f'{expires_at}\n{data}')
+        os.replace(tmp, self._path(sid))
+
+    def touch(self, sid: str, expires_at: float) -> None:
+        _old, data = self._read(self._path(sid))
+        if data is not None:
+            self.save(sid, data, expires_at)
+
+    def delete(self, sid: str) -> None:
+        try:
+            os.remove(self._path(sid))
+        except FileNotFoundError:
+            pass
+
+    def sweep(self, now: float) -> int:
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not _SID_RE.match(name):
+                continue
+            expires_at, _data = self._read(self._path(name))
+            if expires_at is not None and expires_at <= now:
+                self.delete(name)
+                removed += 1
+        return removed
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid: Optional[str] = None, expires_at: float = 0.0):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = sid is None
+        self.modified = False
+        # Set by regenerate(); its stored row is deleted when the session is saved
+        self.previous_sid: Optional[str] = None
+
+    def regenerate(self) -> None:
+        """Move the data to a fresh id, so an id known before a login cannot ride on it."""
+        if self.sid is not None:
+            self.previous_sid = self.sid
+        self.sid = None
+        self.new = True
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keep session data in ``store``; the cookie only carries an opaque random id.
+
+    Sessions expire ``ttl`` seconds after their last write. An unmodified session
+    is re-stamped at most once per half ``ttl``, so reads do not write.
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, store, ttl: float):
+        self.store = store
+        self.ttl = ttl
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_RE.match(sid):
+            stored = self.store.load(sid, time.time())
+            if stored is not None:
+                data, expires_at = stored
+                try:
+                    return ServerSideSession(self.serializer.loads(data), sid=sid, expires_at=expires_at)
+                except ValueError:
+                    logger.warning('Discarding unreadable session %s', sid[:8])
+        return ServerSideSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.previous_sid is not None:
+            self.store.delete(session.previous_sid)
+        if not session:
+            if session.sid is not None:
+                self.store.delete(session.sid)
+            if session.sid is not None or session.previous_sid is not None:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        now = time.time()
+        if session.modified or session.new:
+            if session.sid is None:
+                session.sid = secrets.token_urlsafe(32)
+            self.store.save(session.sid, self.serializer.dumps(dict(session)), now + self.ttl)
+        elif session.expires_at - now < self.ttl / 2:
+            self.store.touch(session.sid, now + self.ttl)
+        else:
+            return
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def regenerate_session(session) -> None:
+    """Issue a new session id when the signed-in parent changes (no-op for cookie sessions)."""
+    if isinstance(session, ServerSideSession):
+        session.regenerate()
+
+
+def start_sweeper(store, interval: float) -> threading.Event:
+    """Delete expired sessions every ``interval`` seconds on a daemon thread; set the returned event to stop."""
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval):
+            try:
+                removed = store.sweep(time.time())
+                if removed:
+                    logger.info('Swept %d expired sessions', removed)
+            except Exception:
+                logger.exception('Session sweep failed')
+
+    threading.Thread(target=_run, name='session-sweeper', daemon=True).start()
+    return stop
+
+
+def init_session_store(app) -> None:
+    """Install the session backend chosen by ``SESSION_BACKEND`` (cookie, sqlite or file).
+
+    Signed cookies stay the default: they need no writable disk (serverless) and
+    work across hosts. The local stores are opt-in for single-host deploys.
+    """
+    backend = os.environ.get('SESSION_BACKEND', 'cookie').strip().lower()
+    if backend == 'cookie':
+        # Flask's signed-cookie sessions
+        return
+    instance_path = os.path.join(os.path.abspath(os.path.join(app.root_path, '..')), 'instance')
+    if backend == 'sqlite':
+        path = os.environ.get('SESSION_STORE_PATH') or os.path.join(instance_path, 'sessions.db')
+    elif backend == 'file':
+        path = os.environ.get('SESSION_STORE_PATH') or os.path.join(instance_path, 'sessions')
+    else:
+        raise ValueError(f'Invalid SESSION_BACKEND: {backend}')
+    ttl = float(os.environ.get('SESSION_TTL') or app.permanent_session_lifetime.total_seconds())
+    interval = float(os.environ.get('SESSION_SWEEP_INTERVAL', '3600'))
+    app.session_interface = ServerSideSessionInterface(_shared_store(backend, path, interval), ttl)
+
+
+def _shared_store(backend: str, path: str, interval: float):
+    # One store, and at most one sweeper thread, per location however often create_app runs
+    key = (backend, os.path.abspath(path))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = SqliteSessionStore(path) if backend == 'sqlite' else FileSessionStore(path)
+            if interval > 0:
+                start_sweeper(store, interval)
+            _STORES[key] = store
+    return store
@@ -0,0 +1,85 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Tuple
+
+from . import db
+from .models import ChildPendingDue, ChildStatusSummary, Vaccination
+from .schedule_data import get_schedule_version
+
+EMPTY_STATS = {'completed': 0, 'overdue': 0, 'due_soon': 0, 'upcoming': 0, 'total': 0, 'next_due': None, 'next_due_vaccines': []}
+
+
+def refresh_child_summaries(child_ids: Iterable[int]) -> None:
+    """Rewrite the status summaries of ``child_ids`` from their vaccination rows.
+
+    Runs in the caller's transaction (one SELECT, then a DELETE and a bulk INSERT
+    for the summaries and for their ``child_pending_due`` rows) so the projection
+    commits or rolls back together with the rows it describes.
+    """
+    child_ids = sorted(set(child_ids))
+    if not child_ids:
+        return
+    summaries = {
+        cid: {'child_id': cid, 'total': 0, 'completed': 0, 'pending_due': [], 'next_due_date': None, 'next_due_vaccines': []}
+        for cid in child_ids
+    }
+    rows = db.session.execute(
+        db.select(Vaccination.child_id, Vaccination.name, Vaccination.due_date, Vaccination.completed_at)
+        .where(Vaccination.child_id.in_(child_ids))
+        .order_by(Vaccination.child_id, Vaccination.due_date, Vaccination.id)
+    )
+    for child_id, name, due_date, completed_at in rows:
+        summary = summaries[child_id]
+        summary['total'] += 1
+        if completed_at:
+            summary['completed'] += 1
+            continue
+        pending = summary['pending_due']
+        due = due_date.isoformat()
+        if pending and pending[-1][0] == due:
+            pending[-1][1] += 1
+        else:
+            pending.append([due, 1])
+        if summary['next_due_date'] in (None, due_date):
+            summary['next_due_date'] = due_date
+            summary['next_due_vaccines'].append(name)
+    version = get_schedule_version()
+    for summary in summaries.values():
+        summary['schedule_version'] = version
+    db.session.execute(db.delete(ChildStatusSummary).where(ChildStatusSummary.child_id.in_(child_ids)))
+    db.session.execute(db.insert(ChildStatusSummary), list(summaries.values()))
+    db.session.execute(db.delete(ChildPendingDue).where(ChildPendingDue.child_id.in_(child_ids)))
+    pending_rows = [
+        {'child_id': summary['child_id'], 'due_date': date.fromisoformat(due), 'count': count}
+        for summary in summaries.values() for due, count in summary['pending_due']
+    ]
+    if pending_rows:
+        db.session.execute(db.insert(ChildPendingDue), pending_rows)
+
+
+def pending_counts(pending_due, today: date) -> Tuple[int, int, int]:
+    """Split ``[iso_due_date, count]`` pairs into (overdue, due soon, upcoming) counts as of ``today``.
+
+    Pending vaccinations due on or before today count as overdue, within the next
+    30 days as due soon, and later ones as upcoming.
+    """
+    pending = pending_due or []
+    dates = [due for due, _count in pending]
+    counts = [count for _due, count in pending]
+    overdue_end = bisect_right(dates, today.isoformat())
+    due_soon_end = bisect_right(dates, (today + timedelta(days=30)).isoformat())
+    return sum(counts[:overdue_end]), sum(counts[overdue_end:due_soon_end]), sum(counts[due_soon_end:])
+
+
+def summary_stats(summary: ChildStatusSummary, today: date) -> Dict[str, Any]:
+    """Dashboard stats as of ``today`` from a stored summary, without reading vaccination rows."""
+    overdue, due_soon, upcoming = pending_counts(summary.pending_due, today)
+    return {
+        'completed': summary.completed,
+        'overdue': overdue,
+        'due_soon': due_soon,
+        'upcoming': upcoming,
+        'total': summary.total,
+        'next_due': summary.next_due_date,
+        'next_due_vaccines': list(summary.next_due_vaccines or []),
+    }
@@ -0,0 +1,107 @@
+"""Dashboard reads over the ``child_status_summary`` projection: keyset pages and account totals."""
+from datetime import date
+import os
+
+from flask import url_for
+
+from . import db
+from .models import Child, ChildPendingDue, ChildStatusSummary
+from .pagination import encode_cursor, newest_first_after
+from .schedule_data import get_schedule_version, materialize_vaccinations
+from .status_summary import EMPTY_STATS, refresh_child_summaries, summary_stats
+
+# Children rendered per dashboard page; further pages are fetched from /dashboard/children.json
+DASHBOARD_PAGE_SIZE = int(os.environ.get('DASHBOARD_PAGE_SIZE', '25'))
+DASHBOARD_MAX_PAGE_SIZE = 100
+
+
+def _refresh_stale_summaries(children) -> None:
+    """Materialize and summarize children predating the projection or a schedule reload."""
+    if not materialize_vaccinations(children):
+        refresh_child_summaries([c.id for c in children])
+        db.session.commit()
+
+
+def account_totals(parent_id: int, today: date):
+    """Account-wide dashboard totals, aggregated in SQL over status summaries.
+
+    One SELECT returns a single row however many children the account has:
+    summed summary columns plus overdue pending counts from ``child_pending_due``.
+    Stale summaries are refreshed first so the totals and every page agree.
+    """
+    version = get_schedule_version()
+    stale = (ChildStatusSummary.schedule_version.is_(None)) | (ChildStatusSummary.schedule_version != version)
+    overdue = (
+        db.select(db.func.coalesce(db.func.sum(ChildPendingDue.count), 0))
+        .join(Child, Child.id == ChildPendingDue.child_id)
+        .where(Child.parent_id == parent_id, ChildPendingDue.due_date <= today)
+        .scalar_subquery()
+    )
+    query = (
+        db.select(
+            db.func.count(Child.id),
+            db.func.coalesce(db.func.sum(ChildStatusSummary.completed), 0),
+            db.func.coalesce(db.func.sum(ChildStatusSummary.total - ChildStatusSummary.completed), 0),
+            db.func.sum(db.case((stale, 1), else_=0)),
+            overdue,
+        )
+        .outerjoin(ChildStatusSummary, ChildStatusSummary.child_id == Child.id)
+        .where(Child.parent_id == parent_id)
+    )
+    children, completed, pending, stale_count, overdue_count = db.session.execute(query).one()
+    if stale_count:
+        stale_children = db.session.execute(
+            db.select(Child).outerjoin(ChildStatusSummary, ChildStatusSummary.child_id == Child.id)
+            .where(Child.parent_id == parent_id, stale)
+        ).scalars().all()
+        _refresh_stale_summaries(stale_children)
+        children, completed, pending, _stale, overdue_count = db.session.execute(query).one()
+    return {'children': children, 'completed': completed, 'overdue': overdue_count, 'upcoming': pending - overdue_count}
+
+
+def child_summary_page(parent_id: int, cursor, limit: int, today: date):
+    """Return ``(children, child_stats, next_cursor)`` for one page, newest children first.
+
+    Keyset pagination on ``(created_at, id)`` served by ``ix_children_parent_created_id``,
+    so a page costs one SELECT of ``limit + 1`` rows whatever the account size.
+    """
+    query = (
+        db.select(Child, ChildStatusSummary)
+        .outerjoin(ChildStatusSummary, ChildStatusSummary.child_id == Child.id)
+        .where(Child.parent_id == parent_id, newest_first_after(Child.created_at, Child.id, cursor))
+        .order_by(Child.created_at.desc(), Child.id.desc())
+        .limit(limit + 1)
+    )
+    rows = db.session.execute(query).all()
+    version = get_schedule_version()
+    stale = [c for c, summary in rows[:limit] if summary is None or summary.schedule_version != version]
+    if stale:
+        _refresh_stale_summaries(stale)
+        rows = db.session.execute(query).all()
+    rows, more = rows[:limit], len(rows) > limit
+    children = [c for c, _summary in rows]
+    child_stats = [
+        dict(summary_stats(summary, today) if summary is not None else EMPTY_STATS, child=c)
+        for c, summary in rows
+    ]
+    next_cursor = encode_cursor(children[-1].created_at, children[-1].id) if more else None
+    return children, child_stats, next_cursor
+
+
+def child_summary_json(stats):
+    child = stats['child']
+    return {
+        'id': child.id,
+        'name': child.name,
+        'dob': child.dob.isoformat(),
+        'country': child.country or 'India',
+        'completed': stats['completed'],
+        'overdue': stats['overdue'],
+        'due_soon': stats['due_soon'],
+        'upcoming': stats['upcoming'],
+        'total': stats['total'],
+        'next_due': stats['next_due'].isoformat() if stats['next_due'] else None,
+        'next_due_vaccines': stats['next_due_vaccines'],
+        'view_url': url_for('views.child_view', child_id=child.id),
+        'delete_url': url_for('views.delete_child', child_id=child.id),
+    }
@@ -0,0 +1,55 @@
+"""Benchmark: batch vaccine-record export throughput (records/sec) by worker count.
+
+Seeds a temporary SQLite database with one parent and N children, then times the
+bulk query + render + streamed ZIP pipeline used by /children/vaccine-records.zip
+(always inline) and ``flask export-records --workers N``.
+
+Run from the project root:  python benchmarks/bench_batch_export.py [children]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+    from app import create_app, db
+    from app.models import Child, Parent
+    from app.exports import stream_vaccine_records_zip, vaccine_record_export_jobs
+    from app.schedule_data import materialize_vaccinations
+
+    app = create_app()
+    with app.app_context():
+        parent = Parent(name='Agency', email='agency@example.com', password_hash='x')
+        db.session.add(parent)
+        db.session.commit()
+        parent_id = parent.id
+        countries = ['India', 'UK', 'USA', 'Germany']
+        db.session.add_all([
+            Child(name=f'Child {i}', dob=date(2015 + i % 10, 1 + i % 12, 1), parent_id=parent_id, country=countries[i % 4])
+            for i in range(count)
+        ])
+        db.session.commit()
+
+        # Materialize vaccination rows up front so every run measures the steady state
+        materialize_vaccinations(Child.query.filter_by(parent_id=parent_id).all())
+        worker_counts = sorted({1, 2, os.cpu_count() or 1})
+        print(f"{'workers':>7} {'records':>8} {'seconds':>8} {'records/sec':>12} {'zip KiB':>8}")
+        for workers in worker_counts:
+            db.session.expunge_all()
+            children = Child.query.filter_by(parent_id=parent_id).all()
+            start = time.perf_counter()
+            jobs = vaccine_record_export_jobs(children, date(2026, 2, 17))
+            size = sum(len(chunk) for chunk in stream_vaccine_records_zip(jobs, workers))
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>7} {len(jobs):>8} {elapsed:>8.2f} {len(jobs) / elapsed:>12.1f} {size / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
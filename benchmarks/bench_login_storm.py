@@ -0,0 +1,85 @@
+"""Load test: dashboard latency during a login storm, hashing inline vs. on the bounded pool.
+
+Run from the project root:  python benchmarks/bench_login_storm.py [storm_threads] [seconds]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _run_phase(app, storm_threads, seconds, dashboard_cookie):
+    stop = threading.Event()
+    outcomes = {200: 0, 302: 0, 503: 0}
+    outcomes_lock = threading.Lock()
+
+    def _storm():
+        client = app.test_client()
+        while not stop.is_set():
+            resp = client.post('/auth/login', data={'email': 'storm@example.com', 'password': 'secret123'})
+            with outcomes_lock:
+                outcomes[resp.status_code] = outcomes.get(resp.status_code, 0) + 1
+            if resp.status_code == 503:
+                # Well-behaved clients honour Retry-After
+                stop.wait(float(resp.headers['Retry-After']))
+
+    threads = [threading.Thread(target=_storm) for _ in range(storm_threads)]
+    for thread in threads:
+        thread.start()
+    client = app.test_client()
+    client.set_cookie('session', dashboard_cookie)
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        assert client.get('/dashboard').status_code == 200
+        latencies.append((time.perf_counter() - started) * 1000)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, outcomes
+
+
+def main():
+    storm_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    tmp = tempfile.mkdtemp()
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp, 'storm.db')
+    os.environ['SESSION_STORE_PATH'] = os.path.join(tmp, 'sessions.db')
+    from app import create_app
+    from app.passwords import PasswordHasher
+
+    app = create_app()
+    workers = max(1, (os.cpu_count() or 2) // 2)
+    modes = [
+        ('inline (unbounded)', PasswordHasher(workers=0, max_pending=10 ** 6)),
+        (f'pool ({workers} workers, {workers * 4} pending)', PasswordHasher(workers=workers)),
+    ]
+    app.extensions['password_hasher'] = modes[0][1]
+    client = app.test_client()
+    client.post('/auth/register', data={'name': 'Storm', 'email': 'storm@example.com', 'age': '30', 'password': 'secret123'})
+    client.post('/add-child', data={'child_name': 'Storm Kid', 'dob': '2024-01-01', 'country': 'UK'})
+    cookie = client.get_cookie('session').value
+
+    baseline, _ = _run_phase(app, 0, seconds, cookie)
+    print(f'{"mode":<32} {"p50 ms":>8} {"p95 ms":>8} {"logins":>7} {"503s":>6}')
+    print(f'{"no storm":<32} {statistics.median(baseline):8.1f} {_percentile(baseline, 95):8.1f} {0:7d} {0:6d}')
+    for label, hasher in modes:
+        app.extensions['password_hasher'] = hasher
+        latencies, outcomes = _run_phase(app, storm_threads, seconds, cookie)
+        hasher.shutdown()
+        print(f'{label:<32} {statistics.median(latencies):8.1f} {_percentile(latencies, 95):8.1f} '
+              f'{outcomes.get(302, 0):7d} {outcomes.get(503, 0):6d}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: reminder scan over a large vaccinations table (default one million rows).
+
+Run from the project root:  python benchmarks/bench_reminders.py [parents] [vaccines_per_child]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TODAY = date(2026, 3, 1)
+
+
+class CountingSink:
+    def __init__(self):
+        self.parents = 0
+
+    def send(self, reminder):
+        self.parents += 1
+
+    def close(self):
+        pass
+
+
+def _populate(db, parents, per_child):
+    from app.models import Child, Parent, Vaccination
+
+    batch = 2000
+    for start in range(1, parents + 1, batch):
+        ids = range(start, min(start + batch, parents + 1))
+        db.session.execute(db.insert(Parent), [
+            {'id': i, 'name': f'Parent {i}', 'email': f'p{i}@example.com', 'password_hash': 'x'} for i in ids
+        ])
+        db.session.execute(db.insert(Child), [
+            {'id': i, 'parent_id': i, 'name': f'Kid {i}', 'dob': TODAY - timedelta(days=i % 1800), 'country': 'India'} for i in ids
+        ])
+        db.session.execute(db.insert(Vaccination), [
+            {
+                'child_id': i,
+                'name': f'Vaccine {n}',
+                # Spread due dates over ~5 years around today; a third already completed
+                'due_date': TODAY + timedelta(days=(i * 7 + n * 61) % 1800 - 900),
+                'completed_at': TODAY if (i + n) % 3 == 0 else None,
+            }
+            for i in ids for n in range(per_child)
+        ])
+    db.session.commit()
+
+
+def main():
+    parents = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    per_child = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    tmp = tempfile.mkdtemp()
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp, 'reminders.db')
+    from app import create_app, db
+    from app.reminders import run_reminder_scan
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        _populate(db, parents, per_child)
+        db.session.execute(db.text('ANALYZE'))
+        print(f'Populated {parents * per_child:,} vaccination rows in {time.perf_counter() - started:.1f}s')
+        for batch_size in (100, 1000, 5000):
+            db.session.expunge_all()
+            sink = CountingSink()
+            tracemalloc.start()
+            started = time.perf_counter()
+            result = run_reminder_scan(sink, TODAY, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f'batch={batch_size:5d}: {result["parents"]:6d} reminders / {result["items"]:6d} vaccinations '
+                f'in {elapsed:6.2f}s, peak Python memory {peak / 1024:8.0f} KiB'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Microbenchmark: per-child schedule build cost, regex label parsing vs compiled offsets.
+
+Run from the project root:  python benchmarks/bench_schedule_build.py
+"""
+import os
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.schedule_data import (  # noqa: E402
+    _calc_due_date, entry_due_date, build_schedule_for_child, get_compiled_schedule, get_countries, get_schedule,
+)
+
+DOB = date(2024, 1, 31)
+ROUNDS = 2000
+
+
+def regex_due_dates(country):
+    schedule, _ref = get_schedule(country)
+    return [_calc_due_date(DOB, item['age']) for item in schedule]
+
+
+def compiled_due_dates(country):
+    return [entry_due_date(DOB, entry) for entry in get_compiled_schedule(country).entries]
+
+
+def main():
+    print(f"{'country':<10} {'regex us/child':>15} {'compiled us/child':>18} {'speedup':>8} {'build us/child':>15}")
+    for country in get_countries():
+        assert regex_due_dates(country) == compiled_due_dates(country)
+        before = timeit.timeit(lambda: regex_due_dates(country), number=ROUNDS) / ROUNDS * 1e6
+        after = timeit.timeit(lambda: compiled_due_dates(country), number=ROUNDS) / ROUNDS * 1e6
+        build = timeit.timeit(lambda: build_schedule_for_child(DOB, country=country), number=ROUNDS) / ROUNDS * 1e6
+        print(f"{country:<10} {before:>15.1f} {after:>18.1f} {before / after:>7.1f}x {build:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark: child_view render time with and without the schedule fragment cache.
+
+Uses a synthetic schedule so large tables can be measured.
+Run from the project root:  python benchmarks/bench_schedule_fragment.py [age_groups] [vaccines_per_group]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROUNDS = 200
+
+
+def _write_schedule(path, groups, per_group):
+    schedule = [
+        {'age': f'{week} Weeks', 'vaccines': [f'Vaccine {week}-{n}' for n in range(per_group)]}
+        for week in range(1, groups + 1)
+    ]
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'India': {'reference_url': 'https://example.com', 'schedule': schedule}}, fh)
+
+
+def _time_views(client, child_id, clear):
+    from app.child_caches import SCHEDULE_FRAGMENT_CACHE
+
+    samples = []
+    for _ in range(ROUNDS):
+        if clear:
+            SCHEDULE_FRAGMENT_CACHE.clear()
+        started = time.perf_counter()
+        assert client.get(f'/child/{child_id}').status_code == 200
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def main():
+    groups = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_group = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    tmp = tempfile.mkdtemp()
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp, 'fragment.db')
+    os.environ['SESSION_STORE_PATH'] = os.path.join(tmp, 'sessions.db')
+    schedule_path = os.path.join(tmp, 'schedules.json')
+    _write_schedule(schedule_path, groups, per_group)
+
+    from app import create_app, db
+    from app.models import Child, Parent
+    from app.schedule_data import configure_schedule_registry, materialize_vaccinations
+
+    configure_schedule_registry(schedule_path)
+    app = create_app()
+    with app.app_context():
+        parent = Parent(name='Bench Parent', email='bench@example.com', password_hash='x')
+        db.session.add(parent)
+        db.session.commit()
+        child = Child(name='Bench Kid', dob=date(2020, 1, 1), parent_id=parent.id, country='India')
+        db.session.add(child)
+        db.session.commit()
+        materialize_vaccinations([child])
+        parent_id, child_id = parent.id, child.id
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['parent_id'] = parent_id
+    print(f'{groups} age groups x {per_group} vaccines, {ROUNDS} views each')
+    print(f'{"mode":<12} {"p50 ms":>8} {"p95 ms":>8}')
+    for label, clear in (('uncached', True), ('cached', False)):
+        p50, p95 = _time_views(client, child_id, clear)
+        print(f'{label:<12} {p50:8.2f} {p95:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Load test: concurrent writer/reader processes on one SQLite file, default settings vs the app profile.
+
+Run from the project root:  python benchmarks/bench_sqlite_writers.py [workers] [commits_per_worker]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.db_profile import engine_options, install_sqlite_pragmas, sqlite_pragmas  # noqa: E402
+
+
+def _engine(url, profiled):
+    if not profiled:
+        # Pre-profile behaviour: rollback journal, synchronous=FULL, default pooling
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url))
+    install_sqlite_pragmas(engine, sqlite_pragmas())
+    return engine
+
+
+def _writer(url, profiled, commits, results):
+    engine = _engine(url, profiled)
+    ok = locked = 0
+    for i in range(commits):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text('INSERT INTO events (worker, n) VALUES (:w, :n)'), {'w': os.getpid(), 'n': i})
+            ok += 1
+        except OperationalError:
+            locked += 1
+    results.put(('write', ok, locked))
+
+
+def _reader(url, profiled, stop, results):
+    engine = _engine(url, profiled)
+    reads = locked = 0
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(text('SELECT count(*), max(n) FROM events')).one()
+            reads += 1
+        except OperationalError:
+            locked += 1
+    results.put(('read', reads, locked))
+
+
+def run(profiled, workers, commits):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = 'sqlite:///' + os.path.join(tmp, 'load.db')
+        setup = _engine(url, profiled)
+        with setup.begin() as conn:
+            conn.execute(text('CREATE TABLE events (id INTEGER PRIMARY KEY, worker INTEGER, n INTEGER)'))
+        setup.dispose()
+
+        results = multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        readers = [multiprocessing.Process(target=_reader, args=(url, profiled, stop, results)) for _ in range(workers)]
+        writers = [multiprocessing.Process(target=_writer, args=(url, profiled, commits, results)) for _ in range(workers)]
+        for p in readers:
+            p.start()
+        start = time.perf_counter()
+        for p in writers:
+            p.start()
+        for p in writers:
+            p.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for p in readers:
+            p.join()
+        totals = {'write': [0, 0], 'read': [0, 0]}
+        for _ in range(2 * workers):
+            kind, ok, locked = results.get()
+            totals[kind][0] += ok
+            totals[kind][1] += locked
+    label = 'profile (WAL)' if profiled else 'default'
+    print(
+        f"{label:14s} {totals['write'][0]:6d} commits in {elapsed:6.2f}s "
+        f"({totals['write'][0] / elapsed:8.1f}/s), {totals['write'][1]:5d} locked writes, "
+        f"{totals['read'][0]:7d} reads, {totals['read'][1]:5d} locked reads"
+    )
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    commits = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    print(f'{workers} writer + {workers} reader processes, {commits} commits per writer')
+    run(False, workers, commits)
+    run(True, workers, commits)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: render 1/10/100-page vaccine-record PDFs, reporting time, peak memory and size.
+
+Run from the project root:  python benchmarks/bench_vaccine_record_pdf.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.exports import _build_vaccine_record_pdf, _iter_vaccine_record_pdf, _paginate_vaccine_record  # noqa: E402
+
+STATS = {'completed': 10, 'overdue': 3, 'due_soon': 2, 'total': 0}
+ROWS_PER_GROUP = 5
+
+
+def groups_for_pages(pages):
+    groups = []
+    while len(_paginate_vaccine_record(groups)) < pages:
+        i = len(groups)
+        groups.append({'age': f'{i} Months', 'rows': [
+            {'vaccine': f'Catch-up vaccine {i}-{j}', 'status': ('Completed', 'Overdue', 'Due')[j % 3], 'date': '01 Jan 2027'}
+            for j in range(ROWS_PER_GROUP)
+        ]})
+    return groups
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024, size
+
+
+def main():
+    print(f"{'pages':>5} {'mode':<16} {'ms':>8} {'peak KiB':>9} {'size KiB':>9}")
+    for pages in (1, 10, 100):
+        groups = groups_for_pages(pages)
+        args = (groups, date(2026, 2, 17), 'Benchmark Kid', 'Benchmark Parent', STATS)
+        modes = {
+            'bytes': lambda: len(_build_vaccine_record_pdf(*args, compress=False)),
+            'bytes+flate': lambda: len(_build_vaccine_record_pdf(*args, compress=True)),
+            'stream+flate': lambda: sum(len(c) for c in _iter_vaccine_record_pdf(*args, compress=True)),
+        }
+        for mode, fn in modes.items():
+            ms, peak, size = measure(fn)
+            print(f"{pages:>5} {mode:<16} {ms:>8.1f} {peak:>9.0f} {size / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
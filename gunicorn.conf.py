@@ -0,0 +1,15 @@
+"""Gunicorn settings (picked up automatically from the working directory).
+
+Workers must be threaded: password hashing admission (app/passwords.py) is a
+per-process semaphore, so only concurrent requests in one process can ever hit
+PASSWORD_HASH_MAX_PENDING and get 503. With sync workers each process serves one
+request at a time, the limit is never reached and a login blocks the whole worker
+while its hash runs.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = 'gthread'
+# A login waiting on the hashing pool holds one thread; the others keep serving
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
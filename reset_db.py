@@ -2,10 +2,11 @@
 Run with:  python reset_db.py
 """
 from app import create_app, db  # type: ignore
+from app.migrations import run_migrations  # type: ignore
 
-app = create_app()
+app = create_app(skip_migrations=True)
 
 with app.app_context():
     db.drop_all()
-    db.create_all()
+    run_migrations(db.engine, db.metadata)
     print("Database dropped and recreated (fresh schema).")
@@ -1,8 +1,13 @@
 import os
 import sys
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from typing import List, NamedTuple
+from uuid import uuid4
 import pytest
 from datetime import date
+from sqlalchemy import event
 
 # Ensure project root is on sys.path so `import app` works even if pytest is launched from tests/
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -16,6 +21,8 @@ def app():
     os.environ['SECRET_KEY'] = 'test-secret'
     # Use in-memory SQLite for speed
     os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    # Keep an opt-in server-side store (SESSION_BACKEND=sqlite pytest) out of the project's instance/ folder
+    os.environ['SESSION_STORE_PATH'] = os.path.join(tempfile.mkdtemp(), 'sessions.db')
     application = create_app()
     application.config.update(TESTING=True)
     yield application
@@ -40,3 +47,74 @@ def parent_and_child(_db):
     _db.session.add(child)
     _db.session.commit()
     return parent, child
+
+
+class Family(NamedTuple):
+    parent: object
+    children: List[object]
+
+    @property
+    def child(self):
+        return self.children[0]
+
+
+@pytest.fixture()
+def family(_db, client):
+    """Factory for a parent with children, signed in on ``client`` (or ``on``) unless ``login=False``."""
+    from app.models import Parent, Child
+
+    def _make(children=('Kid',), country='UK', dob=date(2024, 1, 1), parent_name='Test Parent', login=True, on=None):
+        parent = Parent(name=parent_name, email=f'parent-{uuid4().hex[:8]}@example.com', password_hash='x')
+        _db.session.add(parent)
+        _db.session.commit()
+        kids = [Child(name=name, dob=dob, parent_id=parent.id, country=country) for name in children]
+        _db.session.add_all(kids)
+        _db.session.commit()
+        if login:
+            with (on or client).session_transaction() as sess:
+                sess['parent_id'] = parent.id
+        return Family(parent, kids)
+
+    return _make
+
+
+class SQLLog:
+    """Statements (with parameters) and commits seen on an engine."""
+
+    def __init__(self):
+        self.executions = []
+        self.commits = 0
+
+    @property
+    def statements(self) -> List[str]:
+        return [statement for statement, _params in self.executions]
+
+    @property
+    def writes(self) -> List[str]:
+        writes = [s for s in self.statements if s.lstrip().split(None, 1)[0].upper() in ('INSERT', 'UPDATE', 'DELETE')]
+        return writes + ['COMMIT'] * self.commits
+
+
+@pytest.fixture()
+def sql_log(_db):
+    """``with sql_log() as log:`` records the SQL run inside the block (on the app engine by default)."""
+    @contextmanager
+    def _record(engine=None):
+        engine = engine or _db.engine
+        log = SQLLog()
+
+        def _on_execute(conn, cursor, statement, parameters, *args):
+            log.executions.append((statement, parameters))
+
+        def _on_commit(conn):
+            log.commits += 1
+
+        event.listen(engine, 'before_cursor_execute', _on_execute)
+        event.listen(engine, 'commit', _on_commit)
+        try:
+            yield log
+        finally:
+            event.remove(engine, 'before_cursor_execute', _on_execute)
+            event.remove(engine, 'commit', _on_commit)
+
+    return _record
@@ -0,0 +1,95 @@
+from datetime import date
+
+from app import db
+from app.models import ChildStatusSummary, Vaccination
+from app.schedule_data import get_compiled_schedule
+
+
+def test_api_requires_login(client, _db):
+    with client.session_transaction() as sess:
+        sess.pop('parent_id', None)
+    resp = client.get('/api/v1/children')
+    assert resp.status_code == 401
+    assert resp.get_json()['error']
+
+
+def test_list_children_and_conditional_get(client, family):
+    child = family(children=('Api Kid',)).child
+    resp = client.get('/api/v1/children')
+    assert resp.status_code == 200
+    assert [c['id'] for c in resp.get_json()['children']] == [child.id]
+    assert client.get('/api/v1/children', headers={'If-None-Match': resp.headers['ETag']}).status_code == 304
+
+    schedule = client.get(f'/api/v1/children/{child.id}/schedule')
+    body = schedule.get_json()
+    assert body['child']['country'] == 'UK'
+    assert body['schedule'][0]['vaccines'] and body['stats']['completed'] == 0
+    cached = client.get(f'/api/v1/children/{child.id}/schedule', headers={'If-None-Match': schedule.headers['ETag']})
+    assert cached.status_code == 304 and cached.get_data() == b''
+
+
+def test_batch_patch_completes_age_group_with_if_match(client, family):
+    child = family(children=('Api Kid',)).child
+    schedule = client.get(f'/api/v1/children/{child.id}/schedule')
+    etag = schedule.headers['ETag']
+    group = schedule.get_json()['schedule'][0]
+    names = [v['name'] for v in group['vaccines']]
+
+    resp = client.patch(
+        f'/api/v1/children/{child.id}/vaccinations',
+        json={'vaccinations': [{'name': n, 'completed_at': '2024-03-01'} for n in names]},
+        headers={'If-Match': etag},
+    )
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] != etag
+    first = resp.get_json()['schedule'][0]
+    assert first['status'] == 'completed' and first['completed_at'] == '2024-03-01'
+    assert db.session.get(ChildStatusSummary, child.id).completed == len(names)
+
+    # A client still holding the old ETag loses the race
+    stale = client.patch(f'/api/v1/children/{child.id}/vaccinations/{names[0]}', json={'completed_at': '2024-03-02'}, headers={'If-Match': etag})
+    assert stale.status_code == 412
+    db.session.expire_all()
+    assert Vaccination.query.filter_by(child_id=child.id, name=names[0]).one().completed_at == date(2024, 3, 1)
+
+
+def test_patch_validation(client, family):
+    child = family(children=('Api Kid',)).child
+    url = f'/api/v1/children/{child.id}/vaccinations'
+    assert client.patch(url, data='nope', content_type='text/plain').status_code == 400
+    assert client.patch(url, json={'vaccinations': []}).status_code == 400
+    assert client.patch(url, json={'vaccinations': [{'name': 'BCG', 'completed_at': '01/02/2024'}]}).status_code == 400
+    both = client.patch(url, json={'age': '8 Weeks', 'vaccinations': [{'name': 'BCG'}]})
+    assert both.status_code == 400 and 'not both' in both.get_json()['error']
+    unknown = client.patch(url, json={'vaccinations': [{'name': 'Not A Vaccine'}]})
+    assert unknown.status_code == 422 and unknown.get_json()['unknown'] == ['Not A Vaccine']
+    assert client.patch('/api/v1/children/999999/vaccinations', json={'vaccinations': [{'name': 'BCG'}]}).status_code == 404
+    # Rejected requests release the child's lock
+    name = get_compiled_schedule('UK').entries[0].vaccines[0]
+    assert client.patch(url, json={'vaccinations': [{'name': name, 'completed_at': '2024-01-02'}]}).status_code == 200
+
+
+def test_patch_locks_child_before_if_match(client, family, sql_log):
+    child = family(children=('Api Kid',)).child
+    etag = client.get(f'/api/v1/children/{child.id}/schedule').headers['ETag']
+    name = get_compiled_schedule('UK').entries[0].vaccines[0]
+    with sql_log() as log:
+        resp = client.patch(f'/api/v1/children/{child.id}/vaccinations/{name}', json={'completed_at': '2024-01-02'}, headers={'If-Match': etag})
+    assert resp.status_code == 200
+    # SQLite has no row locks; the write lock is taken before the schedule is read for If-Match
+    assert log.statements[0] == 'BEGIN IMMEDIATE'
+
+
+def test_single_patch_overwrites_date_but_age_group_keeps_it(client, family):
+    child = family(children=('Api Kid',)).child
+    entry = get_compiled_schedule('UK').entries[1]
+    name = entry.vaccines[0]
+    url = f'/api/v1/children/{child.id}/vaccinations'
+    assert client.patch(f'{url}/{name}', json={'completed_at': '2024-03-01'}).status_code == 200
+    resp = client.patch(url, json={'age': entry.age, 'completed_at': '2024-03-05'})
+    assert resp.headers['X-Updated-Count'] == str(len(entry.vaccines) - 1)
+    assert client.patch(f'{url}/{name}', json={'completed_at': '2024-03-02'}).headers['X-Updated-Count'] == '1'
+    db.session.expire_all()
+    dates = {v.name: v.completed_at for v in Vaccination.query.filter_by(child_id=child.id).filter(Vaccination.name.in_(entry.vaccines))}
+    assert dates[name] == date(2024, 3, 2)
+    assert all(dates[n] == date(2024, 3, 5) for n in entry.vaccines[1:])
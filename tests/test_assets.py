@@ -0,0 +1,42 @@
+import gzip
+import re
+
+from flask import Flask, render_template_string
+
+from app.assets import build_asset_manifest, build_gzip_variants, init_assets
+
+
+def test_pages_link_fingerprinted_immutable_assets(client):
+    body = client.get('/auth/login').get_data(as_text=True)
+    match = re.search(r'/assets/css/style\.[0-9a-f]{12}\.css', body)
+    assert match and '/static/css/style.css' not in body
+    resp = client.get(match.group(0))
+    assert resp.status_code == 200 and resp.mimetype == 'text/css'
+    assert resp.cache_control.immutable and resp.cache_control.max_age == 365 * 24 * 3600
+    assert client.get('/assets/css/style.000000000000.css').status_code == 404
+
+
+def test_missing_files_keep_plain_static_urls(app):
+    with app.test_request_context('/'):
+        assert render_template_string("{{ url_for('static', filename='css/missing.css') }}") == '/static/css/missing.css'
+
+
+def test_gzip_variant_served_by_accept_encoding(tmp_path, monkeypatch):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'site.css').write_text('body { color: red; }\n' * 50)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG not really')
+    assert build_gzip_variants(str(tmp_path)) == 1
+    assert build_gzip_variants(str(tmp_path)) == 0
+    manifest = build_asset_manifest(str(tmp_path))
+    assert set(manifest.urls) == {'css/site.css', 'logo.png'}
+
+    monkeypatch.delenv('ASSET_FINGERPRINTING', raising=False)
+    app = Flask(__name__, static_folder=str(tmp_path))
+    init_assets(app)
+    client = app.test_client()
+    url = f"/assets/{manifest.urls['css/site.css']}"
+    zipped = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+    assert zipped.headers['Content-Encoding'] == 'gzip' and 'Accept-Encoding' in zipped.headers['Vary']
+    assert gzip.decompress(zipped.data) == (tmp_path / 'css' / 'site.css').read_bytes()
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers and plain.data.startswith(b'body')
@@ -50,6 +50,8 @@ def test_guest_child_country_persists_on_register(client, _db):
         child = Child.query.filter_by(parent_id=parent.id).first()
         assert child is not None
         assert (child.country or 'India') == 'UK'
+        assert child.status_summary is not None
+        assert child.status_summary.total == len(child.vaccinations) > 0
 
 
 def test_delete_account(client, _db):
@@ -0,0 +1,31 @@
+from app.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(max_bytes=10)
+    cache.set('a', b'12345')
+    cache.set('b', b'12345')
+    assert cache.get('a') == b'12345'  # 'a' becomes most recent
+    cache.set('c', b'123')
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.current_bytes == 8
+
+
+def test_lru_skips_oversized_and_honours_max_entries():
+    cache = LRUCache(max_bytes=4, max_entries=2)
+    cache.set('big', b'12345')
+    assert 'big' not in cache
+    for key in 'xyz':
+        cache.set(key, b'1')
+    assert len(cache) == 2 and 'x' not in cache
+
+
+def test_lru_invalidate_tag():
+    cache = LRUCache()
+    cache.set('pdf:1', b'aa', tags=(1,))
+    cache.set('ics:1', b'bb', tags=(1,))
+    cache.set('pdf:2', b'cc', tags=(2,))
+    assert cache.invalidate_tag(1) == 2
+    assert len(cache) == 1 and cache.current_bytes == 2
+    assert cache.invalidate_tag(1) == 0
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+from app import db
+from app.calendar_feed import fold_ics_line, ics_escape, make_calendar_token
+from app.models import Vaccination
+
+
+def test_fold_ics_line_limits_octets_and_keeps_characters():
+    line = 'DESCRIPTION:' + 'Rotavirus, ' * 10 + 'é' * 60
+    folded = fold_ics_line(line)
+    physical = folded.split('\r\n')
+    assert len(physical) > 1
+    assert all(len(p.encode('utf-8')) <= 75 for p in physical)
+    assert all(p.startswith(' ') for p in physical[1:])
+    assert folded.replace('\r\n ', '') == line
+    assert fold_ics_line('SUMMARY:short') == 'SUMMARY:short'
+
+
+def test_ics_escape():
+    assert ics_escape('a,b;c\\d\ne') == r'a\,b\;c\\d\ne'
+
+
+def test_child_calendar_is_read_only_and_conditional(client, family):
+    child = family(children=('Cal Kid',)).child
+    resp = client.get(f'/child/{child.id}/calendar')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/calendar'
+    body = resp.get_data(as_text=True)
+    assert body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n')
+    assert 'DTSTART;VALUE=DATE:20240226' in body  # UK 8 Weeks
+    assert Vaccination.query.filter_by(child_id=child.id).count() == 0
+    assert len({line for line in body.split('\r\n') if line.startswith('DTSTAMP:')}) == 1
+
+    etag = resp.headers['ETag']
+    again = client.get(f'/child/{child.id}/calendar', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_calendar_etag_changes_with_vaccination_state(client, family):
+    child = family(children=('Cal Kid',)).child
+    etag = client.get(f'/child/{child.id}/calendar').headers['ETag']
+    client.post(f'/child/{child.id}/complete', data={'vaccine': 'MMR-1', 'date': '2025-01-05'})
+    resp = client.get(f'/child/{child.id}/calendar', headers={'If-None-Match': etag})
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] != etag
+
+
+def test_parent_calendar_feed(client, app, family):
+    parent, kids = family(children=('Feed One', 'Feed Two'))
+    with app.test_request_context():
+        token = make_calendar_token(parent)
+    with client.session_transaction() as sess:
+        sess.clear()  # calendar apps poll without a session
+    resp = client.get(f'/calendar/{token}.ics')
+    assert resp.status_code == 200
+    body = resp.get_data(as_text=True)
+    assert 'SUMMARY:Feed One: 8 Weeks Vaccines' in body
+    assert 'SUMMARY:Feed Two: 8 Weeks Vaccines' in body
+    assert resp.last_modified is not None
+
+    cached = client.get(f'/calendar/{token}.ics', headers={'If-None-Match': resp.headers['ETag']})
+    assert cached.status_code == 304
+    assert client.get(f'/calendar/{token[:-2]}xx.ics').status_code == 404
+
+
+def test_dashboard_shows_feed_url(client, family):
+    family(children=('Cal Kid',))
+    body = client.get('/dashboard').get_data(as_text=True)
+    assert '/calendar/' in body and '.ics' in body
+
+
+def test_reset_calendar_link_revokes_old_url(client, app, family):
+    parent = family(children=('Cal Kid',)).parent
+    with app.test_request_context():
+        old_token = make_calendar_token(parent)
+    assert client.get(f'/calendar/{old_token}.ics').status_code == 200
+
+    resp = client.post('/calendar/reset')
+    assert resp.status_code == 302
+    assert client.get(f'/calendar/{old_token}.ics').status_code == 404
+    db.session.refresh(parent)
+    with app.test_request_context():
+        new_token = make_calendar_token(parent)
+    assert new_token != old_token
+    assert client.get(f'/calendar/{new_token}.ics').status_code == 200
+    assert new_token in client.get('/dashboard').get_data(as_text=True)
+
+
+def test_calendar_token_signed_over_parent_id_alone_is_rejected(client, app, family):
+    parent = family(children=('Cal Kid',)).parent
+    with app.test_request_context():
+        from app.calendar_feed import _feed_serializer
+        legacy = _feed_serializer().dumps(parent.id)
+    assert client.get(f'/calendar/{legacy}.ics').status_code == 404
+
+
+def test_calendar_last_modified_follows_child_edits(client, family):
+    child = family(children=('Cal Kid',)).child
+    child.updated_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    child.created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    db.session.commit()
+    before = client.get(f'/child/{child.id}/calendar').last_modified
+
+    resp = client.post(f'/child/{child.id}/update', data={'child_name': 'Renamed Kid', 'dob': '2024-01-01', 'country': 'UK'})
+    assert resp.status_code == 302
+    after = client.get(f'/child/{child.id}/calendar', headers={'If-Modified-Since': before.strftime('%a, %d %b %Y %H:%M:%S GMT')})
+    assert after.status_code == 200
+    assert after.last_modified > before
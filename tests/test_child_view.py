@@ -0,0 +1,79 @@
+from datetime import date
+
+from app import db
+from app.models import Child, Vaccination
+from app.schedule_data import VirtualVaccination, build_schedule_for_child, get_compiled_schedule
+
+
+def test_build_schedule_with_loaded_rows_fills_virtual_rows(_db):
+    child = Child(id=987654, name='Virtual', dob=date(2024, 1, 1), country='UK')
+    entries = build_schedule_for_child(child.dob, child=child, country='UK', vaccinations=[])
+    records = [r for e in entries for r in e['vaccine_records']]
+    assert records and all(isinstance(r, VirtualVaccination) for r in records)
+    assert all(r.completed_at is None and r.child_id == child.id for r in records)
+
+
+def test_get_routes_never_write(client, family, sql_log):
+    child_id = family(country='India').child.id
+
+    def _get_all():
+        for path in (f'/child/{child_id}', f'/child/{child_id}/calendar', f'/child/{child_id}/vaccine-record.pdf'):
+            assert client.get(path).status_code == 200
+
+    with sql_log() as log:
+        _get_all()
+    assert log.writes == []
+    assert Vaccination.query.filter_by(child_id=child_id).count() == 0
+
+
+def test_child_view_stats_count_virtual_rows(client, family):
+    child_id = family(children=('Read Kid',)).child.id
+    total = len({n for e in get_compiled_schedule('UK').entries for n in e.vaccines})
+    resp = client.get(f'/child/{child_id}')
+    assert f'0/{total} Complete'.encode() in resp.data
+
+
+def test_completion_materializes_whole_group(client, family):
+    child_id = family(children=('Read Kid',)).child.id
+    entry = get_compiled_schedule('UK').entries[1]
+    client.post(f'/child/{child_id}/complete', data={'vaccine': entry.vaccines[0], 'date': '2024-03-01'})
+    done = {v.name for v in Vaccination.query.filter_by(child_id=child_id).filter(Vaccination.completed_at.isnot(None))}
+    assert set(entry.vaccines) <= done
+
+
+def test_add_child_materializes_rows(client, family):
+    parent = family(children=()).parent
+    resp = client.post('/add-child', data={'child_name': 'New Kid', 'dob': '2024-02-01', 'country': 'India'})
+    assert resp.status_code == 302
+    child = Child.query.filter_by(parent_id=parent.id).one()
+    assert Vaccination.query.filter_by(child_id=child.id).count() > 0
+
+
+def test_schedule_fragment_is_cached_until_completion(client, family):
+    from app.child_caches import SCHEDULE_FRAGMENT_CACHE
+
+    child_id = family(children=('Read Kid',)).child.id
+    first = client.get(f'/child/{child_id}').get_data(as_text=True)
+    hits = SCHEDULE_FRAGMENT_CACHE.hits
+    assert client.get(f'/child/{child_id}').get_data(as_text=True) == first
+    assert SCHEDULE_FRAGMENT_CACHE.hits == hits + 1
+    assert 'Completed on' not in first
+
+    entry = get_compiled_schedule('UK').entries[1]
+    client.post(f'/child/{child_id}/complete', data={'age': entry.age, 'date': '2024-03-01'})
+    assert 'Completed on' in client.get(f'/child/{child_id}').get_data(as_text=True)
+
+
+def test_failed_edit_keeps_child_and_shows_error(client, family, monkeypatch):
+    child_id = family(children=('Read Kid',)).child.id
+
+    def _fail(child):
+        raise RuntimeError('insert failed')
+
+    monkeypatch.setattr('app.views.replace_vaccinations', _fail)
+    resp = client.post(f'/child/{child_id}/update', data={'child_name': 'Renamed Kid', 'dob': '2023-06-01', 'country': 'USA'})
+    assert resp.status_code == 200
+    assert "Couldn&#39;t save your changes" in resp.get_data(as_text=True)
+    db.session.expire_all()
+    child = db.session.get(Child, child_id)
+    assert (child.name, child.dob, child.country) == ('Read Kid', date(2024, 1, 1), 'UK')
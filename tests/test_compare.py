@@ -0,0 +1,59 @@
+from app import compare
+from app.compare import compare_countries, get_comparison_index, normalize_countries
+
+
+def test_age_axis_is_in_days_with_unparsed_labels_last():
+    index = get_comparison_index()
+    days = dict(index.axis)
+    assert days['Birth'] == 0
+    assert days['8 Weeks'] == 56
+    assert days['6 Weeks'] < days['2 Months'] < days['10 Weeks']
+    assert days['12 Months'] == days['1 Year']
+    assert [age for age, _ in index.axis[-2:]] == ['Every Year', 'Grade 7']
+
+
+def test_countries_are_normalized_and_results_memoized():
+    index = get_comparison_index()
+    countries = normalize_countries(['UK', 'Atlantis', 'India', 'UK'], index)
+    assert countries == ('UK', 'India')
+    assert normalize_countries([], index) == ('India', 'UK')
+    assert normalize_countries(['Atlantis'], index) == ('India',)
+    first = compare_countries(index, countries)
+    assert compare_countries(index, countries) is first
+    ages = [row['age'] for row in first['comparison_table']]
+    assert ages[0] == 'Birth' and ages[-1] == 'Every Year'
+    row = next(r for r in first['comparison_table'] if r['age'] == '8 Weeks')
+    assert row['countries']['India'] == [] and row['countries']['UK']
+
+
+def test_json_variant_and_conditional_requests(client):
+    resp = client.get('/compare.json?countries=USA&countries=Canada')
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body['countries'] == ['USA', 'Canada']
+    assert body['rows'][0]['age'] == 'Birth' and body['rows'][0]['age_days'] == 0
+    assert 'public' in resp.headers['Cache-Control']
+    again = client.get('/compare.json?countries=USA&countries=Canada', headers={'If-None-Match': resp.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_html_page_revalidates_without_rebuilding(client, monkeypatch):
+    resp = client.get('/compare?countries=India&countries=Germany')
+    assert resp.status_code == 200 and b'Germany' in resp.data
+    etag = resp.headers['ETag']
+
+    def _fail(*args):
+        raise AssertionError('comparison rebuilt for a matching ETag')
+
+    monkeypatch.setattr(compare, '_COMPARISONS', None)
+    monkeypatch.setattr('app.views.compare_countries', _fail)
+    assert client.get('/compare?countries=India&countries=Germany', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_signed_in_page_is_private(client, parent_and_child):
+    parent, _child = parent_and_child
+    with client.session_transaction() as sess:
+        sess['parent_id'] = parent.id
+    resp = client.get('/compare')
+    assert resp.status_code == 200
+    assert resp.headers['Cache-Control'] == 'private, no-cache' and 'ETag' not in resp.headers
@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+
+from app import db
+from app.completions import complete_vaccinations, import_completion_history
+from app.models import ChildStatusSummary, Vaccination
+from app.schedule_data import get_compiled_schedule, materialize_vaccinations
+
+
+@pytest.fixture()
+def child(family):
+    child = family(children=('Done Kid',)).child
+    materialize_vaccinations([child])
+    return child
+
+
+def _completed(child_id):
+    db.session.expire_all()
+    return {v.name: v.completed_at for v in Vaccination.query.filter_by(child_id=child_id) if v.completed_at}
+
+
+def test_group_completion_is_one_update_and_ignores_same_day_groups(client, child, sql_log):
+    first, second = get_compiled_schedule('UK').entries[1:3]
+    # Another group due the same day must not be swept up with this one
+    Vaccination.query.filter_by(child_id=child.id, name=second.vaccines[0]).update(
+        {'due_date': Vaccination.query.filter_by(child_id=child.id, name=first.vaccines[0]).one().due_date}
+    )
+    db.session.commit()
+
+    with sql_log() as log:
+        client.post(f'/child/{child.id}/complete', data={'age': first.age, 'date': '2024-03-01'})
+    updates = [s for s in log.statements if s.lstrip().upper().startswith('UPDATE VACCINATIONS')]
+    assert len(updates) == 1 and ' IN ' in updates[0]
+    assert set(_completed(child.id)) == set(first.vaccines)
+    assert db.session.get(ChildStatusSummary, child.id).completed == len(first.vaccines)
+
+
+def test_complete_keeps_existing_dates_and_counts_rows(child):
+    names = get_compiled_schedule('UK').entries[1].vaccines
+    assert complete_vaccinations(child, names[:1], date(2024, 2, 1)) == 1
+    assert complete_vaccinations(child, names, date(2024, 3, 1)) == len(names) - 1
+    db.session.commit()
+    done = _completed(child.id)
+    assert done[names[0]] == date(2024, 2, 1)
+    assert all(done[n] == date(2024, 3, 1) for n in names[1:])
+
+
+def test_import_history_overwrites_dates_in_one_statement(child):
+    entries = get_compiled_schedule('UK').entries
+    history = {entries[1].vaccines[0]: date(2024, 2, 20), entries[2].vaccines[0]: date(2024, 3, 20)}
+    complete_vaccinations(child, [entries[1].vaccines[0]], date(2024, 2, 1))
+    assert import_completion_history(child, history) == 2
+    db.session.commit()
+    assert _completed(child.id) == history
+
+
+def test_api_group_patch_reports_updated_count(client, child):
+    entry = get_compiled_schedule('UK').entries[1]
+    resp = client.patch(f'/api/v1/children/{child.id}/vaccinations', json={'age': entry.age, 'completed_at': '2024-03-01'})
+    assert resp.status_code == 200
+    assert resp.headers['X-Updated-Count'] == str(len(entry.vaccines))
+    assert client.patch(f'/api/v1/children/{child.id}/vaccinations', json={'age': 'Never'}).status_code == 422
+
+
+def test_completion_helpers_leave_the_commit_to_the_caller(family, sql_log):
+    child = family(children=('Fresh Kid',), login=False).child
+    names = get_compiled_schedule('UK').entries[1].vaccines
+    with sql_log() as log:
+        assert complete_vaccinations(child, names, date(2024, 3, 1)) == len(names)
+        assert import_completion_history(child, {names[0]: date(2024, 2, 1)}) == 1
+    assert log.commits == 0
+    db.session.rollback()
+    assert Vaccination.query.filter_by(child_id=child.id).count() == 0
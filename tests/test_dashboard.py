@@ -0,0 +1,196 @@
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models import Child, ChildStatusSummary, Vaccination
+from app.status_summary import refresh_child_summaries, summary_stats
+
+
+def _row_stats(child_id, today):
+    """Stats recomputed from the vaccination rows, the oracle for the summary projection."""
+    rows = Vaccination.query.filter_by(child_id=child_id).order_by(Vaccination.due_date, Vaccination.id).all()
+    pending = [v for v in rows if not v.completed_at]
+    next_due = pending[0].due_date if pending else None
+    return {
+        'completed': len(rows) - len(pending),
+        'overdue': sum(1 for v in pending if v.due_date <= today),
+        'due_soon': sum(1 for v in pending if today < v.due_date <= today + timedelta(days=30)),
+        'upcoming': sum(1 for v in pending if v.due_date > today + timedelta(days=30)),
+        'total': len(rows),
+        'next_due': next_due,
+        'next_due_vaccines': [v.name for v in pending if v.due_date == next_due],
+    }
+
+
+def _add_children(parent, count):
+    for i in range(count):
+        db.session.add(Child(name=f'Kid {i}', dob=date(2024, 1, 1), parent_id=parent.id, country=['India', 'UK', 'USA'][i % 3]))
+    db.session.commit()
+
+
+def _dashboard_statements(client, sql_log):
+    with sql_log() as log:
+        assert client.get('/dashboard').status_code == 200
+    return log.statements
+
+
+def test_children_stats_aggregate_matches_rows(family):
+    today = date(2026, 2, 17)
+    a, b = family(children=('A', 'B'), dob=date(2025, 1, 1), login=False).children
+    db.session.add_all([
+        Vaccination(child_id=a.id, name='Done', due_date=date(2026, 1, 1), completed_at=date(2026, 1, 2)),
+        Vaccination(child_id=a.id, name='Overdue', due_date=date(2026, 2, 10)),
+        Vaccination(child_id=a.id, name='Today', due_date=today),
+        Vaccination(child_id=a.id, name='Soon', due_date=today + timedelta(days=30)),
+        Vaccination(child_id=a.id, name='Later', due_date=today + timedelta(days=31)),
+        Vaccination(child_id=b.id, name='B Done', due_date=date(2026, 1, 1), completed_at=date(2026, 1, 1)),
+    ])
+    refresh_child_summaries([a.id, b.id])
+    db.session.commit()
+
+    stats = {c.id: summary_stats(db.session.get(ChildStatusSummary, c.id), today) for c in (a, b)}
+    assert stats[a.id] == _row_stats(a.id, today) == {
+        'completed': 1, 'overdue': 2, 'due_soon': 1, 'upcoming': 1, 'total': 5,
+        'next_due': date(2026, 2, 10), 'next_due_vaccines': ['Overdue'],
+    }
+    assert stats[b.id]['completed'] == 1
+    assert stats[b.id]['next_due'] is None
+    assert stats[b.id]['next_due_vaccines'] == []
+
+
+def test_dashboard_statement_count_independent_of_children(client, family, sql_log):
+    small = family(children=()).parent
+    _add_children(small, 1)
+    client.get('/dashboard')  # materialize
+    small_count = len(_dashboard_statements(client, sql_log))
+
+    large = family(children=()).parent
+    _add_children(large, 6)
+    first = _dashboard_statements(client, sql_log)
+    # Children created outside the write endpoints: one bulk insert each for rows and summaries
+    assert sum(1 for s in first if s.lstrip().upper().startswith('INSERT INTO VACCINATIONS')) == 1
+    assert sum(1 for s in first if s.lstrip().upper().startswith('INSERT INTO CHILD_STATUS_SUMMARY')) == 1
+    steady = _dashboard_statements(client, sql_log)
+    assert len(steady) == small_count
+    # Account totals and the first page, each one SELECT over children and summaries; vaccination rows are not read
+    assert len(steady) == 2 and all('child_status_summary' in s and 'vaccinations' not in s for s in steady)
+
+
+def test_dashboard_lists_next_due_vaccines(client, family):
+    parent = family(children=()).parent
+    _add_children(parent, 2)
+    body = client.get('/dashboard').get_data(as_text=True)
+    assert 'Kid 0' in body and 'Kid 1' in body
+    assert 'BCG' in body  # India birth vaccines are next due for a 2024 DOB child with nothing completed
+
+
+def test_status_summary_matches_row_aggregates(family):
+    child = family(children=('S',), dob=date(2025, 1, 1), login=False).child
+    base = date(2026, 2, 17)
+    db.session.add_all([
+        Vaccination(child_id=child.id, name='Done', due_date=date(2026, 1, 1), completed_at=date(2026, 1, 2)),
+        Vaccination(child_id=child.id, name='Overdue', due_date=date(2026, 2, 10)),
+        Vaccination(child_id=child.id, name='Overdue 2', due_date=date(2026, 2, 10)),
+        Vaccination(child_id=child.id, name='Soon', due_date=base + timedelta(days=30)),
+        Vaccination(child_id=child.id, name='Later', due_date=base + timedelta(days=31)),
+    ])
+    refresh_child_summaries([child.id])
+    db.session.commit()
+    summary = db.session.get(ChildStatusSummary, child.id)
+    for offset in (-60, -7, 0, 1, 30, 31, 90):
+        today = base + timedelta(days=offset)
+        assert summary_stats(summary, today) == _row_stats(child.id, today)
+
+
+def test_write_endpoints_keep_summary_current(client, family):
+    parent = family(children=()).parent
+    resp = client.post('/add-child', data={'child_name': 'Proj Kid', 'dob': '2024-01-01', 'country': 'UK'})
+    child_id = int(resp.location.rstrip('/').rsplit('/', 1)[-1])
+    summary = db.session.get(ChildStatusSummary, child_id)
+    assert summary.completed == 0 and summary.total == Vaccination.query.filter_by(child_id=child_id).count()
+
+    first = Vaccination.query.filter_by(child_id=child_id).order_by(Vaccination.due_date, Vaccination.id).first()
+    client.post(f'/child/{child_id}/complete', data={'vaccine': first.name, 'date': '2024-01-02'})
+    db.session.expire_all()
+    summary = db.session.get(ChildStatusSummary, child_id)
+    assert summary.completed == Vaccination.query.filter_by(child_id=child_id).filter(Vaccination.completed_at.isnot(None)).count() > 0
+    assert first.name not in summary.next_due_vaccines
+
+    client.post(f'/child/{child_id}/update', data={'child_name': 'Proj Kid', 'dob': '2024-06-01', 'country': 'India'})
+    db.session.expire_all()
+    summary = db.session.get(ChildStatusSummary, child_id)
+    assert summary.completed == 0
+    assert summary.next_due_date == date(2024, 6, 1)  # India birth dose for the new DOB
+    assert parent.id == db.session.get(Child, child_id).parent_id
+
+
+def test_dashboard_refreshes_summary_after_schedule_reload(client, family, monkeypatch):
+    parent = family(children=()).parent
+    _add_children(parent, 1)
+    client.get('/dashboard')
+    child = Child.query.filter_by(parent_id=parent.id).one()
+    assert db.session.get(ChildStatusSummary, child.id) is not None
+    monkeypatch.setattr('app.summaries.get_schedule_version', lambda: 'reloaded')
+    monkeypatch.setattr('app.status_summary.get_schedule_version', lambda: 'reloaded')
+    client.get('/dashboard')
+    db.session.expire_all()
+    assert db.session.get(ChildStatusSummary, child.id).schedule_version == 'reloaded'
+
+
+def test_children_pages_cover_account_in_keyset_order(client, family, monkeypatch):
+    parent = family(children=()).parent
+    _add_children(parent, 7)
+    # Several children sharing a created_at exercise the id tie-breaker
+    tied = datetime(2025, 5, 1, 12, 0)
+    for child in Child.query.filter_by(parent_id=parent.id).limit(3):
+        child.created_at = tied
+    db.session.commit()
+    expected = [c.id for c in Child.query.filter_by(parent_id=parent.id).order_by(Child.created_at.desc(), Child.id.desc())]
+
+    seen, cursor = [], None
+    while True:
+        resp = client.get('/dashboard/children.json', query_string={'limit': 2, **({'after': cursor} if cursor else {})})
+        assert resp.status_code == 200
+        page = resp.get_json()
+        assert len(page['children']) <= 2
+        seen += [c['id'] for c in page['children']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == expected
+
+    monkeypatch.setattr('app.views.DASHBOARD_PAGE_SIZE', 3)
+    body = client.get('/dashboard').get_data(as_text=True)
+    assert 'id="loadMoreChildren"' in body
+    assert sum(f'/child/{cid}/delete' in body for cid in expected) == 3
+
+
+def test_children_page_json_rejects_bad_requests(client, family):
+    with client.session_transaction() as sess:
+        sess.pop('parent_id', None)
+    assert client.get('/dashboard/children.json').status_code == 401
+    family(children=())
+    assert client.get('/dashboard/children.json', query_string={'after': 'not-a-cursor'}).status_code == 400
+
+
+def test_account_totals_are_one_sql_aggregate(client, family, sql_log):
+    from app.summaries import account_totals
+
+    parent = family(children=()).parent
+    _add_children(parent, 4)
+    client.get('/dashboard')  # materialize and summarize
+    today = date.today()
+    child_ids = [c.id for c in Child.query.filter_by(parent_id=parent.id)]
+    expected = {'children': 4, 'completed': 0, 'overdue': 0, 'upcoming': 0}
+    for child_id in child_ids:
+        stats = _row_stats(child_id, today)
+        expected['completed'] += stats['completed']
+        expected['overdue'] += stats['overdue']
+        expected['upcoming'] += stats['due_soon'] + stats['upcoming']
+
+    with sql_log() as log:
+        totals = account_totals(parent.id, today)
+    statements = log.statements
+    assert totals == expected
+    # One aggregate row; the per-child pending_due JSON is not fetched
+    assert len(statements) == 1 and 'sum(' in statements[0].lower()
+    assert 'child_status_summary.pending_due' not in statements[0]
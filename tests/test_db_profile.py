@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db_profile import engine_options, install_sqlite_pragmas, sqlite_pragmas
+
+
+def _profiled_engine(tmp_path, env=None):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = create_engine(url, **engine_options(url, env={}))
+    install_sqlite_pragmas(engine, sqlite_pragmas(env or {}))
+    return engine
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = _profiled_engine(tmp_path)
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert conn.execute(text('PRAGMA temp_store')).scalar() == 2  # MEMORY
+        assert conn.execute(text('PRAGMA cache_size')).scalar() == -65536
+    engine.dispose()
+
+
+def test_sqlite_pragmas_configurable_and_validated():
+    pragmas = sqlite_pragmas({'SQLITE_BUSY_TIMEOUT_MS': '250', 'SQLITE_SYNCHRONOUS': 'full'})
+    assert pragmas['busy_timeout'] == 250
+    assert pragmas['synchronous'] == 'FULL'
+    with pytest.raises(ValueError):
+        sqlite_pragmas({'SQLITE_JOURNAL_MODE': 'WAL; DROP TABLE children'})
+
+
+def test_engine_options_per_backend():
+    assert engine_options('sqlite:///:memory:', env={}) == {}
+    sqlite_opts = engine_options('sqlite:////tmp/app.db', env={'DB_POOL_SIZE': '3'})
+    assert sqlite_opts['pool_size'] == 3
+    assert sqlite_opts['connect_args'] == {'timeout': 5.0}
+    pg = engine_options('postgresql+psycopg2://u:p@db/app', env={'DB_STATEMENT_TIMEOUT_MS': '2000'})
+    assert pg['pool_pre_ping'] is True
+    assert pg['connect_args'] == {'options': '-c statement_timeout=2000'}
+
+
+def test_concurrent_writers_do_not_hit_locked_errors(tmp_path):
+    engine = _profiled_engine(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE events (id INTEGER PRIMARY KEY, worker INTEGER, n INTEGER)'))
+    errors = []
+
+    def _write(worker):
+        try:
+            for n in range(50):
+                with engine.begin() as conn:
+                    conn.execute(text('INSERT INTO events (worker, n) VALUES (:w, :n)'), {'w': worker, 'n': n})
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_write, args=(w,)) for w in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM events')).scalar() == 300
+    engine.dispose()
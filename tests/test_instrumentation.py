@@ -0,0 +1,79 @@
+import logging
+
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture()
+def instrumented_app(monkeypatch, tmp_path):
+    monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'metrics.db'}")
+    monkeypatch.setenv('INSTRUMENTATION_ENABLED', '1')
+    monkeypatch.setenv('SLOW_REQUEST_MS', '0')
+    application = create_app()
+    application.config.update(TESTING=True)
+    with application.app_context():
+        yield application
+        db.session.remove()
+
+
+@pytest.fixture()
+def instrumented_client(instrumented_app, family):
+    client = instrumented_app.test_client()
+    family(parent_name='Metrics Parent', country='India', on=client)
+    return client
+
+
+def test_disabled_by_default(client):
+    resp = client.get('/auth/login')
+    assert 'Server-Timing' not in resp.headers
+    assert client.get('/metrics').status_code == 404
+
+
+def test_server_timing_header(instrumented_client):
+    resp = instrumented_client.get('/dashboard')
+    assert resp.status_code == 200
+    timing = resp.headers['Server-Timing']
+    assert 'db;dur=' in timing and 'tpl;dur=' in timing and 'total;dur=' in timing
+    queries = int(timing.split('desc="')[1].split(' queries')[0])
+    assert queries > 0
+
+
+def test_metrics_endpoint_tags_by_endpoint(instrumented_client):
+    instrumented_client.get('/dashboard')
+    instrumented_client.get('/dashboard')
+    body = instrumented_client.get('/metrics').get_data(as_text=True)
+    assert 'vaxguard_request_duration_seconds_count{endpoint="views.dashboard"} 2' in body
+    assert 'vaxguard_db_statements_total{endpoint="views.dashboard"}' in body
+    assert '# TYPE vaxguard_request_duration_seconds histogram' in body
+
+
+def test_slow_request_log_includes_sql(instrumented_client, caplog):
+    with caplog.at_level(logging.WARNING, logger='app.instrumentation'):
+        instrumented_client.get('/dashboard')
+    messages = [r.getMessage() for r in caplog.records if r.name == 'app.instrumentation']
+    assert messages and 'views.dashboard' in messages[0]
+    assert 'SELECT' in messages[0]
+
+
+def test_metrics_only_for_local_scrapes_or_token(instrumented_app, monkeypatch):
+    client = instrumented_app.test_client()
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.5'}).status_code == 403
+    # A reverse proxy on the same host connects from loopback too
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.5'}).status_code == 403
+
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-me')
+    token_app = create_app()
+    remote = token_app.test_client()
+    assert remote.get('/metrics').status_code == 403
+    assert remote.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    ok = remote.get('/metrics', headers={'Authorization': 'Bearer scrape-me'}, environ_base={'REMOTE_ADDR': '203.0.113.5'})
+    assert ok.status_code == 200
+
+
+def test_failed_statement_leaves_no_timer(instrumented_app):
+    with db.engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.exec_driver_sql('SELECT * FROM no_such_table')
+        assert not conn.info.get('_instr_started')
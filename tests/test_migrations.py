@@ -0,0 +1,108 @@
+import threading
+
+from sqlalchemy import MetaData, create_engine, inspect, text
+
+from app import create_app, db, models  # noqa: F401  (importing models registers the tables on db.metadata)
+from app.migrations import LATEST_VERSION, run_migrations
+
+
+def _engine(tmp_path, name='schema.db'):
+    return create_engine(f"sqlite:///{tmp_path / name}")
+
+
+def _legacy_schema(engine):
+    # Tables as created before children.country and versioning existed
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE parents (id INTEGER PRIMARY KEY, name VARCHAR(120) NOT NULL, age INTEGER, email VARCHAR(180) NOT NULL UNIQUE, password_hash VARCHAR(255) NOT NULL, created_at DATETIME)'))
+        conn.execute(text('CREATE TABLE children (id INTEGER PRIMARY KEY, parent_id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, dob DATE NOT NULL, created_at DATETIME)'))
+        conn.execute(text("INSERT INTO parents (id, name, email, password_hash) VALUES (1, 'P', 'p@example.com', 'x')"))
+        conn.execute(text("INSERT INTO children (id, parent_id, name, dob) VALUES (1, 1, 'Kid', '2024-01-01')"))
+
+
+def _version(engine):
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT version FROM schema_version')).scalar()
+
+
+def test_fresh_database_is_created_and_stamped(tmp_path):
+    engine = _engine(tmp_path)
+    assert run_migrations(engine, db.metadata) == []
+    assert {'parents', 'children', 'vaccinations', 'schema_version'} <= set(inspect(engine).get_table_names())
+    assert _version(engine) == LATEST_VERSION
+
+
+def test_current_schema_costs_one_select(tmp_path, sql_log):
+    engine = _engine(tmp_path)
+    run_migrations(engine, db.metadata)
+    with sql_log(engine) as log:
+        assert run_migrations(engine, db.metadata) == []
+    assert [s for s in log.statements if not s.startswith(('SAVEPOINT', 'RELEASE'))] == ['SELECT version FROM schema_version WHERE id = 1']
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    engine = _engine(tmp_path)
+    _legacy_schema(engine)
+    assert run_migrations(engine, db.metadata) == [1, 2, 3, 4, 5, 6]
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT country FROM children WHERE id = 1')).scalar() == 'India'
+        assert conn.execute(text('SELECT calendar_secret FROM parents WHERE id = 1')).scalar()
+    assert 'vaccinations' in inspect(engine).get_table_names()
+    assert {i['name'] for i in inspect(engine).get_indexes('children')} == {'ix_children_parent_created_id'}
+    assert {'ix_vaccinations_child_due', 'ix_vaccinations_pending_due'} <= {i['name'] for i in inspect(engine).get_indexes('vaccinations')}
+    assert _version(engine) == LATEST_VERSION
+
+
+def test_migrations_alone_reproduce_model_schema(tmp_path):
+    # Version-1 schema (vaccinations included), migrated without create_all filling the gaps
+    engine = _engine(tmp_path)
+    _legacy_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE children ADD COLUMN country VARCHAR(50)'))
+        conn.execute(text('CREATE UNIQUE INDEX ix_parents_email ON parents (email)'))
+        conn.execute(text('CREATE INDEX ix_children_parent_id ON children (parent_id)'))
+        conn.execute(text('CREATE TABLE vaccinations (id INTEGER PRIMARY KEY, child_id INTEGER NOT NULL, name VARCHAR(150) NOT NULL, due_date DATE NOT NULL, completed_at DATE, created_at DATETIME, CONSTRAINT uq_child_vaccine_name UNIQUE (child_id, name))'))
+        conn.execute(text('CREATE INDEX ix_vaccinations_child_id ON vaccinations (child_id)'))
+        conn.execute(text('CREATE TABLE schema_version (id INTEGER PRIMARY KEY, version INTEGER NOT NULL)'))
+        conn.execute(text('INSERT INTO schema_version (id, version) VALUES (1, 1)'))
+    assert run_migrations(engine, MetaData()) == [2, 3, 4, 5, 6]
+
+    models = _engine(tmp_path, 'models.db')
+    db.metadata.create_all(models)
+    migrated, expected = inspect(engine), inspect(models)
+    for table in expected.get_table_names():
+        assert {c['name'] for c in migrated.get_columns(table)} == {c['name'] for c in expected.get_columns(table)}, table
+        assert {i['name'] for i in migrated.get_indexes(table)} == {i['name'] for i in expected.get_indexes(table)}, table
+        assert migrated.get_pk_constraint(table)['constrained_columns'] == expected.get_pk_constraint(table)['constrained_columns'], table
+
+
+def test_concurrent_workers_migrate_exactly_once(tmp_path):
+    _legacy_schema(_engine(tmp_path))
+    results, errors = [], []
+    barrier = threading.Barrier(4)
+
+    def _worker():
+        engine = _engine(tmp_path)
+        barrier.wait()
+        try:
+            results.append(run_migrations(engine, db.metadata))
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert sorted(results) == [[], [], [], [1, 2, 3, 4, 5, 6]]
+
+
+def test_skip_migrations_and_cli(tmp_path, monkeypatch):
+    monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'cold.db'}")
+    app = create_app(skip_migrations=True)
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+        result = app.test_cli_runner().invoke(args=['migrate'])
+        assert result.exit_code == 0
+        assert f'version {LATEST_VERSION}' in result.output
+        assert 'schema_version' in inspect(db.engine).get_table_names()
@@ -74,3 +74,30 @@ def test_cascade_delete(_db):
     _db.session.delete(p)
     _db.session.commit()
     assert Vaccination.query.filter_by(child_id=c.id).count() == 0
+
+
+@pytest.mark.parametrize('country', ['India', 'UK', 'USA'])
+def test_schedule_materialization_statement_count(_db, cleanup, sql_log, country):
+    p = Parent(name='Q', email=f'queries-{country.lower()}@example.com', password_hash='x')
+    _db.session.add(p)
+    _db.session.commit()
+    cleanup.track(p)
+    c = Child(name='QKid', dob=date(2024, 1, 1), parent_id=p.id, country=country)
+    _db.session.add(c)
+    _db.session.commit()
+    dob, child_country = c.dob, c.country  # load before counting
+
+    with sql_log() as log:
+        entries = build_schedule_for_child(dob, child=c, country=child_country)
+    # SELECT existing, bulk INSERT, status summary (SELECT, DELETE, INSERT) and its pending
+    # counts (DELETE, INSERT), SELECT reload — independent of schedule size
+    assert len(log.statements) == 8
+    assert log.commits == 1
+    assert all(e['vaccine_records'] for e in entries)
+
+    _db.session.refresh(c)
+    with sql_log() as log:
+        build_schedule_for_child(dob, child=c, country=child_country)
+    # Nothing new: a single SELECT and no commit
+    assert len(log.statements) == 1
+    assert log.commits == 0
@@ -0,0 +1,79 @@
+import os
+import runpy
+from uuid import uuid4
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import Parent
+from app.passwords import HashingBusy, PasswordHasher
+
+
+def _parent(password_hash):
+    parent = Parent(name='Hash Parent', email=f'hash-{uuid4().hex[:8]}@example.com', password_hash=password_hash)
+    db.session.add(parent)
+    db.session.commit()
+    return parent
+
+
+def test_needs_rehash_compares_canonical_parameters():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=0)
+    assert hasher.method == 'pbkdf2:sha256:1000'
+    assert not hasher.needs_rehash(generate_password_hash('pw', 'pbkdf2:sha256:1000'))
+    assert hasher.needs_rehash(generate_password_hash('pw', 'pbkdf2:sha256:2000'))
+    assert hasher.needs_rehash(generate_password_hash('pw', 'pbkdf2:sha256:1000', salt_length=8))
+    assert PasswordHasher(method='scrypt', workers=0).method == 'scrypt:32768:8:1'
+
+
+def test_pool_hashes_and_verifies():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1)
+    try:
+        pwhash = hasher.hash('secret123')
+        assert hasher.verify(pwhash, 'secret123') and not hasher.verify(pwhash, 'wrong')
+        assert hasher._executor._mp_context.get_start_method() != 'fork'
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_hasher_fails_fast():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=0, max_pending=1, retry_after=3)
+    hasher._slots.acquire()
+    with pytest.raises(HashingBusy) as excinfo:
+        hasher.hash('secret123')
+    assert excinfo.value.retry_after == 3
+    hasher._slots.release()
+    assert hasher.hash('secret123')
+
+
+def test_login_rehashes_old_parameters(client, app, _db):
+    parent = _parent(generate_password_hash('secret123', 'pbkdf2:sha256:1000'))
+    resp = client.post('/auth/login', data={'email': parent.email, 'password': 'secret123'})
+    assert resp.status_code == 302
+    db.session.refresh(parent)
+    hasher = app.extensions['password_hasher']
+    assert parent.password_hash.startswith(hasher.method + '$')
+    assert not hasher.needs_rehash(parent.password_hash)
+
+
+def test_login_storm_gets_503_with_retry_after(client, app, _db):
+    parent = _parent(generate_password_hash('secret123', 'pbkdf2:sha256:1000'))
+    hasher = app.extensions['password_hasher']
+    for _ in range(hasher.max_pending):
+        hasher._slots.acquire()
+    try:
+        resp = client.post('/auth/login', data={'email': parent.email, 'password': 'secret123'})
+        register = client.post('/auth/register', data={'name': 'Later', 'email': 'later@example.com', 'age': '30', 'password': 'secret123'})
+    finally:
+        for _ in range(hasher.max_pending):
+            hasher._slots.release()
+    assert resp.status_code == 503 and resp.headers['Retry-After'] == str(hasher.retry_after)
+    assert register.status_code == 503 and b'later@example.com' in register.data
+    assert client.post('/auth/login', data={'email': parent.email, 'password': 'secret123'}).status_code == 302
+
+
+def test_gunicorn_config_uses_threaded_workers():
+    # Per-process admission control only sees concurrent logins with threaded workers
+    config = runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py'))
+    assert config['worker_class'] == 'gthread'
+    assert config['threads'] > 1
@@ -0,0 +1,98 @@
+import io
+import json
+import mailbox
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models import Vaccination
+from app.reminders import JsonLinesSink, iter_parent_reminders, parse_windows, run_reminder_scan
+
+TODAY = date(2031, 3, 10)
+DOB = date(2030, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def _context(_db):
+    yield
+
+
+def _vac(child, name, days, completed=False):
+    db.session.add(Vaccination(
+        child_id=child.id, name=name, due_date=TODAY + timedelta(days=days),
+        completed_at=TODAY if completed else None,
+    ))
+
+
+def _scan(**kwargs):
+    sink = JsonLinesSink(io.StringIO())
+    buffer = sink.stream
+    sink.close = lambda: None
+    result = run_reminder_scan(sink, TODAY, **kwargs)
+    return result, [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+
+def test_reminders_grouped_per_parent_by_window(family):
+    parent, (a, b) = family(children=('Rem Kid 0', 'Rem Kid 1'), dob=DOB, login=False)
+    _vac(a, 'Today Vac', 0)
+    _vac(a, 'Week Vac', 7)
+    _vac(b, 'Month Vac', 30)
+    _vac(b, 'Done Vac', 7, completed=True)
+    _vac(b, 'Between Vac', 3)
+    _vac(a, 'Past Vac', -1)
+    other, (c,) = family(children=('Rem Kid',), dob=DOB, login=False)
+    _vac(c, 'Other Vac', 7)
+    db.session.commit()
+
+    _result, messages = _scan()
+    by_parent = {m['parent_id']: m for m in messages}
+    mine = by_parent[parent.id]
+    assert [(i['vaccine'], i['days_ahead']) for i in mine['items']] == [('Today Vac', 0), ('Week Vac', 7), ('Month Vac', 30)]
+    assert [i['vaccine'] for i in by_parent[other.id]['items']] == ['Other Vac']
+
+
+def test_batching_does_not_split_or_change_results(family):
+    for _ in range(3):
+        _parent, (kid,) = family(children=('Rem Kid',), dob=DOB, login=False)
+        _vac(kid, 'Batch Vac', 7)
+    db.session.commit()
+    full_result, full = _scan(batch_size=1000)
+    small_result, small = _scan(batch_size=1)
+    assert full == small
+    assert full_result == small_result
+    assert len({m['parent_id'] for m in small}) == len(small)
+
+
+def test_custom_windows(family):
+    assert parse_windows('30, 0,7,7') == (0, 7, 30)
+    parent, (kid,) = family(children=('Rem Kid',), dob=DOB, login=False)
+    _vac(kid, 'Three Days', 3)
+    db.session.commit()
+    reminders = [r for r in iter_parent_reminders(TODAY, parse_windows('3')) if r.parent_id == parent.id]
+    assert [(i.vaccine, i.days_ahead) for i in reminders[0].items] == [('Three Days', 3)]
+
+
+def test_maildir_sink_and_cli(app, family, tmp_path):
+    parent, (kid,) = family(children=('Rem Kid',), dob=DOB, login=False)
+    _vac(kid, 'Mail Vac', 0)
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=[
+        'send-reminders', '--date', TODAY.isoformat(), '--sink', f"maildir:{tmp_path / 'mail'}",
+    ])
+    assert result.exit_code == 0, result.output
+    messages = [m for m in mailbox.Maildir(str(tmp_path / 'mail')) if m['To'] == parent.email]
+    assert len(messages) == 1
+    assert 'Mail Vac due today' in messages[0].get_payload()
+
+
+def test_reminder_batch_query_uses_indexes(_db, family, sql_log):
+    _parent, (kid,) = family(children=('Rem Kid',), dob=DOB, login=False)
+    _vac(kid, 'Plan Vac', 7)
+    db.session.commit()
+    with sql_log() as log:
+        list(iter_parent_reminders(TODAY))
+    statement, parameters = next((s, p) for s, p in log.executions if 'JOIN vaccinations' in s)
+    with _db.engine.connect() as conn:
+        plan = '\n'.join(row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters))
+    assert 'SCAN vaccinations' not in plan and 'SCAN children' not in plan, plan
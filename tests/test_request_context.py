@@ -0,0 +1,33 @@
+from flask import render_template_string, session
+
+from app import db
+from app.schedule_data import get_countries, get_reference_defaults
+
+
+def _parent_selects(app, family, sql_log, templates):
+    parent_id = family(children=(), parent_name='Memo Parent', login=False).parent.id
+    db.session.expunge_all()
+    with sql_log() as log:
+        with app.test_request_context('/'):
+            session['parent_id'] = parent_id
+            rendered = [render_template_string(source) for source in templates]
+    return rendered, [s for s in log.statements if 'FROM parents' in s]
+
+
+def test_current_parent_loaded_once_per_request(app, family, sql_log):
+    rendered, selects = _parent_selects(app, family, sql_log, ['{{ current_parent.name }}', 'Hi {{ current_parent.name }}'])
+    assert rendered == ['Memo Parent', 'Hi Memo Parent']
+    assert len(selects) == 1
+
+
+def test_current_parent_not_loaded_when_unused(app, family, sql_log):
+    rendered, selects = _parent_selects(app, family, sql_log, ['{{ reference_label }} {{ available_countries|length }}'])
+    assert rendered == [f'Official schedule {len(get_countries())}']
+    assert selects == []
+
+
+def test_reference_defaults_built_once_per_version():
+    defaults = get_reference_defaults()
+    assert get_reference_defaults() is defaults
+    assert list(defaults['available_countries']) == get_countries()
+    assert defaults['current_country'] == 'India' and defaults['reference_url']
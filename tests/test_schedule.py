@@ -64,3 +64,80 @@ def test_composite_age_parsing_three_years_four_months():
     # Expected: +3 years => 2023-01-15; +4 months => 2023-05-15
     assert due.year == 2023 and due.month == 5 and due.day == 15
 
+
+
+def test_compiled_schedule_matches_label_parsing():
+    from app.schedule_data import get_compiled_schedule, _calc_due_date, entry_due_date
+    dob = date(2023, 1, 31)
+    for country in get_countries():
+        compiled = get_compiled_schedule(country)
+        assert compiled.country == country
+        for entry in compiled.entries:
+            assert isinstance(entry.vaccines, tuple)
+            assert entry_due_date(dob, entry) == _calc_due_date(dob, entry.age)
+
+
+def test_compiled_schedule_offsets_and_fallback():
+    from app.schedule_data import get_compiled_schedule
+    uk = get_compiled_schedule('UK')
+    by_age = {e.age: (e.years, e.months, e.weeks) for e in uk.entries}
+    assert by_age['8 Weeks'] == (0, 0, 8)
+    assert by_age['3 Years 4 Months'] == (3, 4, 0)
+    assert by_age['Every Year'] == (1, 0, 0)
+    assert by_age['12-13 Years'] == (12, 0, 0)
+    assert get_compiled_schedule('Atlantis').country == 'India'
+
+
+def _write_schedules(path, ages, mtime):
+    import json
+    import os
+    data = {'India': {'reference_url': 'https://iap.example', 'schedule': [{'age': a, 'vaccines': [f'V {a}']} for a in ages]}}
+    path.write_text(json.dumps(data), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def test_schedule_registry_reloads_on_change(tmp_path):
+    from app.schedule_data import ScheduleRegistry
+    path = tmp_path / 'schedules.json'
+    _write_schedules(path, ['Birth'], 1_000_000)
+    registry = ScheduleRegistry(str(path), check_interval=0)
+    first = registry.current()
+    assert [e.age for e in first.compiled['India'].entries] == ['Birth']
+
+    _write_schedules(path, ['Birth', '6 Weeks'], 1_000_010)
+    second = registry.current()
+    assert [e.age for e in second.compiled['India'].entries] == ['Birth', '6 Weeks']
+    assert second.version != first.version
+    # Unchanged file: same snapshot object is served
+    assert registry.current() is second
+
+
+def test_schedule_registry_checks_at_most_once_per_interval(tmp_path):
+    from app.schedule_data import ScheduleRegistry
+    path = tmp_path / 'schedules.json'
+    _write_schedules(path, ['Birth'], 1_000_000)
+    registry = ScheduleRegistry(str(path), check_interval=3600)
+    first = registry.current()
+    _write_schedules(path, ['Birth', '6 Weeks'], 1_000_010)
+    assert registry.current() is first
+    registry.invalidate()
+    assert registry.current().version != first.version
+
+
+def test_schedule_registry_keeps_last_good_version(tmp_path):
+    from app.schedule_data import ScheduleRegistry
+    path = tmp_path / 'schedules.json'
+    _write_schedules(path, ['Birth'], 1_000_000)
+    registry = ScheduleRegistry(str(path), check_interval=0)
+    good = registry.current()
+    path.write_text('{"India": {"schedule": [{"age": "Birth"}]}}', encoding='utf-8')
+    assert registry.current().version == good.version
+    path.unlink()
+    assert registry.current().version == good.version
+
+
+def test_schedule_registry_missing_file_uses_fallback(tmp_path):
+    from app.schedule_data import ScheduleRegistry
+    registry = ScheduleRegistry(str(tmp_path / 'missing.json'), check_interval=0)
+    assert list(registry.current().data) == ['India']
+    assert registry.current().stat_key is None
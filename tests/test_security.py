@@ -1,6 +1,3 @@
-from datetime import date
-
-
 def test_add_child_sanitizes_and_blocks_keywords(client):
     # XSS/script and SQL keywords in name should be sanitized/blocked by validation
     resp = client.post('/add-child', data={
@@ -41,3 +38,74 @@ def test_login_sanitizes_email(client):
     resp = client.post('/auth/login', data={'email': "user@example.com; SELECT *", 'password': 'x'})
     assert resp.status_code == 200
     assert 'Invalid credentials' in resp.get_data(as_text=True)
+
+
+def _legacy_sanitize_text(value, max_len=200):
+    # Verbatim copy of the original multi-pass implementation, used as the reference
+    import re
+    from html import escape
+    from app.security import DISALLOWED_KEYWORDS
+    if value is None:
+        return ''
+    s = str(value)
+    s = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F]", "", s)
+    s = re.sub(r"<\s*/?\s*script[^>]*>", "", s, flags=re.I)
+    s = s.replace('<', '').replace('>', '')
+    for kw in DISALLOWED_KEYWORDS:
+        s = re.sub(re.escape(kw), '', s, flags=re.I)
+    s = re.sub(r"\s+", " ", s).strip()
+    if len(s) > max_len:
+        s = s[:max_len]
+    return escape(s)
+
+
+
+_FRAGMENTS = [
+    'select', 'SeLeCt', 'drop', 'union', '--', ';', '/*', '*/', 'gr', 'ant', 'trunc', 'ate', 'sel', 'ect',
+    '<', '>', '<script>', '</ script src=x>', '< script', '\x00', '\x0b', '\x1f', '\t', '\n', '\r', '  ',
+    '\xa0', '\x85', '\u2028', '\u3000', '\u017f', '\u0130', '\u0131', '\u212a', '&', '"', "'", 'O', 'Brien', '\xe9',
+]
+
+
+def _adversarial_text():
+    from hypothesis import strategies as st
+    return st.lists(st.one_of(st.sampled_from(_FRAGMENTS), st.text(max_size=5)), max_size=40).map(''.join)
+
+
+def test_sanitize_text_matches_legacy_implementation():
+    from hypothesis import given, settings, strategies as st
+    from app.security import sanitize_text, sanitize_text_checked, has_disallowed_keywords
+
+    @settings(max_examples=300, deadline=None)
+    @given(_adversarial_text(), st.integers(min_value=0, max_value=60))
+    def check(value, max_len):
+        expected = _legacy_sanitize_text(value, max_len=max_len)
+        assert sanitize_text(value, max_len=max_len) == expected
+        assert sanitize_text_checked(value, max_len=max_len) == (expected, has_disallowed_keywords(expected))
+
+    check()
+
+
+def test_sanitize_text_checked_flags_keywords_left_after_sanitizing():
+    from app.security import sanitize_text_checked
+
+    # Removed keywords are not flagged; fragments joined by a removal are
+    assert sanitize_text_checked('Delete Me') == ('Me', False)
+    assert sanitize_text_checked('selselectect') == ('select', True)
+    # Escaping '&' adds the ';' keyword to the output
+    assert sanitize_text_checked('Tom & Jerry') == ('Tom &amp; Jerry', True)
+    assert sanitize_text_checked(None) == ('', False)
+
+
+def test_has_disallowed_keywords_matches_substring_scan():
+    from hypothesis import given, settings
+    from app.security import DISALLOWED_KEYWORDS, has_disallowed_keywords
+
+    @settings(max_examples=200, deadline=None)
+    @given(_adversarial_text())
+    def check(value):
+        low = value.lower()
+        assert has_disallowed_keywords(value) == any(kw in low for kw in DISALLOWED_KEYWORDS)
+
+    check()
+    assert has_disallowed_keywords(None) is False
@@ -0,0 +1,135 @@
+from datetime import date
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.models import Child, Parent, Vaccination
+from app.schedule_data import get_compiled_schedule
+from app.session_store import FileSessionStore, SqliteSessionStore, init_session_store
+
+
+@pytest.fixture()
+def server_sessions(app, monkeypatch, tmp_path):
+    """Switch the shared app to the opt-in SQLite session store for one test."""
+    monkeypatch.setenv('SESSION_BACKEND', 'sqlite')
+    monkeypatch.setenv('SESSION_STORE_PATH', str(tmp_path / 'sessions.db'))
+    monkeypatch.setenv('SESSION_SWEEP_INTERVAL', '0')
+    monkeypatch.setattr(app, 'session_interface', app.session_interface)  # restored afterwards
+    init_session_store(app)
+    return app.session_interface
+
+
+def _session_cookie(client):
+    return client.get_cookie('session').value
+
+
+def test_cookie_is_opaque_id_and_guest_completions_are_compact(client, server_sessions):
+    client.post('/add-child', data={'child_name': 'Compact Kid', 'dob': '2024-01-01', 'country': 'UK'})
+    entry = get_compiled_schedule('UK').entries[1]
+    client.post('/guest-child/complete', data={'age': entry.age, 'date': '2024-03-01'})
+
+    sid = _session_cookie(client)
+    assert len(sid) == 43 and 'Compact' not in sid
+    data, _expires_at = server_sessions.store.load(sid, 0)
+    guest = json.loads(data)['guest']
+    assert guest['done'] == [0, date(2024, 3, 1).toordinal()]
+
+    body = client.get('/guest-child').get_data(as_text=True)
+    assert 'Completed on' in body
+    total = sum(len(e.vaccines) for e in get_compiled_schedule('UK').entries)
+    assert f'{len(entry.vaccines)}/{total} Complete' in body
+
+
+def test_guest_completions_move_into_account_on_register(client, _db, server_sessions):
+    client.post('/add-child', data={'child_name': 'Moving Kid', 'dob': '2024-01-01', 'country': 'UK'})
+    entry = get_compiled_schedule('UK').entries[1]
+    client.post('/guest-child/complete', data={'age': entry.age, 'date': '2024-03-01'})
+    email = f'move-{uuid4().hex[:8]}@example.com'
+    client.post('/auth/register', data={'name': 'Mover', 'email': email, 'age': '30', 'password': 'secret123'})
+    child = Child.query.join(Parent).filter(Parent.email == email).one()
+    done = {v.name: v.completed_at for v in Vaccination.query.filter_by(child_id=child.id) if v.completed_at}
+    assert done == {name: date(2024, 3, 1) for name in entry.vaccines}
+
+
+def test_login_issues_new_session_id(client, app, _db, server_sessions):
+    client.post('/add-child', data={'child_name': 'Fixated Kid', 'dob': '2024-01-01', 'country': 'UK'})
+    planted = _session_cookie(client)
+    attacker = app.test_client()
+    attacker.set_cookie('session', planted)
+
+    email = f'fix-{uuid4().hex[:8]}@example.com'
+    client.post('/auth/register', data={'name': 'Victim', 'email': email, 'age': '30', 'password': 'secret123'})
+    signed_in = _session_cookie(client)
+    assert signed_in != planted
+    assert server_sessions.store.load(planted, 0) is None
+    assert attacker.get('/api/v1/children').status_code == 401
+    assert client.get('/api/v1/children').status_code == 200
+
+    client.get('/auth/logout')
+    assert client.get_cookie('session') is None or _session_cookie(client) != signed_in
+    assert server_sessions.store.load(signed_in, 0) is None
+
+
+def test_guest_completion_does_not_spill_into_groups_sharing_a_vaccine(client, _db, server_sessions):
+    client.post('/add-child', data={'child_name': 'Shared Kid', 'dob': '2024-01-01', 'country': 'USA'})
+    entries = get_compiled_schedule('USA').entries
+    two_months = next(e for e in entries if e.age == '2 Months')
+    # DTaP and Hepatitis B recur in other groups
+    assert {'DTaP', 'Hepatitis B'} <= set(two_months.vaccines)
+    client.post('/guest-child/complete', data={'age': two_months.age, 'date': '2024-03-01'})
+    body = client.get('/guest-child').get_data(as_text=True)
+    assert body.count('Completed on') == 1
+    assert f'{len(two_months.vaccines)}/{sum(len(e.vaccines) for e in entries)} Complete' in body
+
+    email = f'shared-{uuid4().hex[:8]}@example.com'
+    client.post('/auth/register', data={'name': 'Sharer', 'email': email, 'age': '30', 'password': 'secret123'})
+    child = Child.query.join(Parent).filter(Parent.email == email).one()
+    done = {v.name for v in Vaccination.query.filter_by(child_id=child.id) if v.completed_at}
+    # Hepatitis B's row belongs to the Birth group, which was not completed
+    assert 'Hepatitis B' not in done and 'DTaP' in done
+
+
+@pytest.mark.parametrize('make_store', [
+    lambda tmp_path: SqliteSessionStore(str(tmp_path / 'sessions.db')),
+    lambda tmp_path: FileSessionStore(str(tmp_path / 'sessions')),
+])
+def test_store_expiry_and_sweep(tmp_path, make_store):
+    store = make_store(tmp_path)
+    live, stale = 'a' * 43, 'b' * 43
+    store.save(live, '{"x": 1}', expires_at=200.0)
+    store.save(stale, '{"x": 2}', expires_at=50.0)
+    assert store.load(live, now=100.0) == ('{"x": 1}', 200.0)
+    assert store.load(stale, now=100.0) is None
+    assert store.sweep(now=100.0) == 1
+    assert store.load(stale, now=0.0) is None
+    store.touch(live, 500.0)
+    assert store.load(live, now=300.0) == ('{"x": 1}', 500.0)
+    store.delete(live)
+    assert store.load(live, now=0.0) is None
+
+
+def test_cookie_sessions_are_the_default(monkeypatch):
+    from flask import Flask
+    from flask.sessions import SecureCookieSessionInterface
+
+    from app.session_store import init_session_store
+
+    monkeypatch.delenv('SESSION_BACKEND', raising=False)
+    app = Flask(__name__)
+    init_session_store(app)
+    assert isinstance(app.session_interface, SecureCookieSessionInterface)
+
+
+def test_one_store_and_sweeper_per_location(app, monkeypatch, tmp_path):
+    import threading
+
+    monkeypatch.setenv('SESSION_BACKEND', 'file')
+    monkeypatch.setenv('SESSION_STORE_PATH', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(app, 'session_interface', app.session_interface)
+    before = sum(t.name == 'session-sweeper' for t in threading.enumerate())
+    init_session_store(app)
+    first = app.session_interface.store
+    init_session_store(app)
+    assert app.session_interface.store is first
+    assert sum(t.name == 'session-sweeper' for t in threading.enumerate()) == before + 1
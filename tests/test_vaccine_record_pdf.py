@@ -1,22 +1,9 @@
 from datetime import date
-from uuid import uuid4
 
 from app import db
-from app.models import Parent, Child, Vaccination
-from app.views import _build_vaccine_record_rows, _name_initials, _build_vaccine_record_stats, _build_grouped_vaccine_record_rows
-
-
-def _create_logged_in_child(client, child_name='Kid PDF'):
-    unique = uuid4().hex[:8]
-    parent = Parent(name='PDF Parent', email=f'{child_name.lower().replace(" ", "")}-{unique}@example.com', password_hash='x')
-    db.session.add(parent)
-    db.session.commit()
-    child = Child(name=child_name, dob=date(2024, 1, 1), parent_id=parent.id, country='UK')
-    db.session.add(child)
-    db.session.commit()
-    with client.session_transaction() as sess:
-        sess['parent_id'] = parent.id
-    return parent, child
+from app import exports as exports_module
+from app.models import Vaccination
+from app.exports import _build_vaccine_record_rows, _name_initials, _build_vaccine_record_stats, _build_grouped_vaccine_record_rows, _build_vaccine_record_pdf
 
 
 def test_vaccine_record_pdf_requires_login(client):
@@ -25,9 +12,9 @@ def test_vaccine_record_pdf_requires_login(client):
     assert '/auth/login' in resp.location
 
 
-def test_vaccine_record_pdf_download_headers_and_core_text(client, _db, monkeypatch):
-    parent, child = _create_logged_in_child(client, child_name='NoPI Kid')
-    monkeypatch.setattr('app.views.build_schedule_for_child', lambda *args, **kwargs: [{'age': '8 Weeks', 'vaccines': ['MMR'], 'due_date': date(2026, 1, 1)}])
+def test_vaccine_record_pdf_download_headers_and_core_text(client, family, monkeypatch):
+    parent, (child,) = family(children=('NoPI Kid',))
+    monkeypatch.setattr('app.exports.build_schedule_for_child', lambda *args, **kwargs: [{'age': '8 Weeks', 'vaccines': ['MMR'], 'due_date': date(2026, 1, 1)}])
 
     db.session.add(Vaccination(child_id=child.id, name='MMR', due_date=date(2026, 1, 1), completed_at=None))
     db.session.commit()
@@ -49,17 +36,9 @@ def test_vaccine_record_pdf_download_headers_and_core_text(client, _db, monkeypa
     assert b'8 Weeks' in resp.data
 
 
-def test_vaccine_record_pdf_only_for_own_child(client, _db):
-    parent_a, _ = _create_logged_in_child(client, child_name='Parent A Kid')
-    parent_b = Parent(name='Parent B', email=f'parentb-{uuid4().hex[:8]}@example.com', password_hash='x')
-    db.session.add(parent_b)
-    db.session.commit()
-    other_child = Child(name='Other Kid', dob=date(2023, 5, 1), parent_id=parent_b.id, country='UK')
-    db.session.add(other_child)
-    db.session.commit()
-
-    with client.session_transaction() as sess:
-        sess['parent_id'] = parent_a.id
+def test_vaccine_record_pdf_only_for_own_child(client, family):
+    other_child = family(children=('Other Kid',), dob=date(2023, 5, 1), login=False).child
+    family(children=('Parent A Kid',))
 
     resp = client.get(f'/child/{other_child.id}/vaccine-record.pdf')
     assert resp.status_code == 404
@@ -128,10 +107,140 @@ def test_name_initials():
     assert _name_initials('') == 'CH'
 
 
-def test_vaccine_record_pdf_empty_schedule_message(client, _db, monkeypatch):
-    _, child = _create_logged_in_child(client, child_name='Empty Schedule Kid')
-    monkeypatch.setattr('app.views.build_schedule_for_child', lambda *args, **kwargs: [])
+def test_vaccine_record_pdf_empty_schedule_message(client, family, monkeypatch):
+    child = family(children=('Empty Schedule Kid',)).child
+    monkeypatch.setattr('app.exports.build_schedule_for_child', lambda *args, **kwargs: [])
 
     resp = client.get(f'/child/{child.id}/vaccine-record.pdf')
     assert resp.status_code == 200
     assert b'No vaccination schedule available.' in resp.data
+
+
+def test_vaccine_record_pdf_cached_with_etag(client, family, monkeypatch):
+    child = family(children=('Cache Kid',)).child
+    calls = []
+    original = exports_module._build_vaccine_record_pdf
+    monkeypatch.setattr('app.exports._build_vaccine_record_pdf', lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+    first = client.get(f'/child/{child.id}/vaccine-record.pdf')
+    second = client.get(f'/child/{child.id}/vaccine-record.pdf')
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert len(calls) == 1
+    etag = first.headers['ETag']
+    assert etag and not etag.startswith('W/')
+
+    not_modified = client.get(f'/child/{child.id}/vaccine-record.pdf', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+
+def test_vaccine_record_pdf_cache_invalidated_on_completion(client, family):
+    child = family(children=('Invalidate Kid',)).child
+    first = client.get(f'/child/{child.id}/vaccine-record.pdf')
+    assert b'Complete: 0/' in first.data
+
+    client.post(f'/child/{child.id}/complete', data={'vaccine': 'MMR-1', 'date': '2025-01-05'})
+    second = client.get(f'/child/{child.id}/vaccine-record.pdf', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert b'Complete: 0/' not in second.data
+
+
+def test_vaccine_record_pdf_key_changes_when_a_completion_is_redated(client, family):
+    from app.completions import import_completion_history
+    from app.schedule_data import get_compiled_schedule, materialize_vaccinations
+
+    child = family(children=('Redate Kid',)).child
+    materialize_vaccinations([child])
+    names = get_compiled_schedule('UK').entries[1].vaccines
+    import_completion_history(child, {name: date(2024, 3, 1) for name in names})
+    db.session.commit()
+    first = client.get(f'/child/{child.id}/vaccine-record.pdf')
+
+    # Another process re-dates the group: same counts and max date, no local invalidation
+    import_completion_history(child, {names[0]: date(2024, 2, 27)})
+    db.session.commit()
+    second = client.get(f'/child/{child.id}/vaccine-record.pdf', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+
+
+def _many_groups(count):
+    row = {'vaccine': 'Vaccine', 'status': 'Due', 'date': '01 Jan 2027'}
+    return [{'age': f'{i} Months', 'rows': [dict(row, vaccine=f'Vaccine {i}-{j}') for j in range(5)]} for i in range(count)]
+
+
+def test_vaccine_record_pdf_paginates_without_dropping_rows():
+    import re
+    stats = {'completed': 0, 'overdue': 0, 'due_soon': 0, 'total': 200}
+    pdf = _build_vaccine_record_pdf(_many_groups(40), date(2026, 2, 17), 'Kid', 'Parent', stats)
+    page_count = int(re.search(rb'/Type /Pages /Count (\d+)', pdf).group(1))
+    assert page_count > 1
+    assert f'Page {page_count} of {page_count}'.encode() in pdf
+    assert b'Page 1 of 1' not in pdf
+    assert b'Vaccine 0-0' in pdf and b'Vaccine 39-4' in pdf
+    assert pdf.count(b'(Vaccine) Tj') == page_count  # table header repeated on every page
+
+
+def test_vaccine_record_pdf_xref_offsets_and_compression():
+    import re
+    import zlib
+    stats = {'completed': 0, 'overdue': 0, 'due_soon': 0, 'total': 200}
+    plain = _build_vaccine_record_pdf(_many_groups(40), date(2026, 2, 17), 'Kid', 'Parent', stats, compress=False)
+    packed = _build_vaccine_record_pdf(_many_groups(40), date(2026, 2, 17), 'Kid', 'Parent', stats, compress=True)
+    assert len(packed) < len(plain)
+    for pdf in (plain, packed):
+        xref_pos = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+        assert pdf[xref_pos:].startswith(b'xref')
+        offsets = [int(o) for o in re.findall(rb'(\d{10}) 00000 n', pdf)]
+        for obj_id, off in enumerate(offsets, start=1):
+            assert pdf[off:].startswith(f'{obj_id} 0 obj'.encode())
+    stream = re.search(rb'/FlateDecode >>\nstream\n(.*?)\nendstream', packed, re.S).group(1)
+    assert b'Vaccination Record' in zlib.decompress(stream)
+
+
+def test_vaccine_records_zip_contains_every_child(client, family, sql_log):
+    import io
+    import zipfile
+    child = family(children=('Zip Kid', 'Zip Kid 0', 'Zip Kid 1')).child
+
+    with sql_log() as log:
+        resp = client.get('/children/vaccine-records.zip')
+        assert resp.is_streamed
+        body = resp.data
+    assert log.writes == []
+    assert Vaccination.query.filter_by(child_id=child.id).count() == 0
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/zip'
+    archive = zipfile.ZipFile(io.BytesIO(body))
+    names = archive.namelist()
+    assert len(names) == 3
+    assert all(archive.read(n).startswith(b'%PDF-1.4') for n in names)
+    # Same record as the single download, rendered from schedule-only rows
+    name = next(n for n in names if n.startswith(f'ZK_{child.id}_vaxguard_vaccine_record_'))
+    assert archive.read(name) == client.get(f'/child/{child.id}/vaccine-record.pdf').data
+
+
+def test_vaccine_records_zip_requires_login(client):
+    resp = client.get('/children/vaccine-records.zip')
+    assert resp.status_code == 302
+    assert '/auth/login' in resp.location
+
+
+def test_vaccine_record_export_process_pool_matches_inline(client, family):
+    children = family(children=('Zip Kid 0', 'Zip Kid 1', 'Zip Kid 2')).children
+    jobs = exports_module.vaccine_record_export_jobs(children, date(2026, 2, 17))
+    inline = dict(exports_module._iter_rendered_vaccine_records(jobs, workers=1))
+    pooled = dict(exports_module._iter_rendered_vaccine_records(jobs, workers=2))
+    assert inline == pooled and len(inline) == 3
+
+
+def test_export_records_cli(app, family, tmp_path):
+    import zipfile
+    parent = family(children=('Zip Kid 0', 'Zip Kid 1'), login=False).parent
+    out = tmp_path / 'records.zip'
+    result = app.test_cli_runner().invoke(args=['export-records', '--parent-id', str(parent.id), '-o', str(out), '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Exported 2 records' in result.output
+    assert len(zipfile.ZipFile(out).namelist()) == 2